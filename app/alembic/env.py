@@ -7,7 +7,7 @@ from alembic import context
 
 
 from app.database.base import Base
-from app.models import User, RefreshToken, File, Task  # noqa
+from app.models import User, RefreshToken, File, Blob, Task, UploadSession, TaskResult  # noqa
 from app.core.config import settings
 
 # this is the Alembic Config object, which provides
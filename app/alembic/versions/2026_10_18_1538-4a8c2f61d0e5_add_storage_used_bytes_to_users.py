@@ -0,0 +1,40 @@
+"""add_storage_used_bytes_to_users
+
+Revision ID: 4a8c2f61d0e5
+Revises: e27c41d9a6b3
+Create Date: 2026-10-18 15:38:27.114062
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a8c2f61d0e5'
+down_revision: Union[str, Sequence[str], None] = 'e27c41d9a6b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('storage_used_bytes', sa.BigInteger(), server_default='0', nullable=False))
+    op.execute(
+        """
+        UPDATE users
+        SET storage_used_bytes = usage.total
+        FROM (
+            SELECT user_id, SUM(file_size) AS total
+            FROM files
+            GROUP BY user_id
+        ) AS usage
+        WHERE usage.user_id = users.id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'storage_used_bytes')
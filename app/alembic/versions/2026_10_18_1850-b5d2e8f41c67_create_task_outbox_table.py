@@ -0,0 +1,46 @@
+"""create_task_outbox_table
+
+Revision ID: b5d2e8f41c67
+Revises: 7c1e94b2f3a8
+Create Date: 2026-10-18 18:50:12.204719
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d2e8f41c67'
+down_revision: Union[str, Sequence[str], None] = '7c1e94b2f3a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('task_outbox',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('task_id', sa.UUID(), nullable=False),
+    sa.Column('queue', sa.String(length=32), nullable=False),
+    sa.Column('job_id', sa.String(length=256), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['task_id'], ['tasks.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('task_id')
+    )
+    op.create_index(op.f('ix_task_outbox_created_at'), 'task_outbox', ['created_at'], unique=False)
+    op.alter_column('tasks', 'celery_task_id',
+               existing_type=sa.String(length=256),
+               nullable=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("UPDATE tasks SET celery_task_id = id::text WHERE celery_task_id IS NULL")
+    op.alter_column('tasks', 'celery_task_id',
+               existing_type=sa.String(length=256),
+               nullable=False)
+    op.drop_index(op.f('ix_task_outbox_created_at'), table_name='task_outbox')
+    op.drop_table('task_outbox')
@@ -0,0 +1,34 @@
+"""add_task_leases
+
+Revision ID: 3f9a1c7e5d24
+Revises: b5d2e8f41c67
+Create Date: 2026-10-18 20:15:37.861402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a1c7e5d24'
+down_revision: Union[str, Sequence[str], None] = 'b5d2e8f41c67'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tasks', sa.Column('lease_owner', sa.String(length=64), nullable=True))
+    op.add_column('tasks', sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('tasks', sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+    op.create_index('ix_tasks_status_lease_expires_at', 'tasks', ['status', 'lease_expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tasks_status_lease_expires_at', table_name='tasks')
+    op.drop_column('tasks', 'attempts')
+    op.drop_column('tasks', 'lease_expires_at')
+    op.drop_column('tasks', 'lease_owner')
@@ -1,5 +1,11 @@
 from app.api.routes.auth import auth_router
+from app.api.routes.files import files_router
+from app.api.routes.upload_sessions import upload_sessions_router
+from app.api.routes.tasks import tasks_router
 from fastapi import APIRouter
 
 api_router = APIRouter(prefix="/api")
-api_router.include_router(auth_router)
\ No newline at end of file
+api_router.include_router(auth_router)
+api_router.include_router(upload_sessions_router)
+api_router.include_router(files_router)
+api_router.include_router(tasks_router)
\ No newline at end of file
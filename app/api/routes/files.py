@@ -0,0 +1,104 @@
+import uuid
+from typing import List, Optional
+from fastapi import APIRouter, Depends, File, Form, Request, UploadFile, status
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+from app.core.downloads import build_download_response
+from app.core.exceptions import FileNotFoundException
+from app.dependencies import get_current_active_user, get_file_service, get_storage_backend
+from app.schemas.file import FileConversionParameters, FileListResponse, FileOperationType, FileResponse, FileUpload
+from app.schemas.task import TaskListResponse, TaskResponse
+from app.schemas.user import UserResponse
+from app.services.interfaces.file_service import IFileService
+from app.storage import IStorageBackend
+
+files_router = APIRouter(prefix="/files", tags=["files"])
+
+
+def parse_upload_data(
+    operation: FileOperationType = Form(...),
+    parameters: Optional[str] = Form(None)
+) -> FileUpload:
+    """
+    Собирает FileUpload из полей multipart-формы (parameters передается как JSON).
+    Ошибки параметров возвращаются как 422, так же как для JSON-тела
+    """
+    try:
+        conversion_parameters = (
+            FileConversionParameters.model_validate_json(parameters) if parameters else None
+        )
+        return FileUpload(operation=operation, parameters=conversion_parameters)
+    except ValidationError as exc:
+        raise RequestValidationError(exc.errors(include_url=False))
+
+
+@files_router.post("/upload", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
+async def upload_file(
+    file: UploadFile = File(...),
+    upload_data: FileUpload = Depends(parse_upload_data),
+    current_user: UserResponse = Depends(get_current_active_user),
+    file_service: IFileService = Depends(get_file_service)
+):
+    """
+    Загрузка файла и создание задачи обработки
+    """
+    return await file_service.upload_file(current_user.id, file, upload_data)
+
+@files_router.post("/upload/batch", response_model=TaskListResponse, status_code=status.HTTP_201_CREATED)
+async def upload_files(
+    files: List[UploadFile] = File(...),
+    upload_data: FileUpload = Depends(parse_upload_data),
+    current_user: UserResponse = Depends(get_current_active_user),
+    file_service: IFileService = Depends(get_file_service)
+):
+    """
+    Пакетная загрузка файлов с одной операцией для всех и создание задач
+    """
+    return await file_service.upload_files(current_user.id, files, upload_data)
+
+@files_router.get("", response_model=FileListResponse)
+async def list_files(
+    current_user: UserResponse = Depends(get_current_active_user),
+    file_service: IFileService = Depends(get_file_service)
+):
+    return await file_service.get_user_files(current_user.id)
+
+@files_router.get("/storage")
+async def get_storage_usage(
+    current_user: UserResponse = Depends(get_current_active_user),
+    file_service: IFileService = Depends(get_file_service)
+):
+    return await file_service.get_storage_usage(current_user.id)
+
+@files_router.get("/{file_id}", response_model=FileResponse)
+async def get_file(
+    file_id: uuid.UUID,
+    current_user: UserResponse = Depends(get_current_active_user),
+    file_service: IFileService = Depends(get_file_service)
+):
+    db_file = await file_service.get_file_by_id(current_user.id, file_id)
+    if not db_file:
+        raise FileNotFoundException(str(file_id))
+    return db_file
+
+@files_router.get("/{file_id}/download")
+async def download_file(
+    file_id: uuid.UUID,
+    request: Request,
+    current_user: UserResponse = Depends(get_current_active_user),
+    file_service: IFileService = Depends(get_file_service),
+    storage: IStorageBackend = Depends(get_storage_backend)
+):
+    """
+    Скачивание исходного файла (поддерживает Range и условные запросы)
+    """
+    download = await file_service.get_file_download(current_user.id, file_id)
+    return await build_download_response(request, download, storage)
+
+@files_router.delete("/{file_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_file(
+    file_id: uuid.UUID,
+    current_user: UserResponse = Depends(get_current_active_user),
+    file_service: IFileService = Depends(get_file_service)
+):
+    await file_service.delete_file(current_user.id, file_id)
@@ -0,0 +1,107 @@
+import uuid
+from typing import List
+from fastapi import APIRouter, Depends, Request
+from app.core.downloads import build_download_response
+from app.core.exceptions import TaskNotCancellableException, TaskNotFoundException
+from app.dependencies import get_current_active_user, get_file_service, get_storage_backend, get_task_service
+from app.schemas.task import TaskListResponse, TaskProgressUpdate, TaskResponse, TaskResultResponse
+from app.schemas.user import UserResponse
+from app.services.interfaces.file_service import IFileService
+from app.services.interfaces.task_service import ITaskService
+from app.storage import IStorageBackend
+
+tasks_router = APIRouter(prefix="/tasks", tags=["tasks"])
+
+
+@tasks_router.get("", response_model=TaskListResponse)
+async def list_tasks(
+    current_user: UserResponse = Depends(get_current_active_user),
+    task_service: ITaskService = Depends(get_task_service)
+):
+    """
+    Список задач пользователя
+    """
+    return await task_service.get_user_tasks(current_user.id)
+
+@tasks_router.get("/{task_id}", response_model=TaskResponse)
+async def get_task(
+    task_id: uuid.UUID,
+    current_user: UserResponse = Depends(get_current_active_user),
+    task_service: ITaskService = Depends(get_task_service)
+):
+    """
+    Задача по ID
+    """
+    task = await task_service.get_task_by_id(current_user.id, task_id)
+    if not task:
+        raise TaskNotFoundException(str(task_id))
+    return task
+
+@tasks_router.post("/{task_id}/cancel", response_model=TaskResponse)
+async def cancel_task(
+    task_id: uuid.UUID,
+    current_user: UserResponse = Depends(get_current_active_user),
+    task_service: ITaskService = Depends(get_task_service)
+):
+    """
+    Отмена задачи: ждущая задача снимается с очереди, выполняющаяся
+    останавливается воркером в ближайшей точке прогресса
+    """
+    cancelled = await task_service.cancel_task(current_user.id, task_id)
+    task = await task_service.get_task_by_id(current_user.id, task_id)
+    if not task:
+        raise TaskNotFoundException(str(task_id))
+    if not cancelled:
+        raise TaskNotCancellableException(str(task_id), task.status)
+    return task
+
+@tasks_router.get("/{task_id}/progress", response_model=TaskProgressUpdate)
+async def get_task_progress(
+    task_id: uuid.UUID,
+    current_user: UserResponse = Depends(get_current_active_user),
+    file_service: IFileService = Depends(get_file_service)
+):
+    """
+    Статус и текущий прогресс задачи
+    """
+    return await file_service.get_task_progress(current_user.id, task_id)
+
+@tasks_router.get("/{task_id}/result")
+async def download_task_result(
+    task_id: uuid.UUID,
+    request: Request,
+    current_user: UserResponse = Depends(get_current_active_user),
+    file_service: IFileService = Depends(get_file_service),
+    storage: IStorageBackend = Depends(get_storage_backend)
+):
+    """
+    Скачивание результата обработки (поддерживает Range и условные запросы)
+    """
+    download = await file_service.get_task_result_download(current_user.id, task_id)
+    return await build_download_response(request, download, storage)
+
+@tasks_router.get("/{task_id}/results", response_model=List[TaskResultResponse])
+async def list_task_results(
+    task_id: uuid.UUID,
+    current_user: UserResponse = Depends(get_current_active_user),
+    file_service: IFileService = Depends(get_file_service)
+):
+    """
+    Список именованных результатов задачи (рендишенов)
+    """
+    return await file_service.get_task_results(current_user.id, task_id)
+
+@tasks_router.get("/{task_id}/results/{name}")
+async def download_task_rendition(
+    task_id: uuid.UUID,
+    name: str,
+    request: Request,
+    current_user: UserResponse = Depends(get_current_active_user),
+    file_service: IFileService = Depends(get_file_service),
+    storage: IStorageBackend = Depends(get_storage_backend)
+):
+    """
+    Скачивание рендишена по имени (поддерживает Range и условные запросы)
+    """
+    download = await file_service.get_task_rendition_download(current_user.id, task_id, name)
+    return await build_download_response(request, download, storage)
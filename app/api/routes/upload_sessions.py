@@ -0,0 +1,82 @@
+import re
+import uuid
+from typing import Tuple
+from fastapi import APIRouter, Depends, Header, Request, status
+from app.core.exceptions import FileProcessingException
+from app.dependencies import get_current_active_user, get_upload_session_service
+from app.schemas.task import TaskResponse
+from app.schemas.upload_session import UploadSessionCreate, UploadSessionResponse
+from app.schemas.user import UserResponse
+from app.services.interfaces.upload_session_service import IUploadSessionService
+
+upload_sessions_router = APIRouter(prefix="/files/uploads", tags=["upload sessions"])
+
+CONTENT_RANGE_PATTERN = re.compile(r"^bytes (\d+)-(\d+)/(\d+|\*)$")
+
+
+def parse_content_range(content_range: str = Header(...)) -> Tuple[int, int]:
+    """
+    Возвращает начальный offset и длину диапазона из заголовка
+    Content-Range: bytes <start>-<end>/<total>
+    """
+    match = CONTENT_RANGE_PATTERN.match(content_range.strip())
+    if not match or int(match.group(2)) < int(match.group(1)):
+        raise FileProcessingException("Invalid Content-Range header")
+    start, end = int(match.group(1)), int(match.group(2))
+    return start, end - start + 1
+
+
+@upload_sessions_router.post("", response_model=UploadSessionResponse, status_code=status.HTTP_201_CREATED)
+async def create_upload_session(
+    session_data: UploadSessionCreate,
+    current_user: UserResponse = Depends(get_current_active_user),
+    session_service: IUploadSessionService = Depends(get_upload_session_service)
+):
+    """
+    Открытие сессии возобновляемой загрузки
+    """
+    return await session_service.create_session(current_user.id, session_data)
+
+@upload_sessions_router.get("/{session_id}", response_model=UploadSessionResponse)
+async def get_upload_session(
+    session_id: uuid.UUID,
+    current_user: UserResponse = Depends(get_current_active_user),
+    session_service: IUploadSessionService = Depends(get_upload_session_service)
+):
+    """
+    Состояние сессии: received_bytes - offset, с которого нужно продолжать загрузку
+    """
+    return await session_service.get_session(current_user.id, session_id)
+
+@upload_sessions_router.put("/{session_id}", response_model=UploadSessionResponse)
+async def upload_chunk(
+    session_id: uuid.UUID,
+    request: Request,
+    content_range: Tuple[int, int] = Depends(parse_content_range),
+    current_user: UserResponse = Depends(get_current_active_user),
+    session_service: IUploadSessionService = Depends(get_upload_session_service)
+):
+    """
+    Загрузка диапазона байт, тело запроса читается потоково
+    """
+    offset, length = content_range
+    return await session_service.upload_chunk(current_user.id, session_id, offset, length, request.stream())
+
+@upload_sessions_router.post("/{session_id}/complete", response_model=TaskResponse)
+async def complete_upload_session(
+    session_id: uuid.UUID,
+    current_user: UserResponse = Depends(get_current_active_user),
+    session_service: IUploadSessionService = Depends(get_upload_session_service)
+):
+    """
+    Завершение загрузки и создание задачи обработки
+    """
+    return await session_service.complete_session(current_user.id, session_id)
+
+@upload_sessions_router.delete("/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def abort_upload_session(
+    session_id: uuid.UUID,
+    current_user: UserResponse = Depends(get_current_active_user),
+    session_service: IUploadSessionService = Depends(get_upload_session_service)
+):
+    await session_service.abort_session(current_user.id, session_id)
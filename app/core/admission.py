@@ -0,0 +1,169 @@
+from collections import defaultdict
+from typing import Dict, Optional
+
+from fastapi import status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.exceptions import TooManyRequestsException
+from app.core.security import verify_token
+
+
+class AdmissionController:
+    """
+    Ограничивает объем одновременно принимаемых загрузок и длину очереди задач.
+
+    Байты загрузок резервируются до чтения тела запроса (по Content-Length)
+    и освобождаются по завершении ответа, глобально и на пользователя.
+    Запрос больше самого лимита не поместится никогда и отклоняется (413),
+    а не ждет освобождения места.
+    Счетчики живут в процессе: при нескольких воркерах uvicorn лимит байт
+    действует на каждый процесс. Очередь задач считается по БД и общая для всех.
+    """
+
+    def __init__(
+        self,
+        max_inflight_bytes: int,
+        max_user_inflight_bytes: int,
+        max_queued_tasks: int,
+        max_user_queued_tasks: int,
+        retry_after_seconds: int
+    ):
+        self.max_inflight_bytes = max_inflight_bytes
+        self.max_user_inflight_bytes = max_user_inflight_bytes
+        self.max_queued_tasks = max_queued_tasks
+        self.max_user_queued_tasks = max_user_queued_tasks
+        self.retry_after_seconds = retry_after_seconds
+
+        self.inflight_bytes = 0
+        self.inflight_uploads = 0
+        self._user_inflight_bytes: Dict[str, int] = defaultdict(int)
+        self.rejected_uploads = 0
+        self.rejected_tasks = 0
+
+    def fits_upload_budget(self, user_key: Optional[str], nbytes: int) -> bool:
+        """Может ли загрузка в nbytes когда-нибудь быть зарезервирована"""
+        limit = self.max_user_inflight_bytes if user_key else self.max_inflight_bytes
+        return nbytes <= min(limit, self.max_inflight_bytes)
+
+    def try_reserve_upload(self, user_key: Optional[str], nbytes: int) -> bool:
+        """
+        Резервирует nbytes под загрузку. Вызывается из event loop без await
+        между проверкой и изменением, поэтому блокировка не нужна.
+        """
+        if self.inflight_bytes + nbytes > self.max_inflight_bytes or (
+            user_key and self._user_inflight_bytes[user_key] + nbytes > self.max_user_inflight_bytes
+        ):
+            self.rejected_uploads += 1
+            return False
+
+        self.inflight_bytes += nbytes
+        self.inflight_uploads += 1
+        if user_key:
+            self._user_inflight_bytes[user_key] += nbytes
+        return True
+
+    def release_upload(self, user_key: Optional[str], nbytes: int) -> None:
+        """Освобождает ровно то, что зарезервировал try_reserve_upload"""
+        self.inflight_bytes -= nbytes
+        self.inflight_uploads -= 1
+        if user_key:
+            self._user_inflight_bytes[user_key] -= nbytes
+            if self._user_inflight_bytes[user_key] <= 0:
+                del self._user_inflight_bytes[user_key]
+
+    def check_task_capacity(self, queued_tasks: int, user_queued_tasks: int, new_tasks: int) -> None:
+        """Отклоняет новые задачи (429), если очередь переполнена"""
+        if queued_tasks + new_tasks > self.max_queued_tasks:
+            self.rejected_tasks += 1
+            raise TooManyRequestsException("Processing queue is full", self.retry_after_seconds)
+        if user_queued_tasks + new_tasks > self.max_user_queued_tasks:
+            self.rejected_tasks += 1
+            raise TooManyRequestsException(
+                f"Too many queued tasks (max {self.max_user_queued_tasks} per user)",
+                self.retry_after_seconds
+            )
+
+    def get_stats(self) -> dict:
+        return {
+            "inflight_upload_bytes": self.inflight_bytes,
+            "inflight_uploads": self.inflight_uploads,
+            "rejected_uploads": self.rejected_uploads,
+            "rejected_tasks": self.rejected_tasks,
+        }
+
+
+class UploadAdmissionMiddleware:
+    """
+    ASGI-middleware, которое резервирует байты загрузки до того, как
+    FastAPI начнет читать multipart-тело. Если лимит исчерпан, запрос
+    сразу получает 429 с Retry-After, а если запрос больше самого лимита -
+    413; тело на диск не пишется.
+    """
+
+    UPLOAD_PATH_PREFIX = "/api/files/upload"
+    UPLOAD_METHODS = ("POST", "PUT")
+
+    def __init__(self, app: ASGIApp, controller: "AdmissionController"):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in self.UPLOAD_METHODS
+            or not scope["path"].startswith(self.UPLOAD_PATH_PREFIX)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        nbytes = self._get_content_length(headers)
+        user_key = self._get_user_key(headers)
+        if not self.controller.fits_upload_budget(user_key, nbytes):
+            self.controller.rejected_uploads += 1
+            response = JSONResponse(
+                {"detail": "Upload is larger than the in-flight upload limit, split it into smaller requests"},
+                status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            )
+            await response(scope, receive, send)
+            return
+        if not self.controller.try_reserve_upload(user_key, nbytes):
+            response = JSONResponse(
+                {"detail": "Too many uploads in progress, retry later"},
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers={"Retry-After": str(self.controller.retry_after_seconds)},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release_upload(user_key, nbytes)
+
+    @staticmethod
+    def _get_content_length(headers: dict) -> int:
+        try:
+            return max(int(headers[b"content-length"]), 0)
+        except (KeyError, ValueError):
+            # Длина неизвестна (chunked): резервируем как под файл максимального размера
+            return settings.MAX_FILE_SIZE
+
+    @staticmethod
+    def _get_user_key(headers: dict) -> Optional[str]:
+        scheme, _, token = headers.get(b"authorization", b"").decode("latin-1").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return None
+        payload = verify_token(token)
+        return payload.get("user_id") if payload else None
+
+
+admission_controller = AdmissionController(
+    max_inflight_bytes=settings.MAX_INFLIGHT_UPLOAD_BYTES,
+    max_user_inflight_bytes=settings.MAX_USER_INFLIGHT_UPLOAD_BYTES,
+    max_queued_tasks=settings.MAX_QUEUED_TASKS,
+    max_user_queued_tasks=settings.MAX_USER_QUEUED_TASKS,
+    retry_after_seconds=settings.ADMISSION_RETRY_AFTER_SECONDS,
+)
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import computed_field
 from pydantic_settings import BaseSettings
 
@@ -34,10 +35,105 @@ class Settings(BaseSettings):
     UPLOAD_DIR: str = "uploads"
     MAX_FILE_SIZE: int = 50 * 1024 * 1024  # 50MB
     MAX_USER_STORAGE: int = 500 * 1024 * 1024  # 500MB
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # 1MB
+    UPLOAD_SESSION_TTL_HOURS: int = 24
+    UPLOAD_SESSION_CLEANUP_INTERVAL_SECONDS: float = 600
+    MAX_BATCH_FILES: int = 500
+
+    # Admission control (превышение лимитов -> 429 с Retry-After)
+    MAX_INFLIGHT_UPLOAD_BYTES: int = 1024 * 1024 * 1024  # 1GB на процесс
+    MAX_USER_INFLIGHT_UPLOAD_BYTES: int = 256 * 1024 * 1024  # 256MB
+    MAX_QUEUED_TASKS: int = 10000
+    MAX_USER_QUEUED_TASKS: int = 1000
+    ADMISSION_RETRY_AFTER_SECONDS: int = 5
+
+    # Storage
+    STORAGE_BACKEND: str = "local"  # local | s3
+    # В UPLOAD_DIR лежат части сессий загрузки и кэш результатов. С s3 узлов
+    # API и воркеров несколько, поэтому UPLOAD_DIR должен быть общим томом
+    # (или сессии загрузки закреплены за узлом балансировщиком); это
+    # подтверждается явно, иначе процесс не запустится
+    UPLOAD_DIR_SHARED: bool = False
+    S3_ENDPOINT_URL: Optional[str] = None
+    S3_REGION: Optional[str] = None
+    S3_BUCKET: str = "file-processing"
+    S3_ACCESS_KEY_ID: Optional[str] = None
+    S3_SECRET_ACCESS_KEY: Optional[str] = None
+    S3_PRESIGNED_URL_EXPIRE_SECONDS: int = 3600
+
+    # Downloads
+    # Если задан, файлы отдаются через X-Accel-Redirect (nginx sendfile) по этому internal location
+    DOWNLOAD_ACCEL_REDIRECT_LOCATION: Optional[str] = None
+
+    # Изображения: лимит по заголовку (decompression bomb) и бюджет декодированных
+    # пикселей на слот воркера; больше бюджета PNG масштабируется полосами
+    MAX_IMAGE_PIXELS: int = 500_000_000
+    IMAGE_PIXEL_BUDGET: int = 50_000_000  # ~200MB в RGBA
+    IMAGE_STRIP_PIXELS: int = 4_000_000
+
+    # TrueType-шрифт для текста вне WinAnsi (кириллица и т.п.) в TXT -> PDF;
+    # встраивается подмножеством. Моноширинный: верстка рассчитана на Courier
+    PDF_UNICODE_FONT_PATH: Optional[str] = "/usr/share/fonts/truetype/dejavu/DejaVuSansMono.ttf"
+
+    # Промежуточные результаты конвейера держатся в памяти до этого размера
+    PIPELINE_SPOOL_MAX_BYTES: int = 64 * 1024 * 1024
+
+    # Processing result cache
+    RESULT_CACHE_MAX_BYTES: int = 2 * 1024 * 1024 * 1024  # 2GB
 
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
 
+    # Прогресс задач: промежуточные значения идут в Redis, в БД - только вехи
+    TASK_PROGRESS_MIN_DELTA: int = 5  # проценты
+    TASK_PROGRESS_MIN_INTERVAL_SECONDS: float = 1.0
+    TASK_PROGRESS_MILESTONES: list = [25, 50, 75]
+    TASK_PROGRESS_TTL_SECONDS: int = 3600
+    # Как часто воркер проверяет запрос отмены в точках прогресса обработчика
+    TASK_CANCEL_CHECK_INTERVAL_SECONDS: float = 0.5
+    # Аренда задачи воркером: продлевается фоном раз в TASK_LEASE_HEARTBEAT_SECONDS,
+    # пока работает обработчик; просроченная задача возвращается в очередь, пока
+    # число попыток не достигнет TASK_MAX_ATTEMPTS
+    TASK_LEASE_SECONDS: int = 300
+    TASK_LEASE_HEARTBEAT_SECONDS: int = 30
+    TASK_MAX_ATTEMPTS: int = 3
+
+    # Celery (по умолчанию брокером служит REDIS_URL; memory:// - брокер в памяти процесса)
+    CELERY_BROKER_URL: Optional[str] = None
+    CELERY_VISIBILITY_TIMEOUT_SECONDS: int = 3600
+    # Воркер внутри процесса API (для брокера memory:// в сквозных тестах)
+    CELERY_EMBEDDED_WORKER: bool = False
+    CELERY_EMBEDDED_WORKER_CONCURRENCY: int = 4
+
+    # Пул соединений с БД на процесс воркера
+    WORKER_DB_POOL_SIZE: int = 5
+    WORKER_DB_MAX_OVERFLOW: int = 5
+
+    # Ретранслятор исходящего ящика задач в брокер (работает в процессе API)
+    OUTBOX_RELAY_ENABLED: bool = True
+    OUTBOX_RELAY_BATCH_SIZE: int = 500
+    OUTBOX_RELAY_POLL_INTERVAL_SECONDS: float = 1.0
+    # Периодическое обслуживание в процессе API (app.jobs.maintenance)
+    MAINTENANCE_ENABLED: bool = True
+    # Сверка users.storage_used_bytes с таблицей files (app.jobs.reconcile_storage)
+    STORAGE_RECONCILE_INTERVAL_SECONDS: float = 6 * 60 * 60
+    # Сколько задач пакетной загрузки уходит в одном сообщении быстрой полосы:
+    # задачи сообщения выполняются по очереди в одном слоте воркера, поэтому
+    # пачка делится на несколько сообщений; в полосе bulk - по одной задаче
+    TASK_MESSAGE_MAX_TASKS: int = 4
+
+    # Пулы воркеров по классам стоимости: cpu (изображения), io (архивы), light (текст)
+    WORKER_CPU_CONCURRENCY: int = 2
+    WORKER_CPU_PREFETCH_MULTIPLIER: int = 1
+    WORKER_IO_CONCURRENCY: int = 8
+    WORKER_IO_PREFETCH_MULTIPLIER: int = 2
+    WORKER_LIGHT_CONCURRENCY: int = 4
+    WORKER_LIGHT_PREFETCH_MULTIPLIER: int = 4
+    # Задачи дороже этого (размер входа, взвешенный по операциям) идут в полосу bulk
+    BULK_LANE_MIN_COST: int = 5 * 1024 * 1024  # 5MB
+    # Доля слотов класса, отводимая воркеру полосы bulk
+    BULK_LANE_SLOT_SHARE: float = 0.25
+
     ALLOWED_ORIGINS: list = ["http://localhost:3000", "http://127.0.0.1:3000"]
 
     class Config:
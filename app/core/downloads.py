@@ -0,0 +1,88 @@
+import os
+from email.utils import formatdate, parsedate_to_datetime
+
+from fastapi import Request, Response, status
+from fastapi.responses import FileResponse, RedirectResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.exceptions import FileNotFoundException
+from app.schemas.file import FileDownloadInfo
+from app.storage import IStorageBackend
+
+
+def _stat_file(path: str) -> os.stat_result:
+    try:
+        return os.stat(path)
+    except FileNotFoundError:
+        raise FileNotFoundException()
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def _not_modified_since(if_modified_since: str, mtime: float) -> bool:
+    try:
+        return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+async def build_download_response(
+    request: Request,
+    download: FileDownloadInfo,
+    storage: IStorageBackend
+) -> Response:
+    """
+    Отдает файл с поддержкой Range, ETag/If-None-Match и Last-Modified/If-Modified-Since.
+
+    Тело не читается в память Python. Для удаленного хранилища клиент
+    перенаправляется на прямую ссылку. Для локального при
+    DOWNLOAD_ACCEL_REDIRECT_LOCATION отправка делегируется nginx
+    (sendfile + Range), иначе используется FileResponse, который отдает файл
+    через http.response.pathsend, если сервер его поддерживает, или чанками
+    из пула потоков.
+    """
+    path = storage.get_local_path(download.storage_key)
+    if path is None:
+        url = await storage.get_download_url(download.storage_key, download.filename, download.media_type)
+        if not url:
+            raise FileNotFoundException()
+        return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+
+    stat_result = await run_in_threadpool(_stat_file, path)
+    etag = f'"{download.etag}"' if download.etag else f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stat_result.st_mtime, usegmt=True),
+        "Cache-Control": "private, max-age=31536000, immutable" if download.immutable else "private, no-cache",
+        "Accept-Ranges": "bytes",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if (if_none_match and _etag_matches(if_none_match, etag)) or (
+        not if_none_match and if_modified_since and _not_modified_since(if_modified_since, stat_result.st_mtime)
+    ):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response = FileResponse(
+        path,
+        media_type=download.media_type,
+        filename=download.filename,
+        stat_result=stat_result,
+        headers=headers,
+    )
+
+    if settings.DOWNLOAD_ACCEL_REDIRECT_LOCATION:
+        relative_path = os.path.relpath(path, settings.UPLOAD_DIR).replace(os.sep, "/")
+        accel_headers = {
+            key: value for key, value in response.headers.items()
+            if key.lower() not in ("content-length", "content-type")
+        }
+        accel_headers["X-Accel-Redirect"] = f"{settings.DOWNLOAD_ACCEL_REDIRECT_LOCATION.rstrip('/')}/{relative_path}"
+        return Response(media_type=download.media_type, headers=accel_headers)
+
+    return response
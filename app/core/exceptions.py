@@ -39,6 +39,34 @@ class TaskNotFoundException(HTTPException):
             detail=detail
         )
 
+class TaskResultNotReadyException(HTTPException):
+    def __init__(self, task_id: str):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Result of task {task_id} is not available"
+        )
+
+class TaskNotCancellableException(HTTPException):
+    def __init__(self, task_id: str, task_status: str):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Task {task_id} is already {task_status} and cannot be cancelled"
+        )
+
+class TaskCancelledException(HTTPException):
+    def __init__(self, task_id: str):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Task {task_id} was cancelled"
+        )
+
+class TaskLeaseLostException(HTTPException):
+    def __init__(self, task_id: str):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Task {task_id} is no longer leased by this worker"
+        )
+
 class UserNotFoundException(HTTPException):
     def __init__(self):
         super().__init__(
@@ -90,3 +118,41 @@ class DuplicateFileException(HTTPException):
             detail=f"File with name '{filename}' already exists"
         )
 
+class UploadSessionNotFoundException(HTTPException):
+    def __init__(self, session_id: str = None):
+        detail = "Upload session not found"
+        if session_id:
+            detail = f"Upload session with id {session_id} not found"
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=detail
+        )
+
+class UploadOffsetMismatchException(HTTPException):
+    def __init__(self, expected_offset: int, received_offset: int):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Upload offset mismatch. Expected: {expected_offset}, received: {received_offset}",
+            headers={"Upload-Offset": str(expected_offset)},
+        )
+
+class UploadSessionStateException(HTTPException):
+    def __init__(self, detail: str):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=detail
+        )
+
+class TooManyRequestsException(HTTPException):
+    def __init__(self, detail: str, retry_after: int):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)},
+        )
+
+class ImageTooLargeException(FileProcessingException):
+    def __init__(self, width: int, height: int, max_pixels: int):
+        super().__init__(
+            detail=f"Image of {width}x{height} pixels exceeds the limit of {max_pixels} pixels"
+        )
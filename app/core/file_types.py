@@ -0,0 +1,203 @@
+import struct
+from dataclasses import dataclass
+from typing import List, Optional
+
+from app.core.exceptions import UnsupportedFileTypeException
+from app.schemas.file import (
+    FileConversionParameters,
+    FileOperationType,
+    ImageFormat,
+    RenditionParameters,
+    get_operation_chain,
+)
+
+# Сколько первых байт файла достаточно для определения типа по сигнатуре
+SNIFF_BYTES = 8192
+
+# Расширение результата для каждой операции (None - совпадает с исходным)
+RESULT_EXTENSIONS = {
+    FileOperationType.CONVERT_JPG_TO_PNG: "png",
+    FileOperationType.CONVERT_PNG_TO_JPG: "jpg",
+    FileOperationType.CONVERT_TXT_TO_PDF: "pdf",
+    FileOperationType.COMPRESS_ZIP: "zip",
+    FileOperationType.RESIZE_IMAGE: None,
+}
+
+IMAGE_MIME_TYPES = frozenset({
+    "image/jpeg",
+    "image/png",
+    "image/gif",
+    "image/webp",
+    "image/bmp",
+    "image/tiff",
+})
+
+# Форматы с регулируемым качеством: только для них действует target_size_bytes
+LOSSY_IMAGE_MIME_TYPES = frozenset({"image/jpeg", "image/webp"})
+
+# Расширение и MIME-тип рендишена в явно заданном формате
+IMAGE_FORMAT_EXTENSIONS = {
+    ImageFormat.JPEG: "jpg",
+    ImageFormat.PNG: "png",
+    ImageFormat.WEBP: "webp",
+}
+
+# Форматы, которые уже сжаты: повторное deflate-сжатие почти ничего не дает
+COMPRESSED_MIME_TYPES = frozenset({
+    "image/jpeg",
+    "image/png",
+    "image/gif",
+    "image/webp",
+    "application/zip",
+    "application/gzip",
+    "application/x-7z-compressed",
+    "application/vnd.rar",
+})
+
+# Какое содержимое принимает операция (None - любое)
+OPERATION_INPUT_TYPES = {
+    FileOperationType.CONVERT_JPG_TO_PNG: frozenset({"image/jpeg"}),
+    FileOperationType.CONVERT_PNG_TO_JPG: frozenset({"image/png"}),
+    FileOperationType.CONVERT_TXT_TO_PDF: frozenset({"text/plain"}),
+    FileOperationType.COMPRESS_ZIP: None,
+    FileOperationType.RESIZE_IMAGE: IMAGE_MIME_TYPES,
+}
+
+
+@dataclass(frozen=True)
+class DetectedFileType:
+    """Тип содержимого, определенный по первым байтам файла"""
+    mime_type: str
+    extension: Optional[str]
+
+
+UNKNOWN_FILE_TYPE = DetectedFileType("application/octet-stream", None)
+TEXT_FILE_TYPE = DetectedFileType("text/plain", "txt")
+
+# Тип содержимого, которое отдает операция (None - тот же, что на входе)
+OPERATION_OUTPUT_TYPES = {
+    FileOperationType.CONVERT_JPG_TO_PNG: DetectedFileType("image/png", "png"),
+    FileOperationType.CONVERT_PNG_TO_JPG: DetectedFileType("image/jpeg", "jpg"),
+    FileOperationType.CONVERT_TXT_TO_PDF: DetectedFileType("application/pdf", "pdf"),
+    FileOperationType.COMPRESS_ZIP: DetectedFileType("application/zip", "zip"),
+    FileOperationType.RESIZE_IMAGE: None,
+}
+
+# (смещение, сигнатура, тип)
+_SIGNATURES = (
+    (0, b"\xff\xd8\xff", DetectedFileType("image/jpeg", "jpg")),
+    (0, b"\x89PNG\r\n\x1a\n", DetectedFileType("image/png", "png")),
+    (0, b"GIF87a", DetectedFileType("image/gif", "gif")),
+    (0, b"GIF89a", DetectedFileType("image/gif", "gif")),
+    (0, b"II*\x00", DetectedFileType("image/tiff", "tiff")),
+    (0, b"MM\x00*", DetectedFileType("image/tiff", "tiff")),
+    (0, b"%PDF-", DetectedFileType("application/pdf", "pdf")),
+    (0, b"PK\x03\x04", DetectedFileType("application/zip", "zip")),
+    (0, b"PK\x05\x06", DetectedFileType("application/zip", "zip")),
+    (0, b"\x1f\x8b", DetectedFileType("application/gzip", "gz")),
+    (0, b"7z\xbc\xaf\x27\x1c", DetectedFileType("application/x-7z-compressed", "7z")),
+    (0, b"Rar!\x1a\x07", DetectedFileType("application/vnd.rar", "rar")),
+    (257, b"ustar", DetectedFileType("application/x-tar", "tar")),
+)
+
+# Размеры DIB-заголовка BMP: BITMAPCOREHEADER, BITMAPINFOHEADER, V2, V3, V4, V5
+_BMP_DIB_HEADER_SIZES = frozenset({12, 40, 52, 56, 108, 124})
+
+# Управляющие байты, которых не бывает в тексте (кроме \t \n \f \r и ESC)
+_BINARY_BYTES = bytes(set(range(0x20)) - {0x09, 0x0A, 0x0C, 0x0D, 0x1B})
+
+
+def sniff_file_type(head: bytes) -> DetectedFileType:
+    """
+    Определяет тип содержимого по сигнатуре в первых байтах файла.
+    Все, что не похоже на известный формат и не содержит управляющих
+    байт, считается текстом.
+    """
+    for offset, signature, file_type in _SIGNATURES:
+        if head.startswith(signature, offset):
+            return file_type
+    if head.startswith(b"RIFF") and head[8:12] == b"WEBP":
+        return DetectedFileType("image/webp", "webp")
+    if _is_bmp(head):
+        return DetectedFileType("image/bmp", "bmp")
+    if head and head.translate(None, _BINARY_BYTES) == head:
+        return TEXT_FILE_TYPE
+    return UNKNOWN_FILE_TYPE
+
+
+def _is_bmp(head: bytes) -> bool:
+    """
+    Двух байт "BM" мало (так начинается и обычный текст): проверяется
+    заголовок файла - размер не меньше заголовков, нулевые резервные поля
+    и известный размер DIB-заголовка
+    """
+    if len(head) < 18 or not head.startswith(b"BM"):
+        return False
+    file_size, reserved, dib_header_size = struct.unpack_from("<IIxxxxI", head, 2)
+    return (
+        reserved == 0
+        and dib_header_size in _BMP_DIB_HEADER_SIZES
+        and file_size >= 14 + dib_header_size
+    )
+
+
+def ensure_operation_accepts(
+    operation: FileOperationType,
+    file_type: DetectedFileType,
+    parameters: Optional[FileConversionParameters] = None
+) -> None:
+    """
+    Отклоняет содержимое, которое операция не умеет обрабатывать. Для
+    конвейера проверяется каждый шаг по типу результата предыдущего.
+    target_size_bytes допускается только для шагов и рендишенов, результат
+    которых - JPEG или WebP
+    """
+    source_type = file_type
+    for step, target_size_bytes in zip(get_operation_chain(operation, parameters), _get_target_sizes(parameters)):
+        accepted = OPERATION_INPUT_TYPES.get(step)
+        if accepted is not None and file_type.mime_type not in accepted:
+            raise UnsupportedFileTypeException(
+                f"{file_type.mime_type} (operation {step.value} accepts {', '.join(sorted(accepted))})"
+            )
+        file_type = OPERATION_OUTPUT_TYPES.get(step) or file_type
+        _ensure_target_size_applies(target_size_bytes, file_type)
+
+    for rendition in (parameters.renditions if parameters else None) or []:
+        if not rendition.format:
+            _ensure_target_size_applies(rendition.target_size_bytes, source_type)
+
+
+def _get_target_sizes(parameters: Optional[FileConversionParameters]) -> List[Optional[int]]:
+    """target_size_bytes основной операции и шагов конвейера по порядку"""
+    if not parameters:
+        return [None]
+    # С рендишенами размер задается у каждого из них
+    sizes = [None if parameters.renditions else parameters.target_size_bytes]
+    return sizes + [step.target_size_bytes for step in parameters.pipeline or []]
+
+
+def _ensure_target_size_applies(target_size_bytes: Optional[int], output_type: DetectedFileType) -> None:
+    if target_size_bytes and output_type.mime_type not in LOSSY_IMAGE_MIME_TYPES:
+        raise UnsupportedFileTypeException(
+            f"{output_type.mime_type} (target_size_bytes needs a jpeg or webp result)"
+        )
+
+
+def get_result_extension(
+    operation: FileOperationType,
+    source_extension: Optional[str],
+    parameters: Optional[dict] = None
+) -> str:
+    """Возвращает расширение файла-результата операции или конвейера (без точки)"""
+    extension = source_extension
+    chain_parameters = FileConversionParameters.model_validate(parameters) if parameters else None
+    for step in get_operation_chain(operation, chain_parameters):
+        extension = RESULT_EXTENSIONS.get(step) or extension
+    return (extension or "bin").lstrip(".").lower()
+
+
+def get_rendition_extension(rendition: RenditionParameters, source_extension: Optional[str]) -> str:
+    """Расширение рендишена: по заданному формату или как у исходника"""
+    if rendition.format:
+        return IMAGE_FORMAT_EXTENSIONS[rendition.format]
+    return get_result_extension(FileOperationType.RESIZE_IMAGE, source_extension)
@@ -0,0 +1,215 @@
+import hashlib
+import os
+from dataclasses import dataclass
+from typing import AsyncIterator, BinaryIO, List, Optional
+
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.exceptions import FileTooLargeException
+from app.core.file_types import (
+    SNIFF_BYTES,
+    UNKNOWN_FILE_TYPE,
+    DetectedFileType,
+    ensure_operation_accepts,
+    sniff_file_type,
+)
+from app.schemas.file import FileConversionParameters, FileOperationType
+
+
+@dataclass
+class StoredUpload:
+    """Результат потоковой записи загруженного файла на диск"""
+    path: str
+    size: int
+    sha256: str
+    file_type: DetectedFileType = UNKNOWN_FILE_TYPE
+
+
+def _write_chunk(target: BinaryIO, hasher, chunk: bytes) -> None:
+    """Записывает чанк и обновляет хэш (выполняется в пуле потоков)"""
+    target.write(chunk)
+    hasher.update(chunk)
+
+
+def _remove_silently(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+async def stream_upload_to_disk(
+    upload: UploadFile,
+    destination: str,
+    max_size: int = None,
+    chunk_size: int = None,
+    operation: Optional[FileOperationType] = None,
+    parameters: Optional[FileConversionParameters] = None
+) -> StoredUpload:
+    """
+    Потоково записывает UploadFile в destination чанками фиксированного размера.
+
+    Запись и хэширование выполняются вне event loop, в памяти одновременно
+    находится не больше одного чанка. При превышении max_size запись
+    прерывается, частично записанный файл удаляется. Тип содержимого
+    определяется по первым байтам до начала записи; если передана operation,
+    неподходящий для нее (или для шагов конвейера из parameters) файл
+    отклоняется, не касаясь диска.
+    """
+    max_size = max_size or settings.MAX_FILE_SIZE
+    chunk_size = max(chunk_size or settings.UPLOAD_CHUNK_SIZE, SNIFF_BYTES)
+
+    if upload.size is not None and upload.size > max_size:
+        raise FileTooLargeException(max_size)
+
+    file_type = sniff_file_type(await upload.read(SNIFF_BYTES))
+    if operation is not None:
+        ensure_operation_accepts(operation, file_type, parameters)
+    await upload.seek(0)
+
+    os.makedirs(os.path.dirname(destination) or ".", exist_ok=True)
+    temp_path = f"{destination}.part"
+    hasher = hashlib.sha256()
+    size = 0
+
+    target = await run_in_threadpool(open, temp_path, "wb")
+    try:
+        while chunk := await upload.read(chunk_size):
+            size += len(chunk)
+            if size > max_size:
+                raise FileTooLargeException(max_size)
+            await run_in_threadpool(_write_chunk, target, hasher, chunk)
+    except BaseException:
+        await run_in_threadpool(target.close)
+        await run_in_threadpool(_remove_silently, temp_path)
+        raise
+
+    await run_in_threadpool(target.close)
+    await run_in_threadpool(os.replace, temp_path, destination)
+    return StoredUpload(path=destination, size=size, sha256=hasher.hexdigest(), file_type=file_type)
+
+
+def _open_at_offset(path: str, offset: int) -> BinaryIO:
+    """Открывает файл на запись с позиции offset, отбрасывая все после нее"""
+    target = open(path, "r+b" if os.path.exists(path) else "wb")
+    target.truncate(offset)
+    target.seek(offset)
+    return target
+
+
+async def append_stream_to_file(
+    chunks: AsyncIterator[bytes],
+    path: str,
+    offset: int,
+    max_bytes: int,
+    chunk_size: int = None
+) -> int:
+    """
+    Дописывает поток байт в path начиная с offset.
+
+    Входящие куски буферизуются до chunk_size и пишутся вне event loop.
+    Возвращает количество записанных байт, при превышении max_bytes
+    поднимает FileTooLargeException (уже записанное остается на диске
+    и будет перезаписано при следующей попытке с того же offset).
+    """
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    buffer = bytearray()
+    written = 0
+
+    target = await run_in_threadpool(_open_at_offset, path, offset)
+    try:
+        async for data in chunks:
+            if written + len(buffer) + len(data) > max_bytes:
+                raise FileTooLargeException(max_bytes)
+            buffer += data
+            if len(buffer) >= chunk_size:
+                await run_in_threadpool(target.write, bytes(buffer))
+                written += len(buffer)
+                buffer.clear()
+        if buffer:
+            await run_in_threadpool(target.write, bytes(buffer))
+            written += len(buffer)
+    finally:
+        await run_in_threadpool(target.close)
+    return written
+
+
+async def check_stream_head(
+    chunks: AsyncIterator[bytes],
+    operation: FileOperationType,
+    parameters: Optional[FileConversionParameters] = None
+) -> AsyncIterator[bytes]:
+    """
+    Пропускает поток байт дальше только после того, как его первые SNIFF_BYTES
+    байт подтвердили, что операция (и шаги конвейера из parameters) умеет
+    обрабатывать такое содержимое
+    """
+    head = bytearray()
+    async for data in chunks:
+        if len(head) < SNIFF_BYTES:
+            head += data
+            if len(head) < SNIFF_BYTES:
+                continue
+            ensure_operation_accepts(operation, sniff_file_type(bytes(head)), parameters)
+            yield bytes(head)
+            continue
+        yield data
+    if head and len(head) < SNIFF_BYTES:
+        ensure_operation_accepts(operation, sniff_file_type(bytes(head)), parameters)
+        yield bytes(head)
+
+
+def _hash_file(path: str, chunk_size: int) -> StoredUpload:
+    hasher = hashlib.sha256()
+    size = 0
+    file_type = UNKNOWN_FILE_TYPE
+    with open(path, "rb") as source:
+        while chunk := source.read(chunk_size):
+            if not size:
+                file_type = sniff_file_type(chunk[:SNIFF_BYTES])
+            hasher.update(chunk)
+            size += len(chunk)
+    return StoredUpload(path=path, size=size, sha256=hasher.hexdigest(), file_type=file_type)
+
+
+async def hash_stored_file(path: str, chunk_size: int = None) -> StoredUpload:
+    """
+    Считает SHA-256 уже записанного файла и определяет его тип,
+    читая файл чанками вне event loop
+    """
+    chunk_size = max(chunk_size or settings.UPLOAD_CHUNK_SIZE, SNIFF_BYTES)
+    return await run_in_threadpool(_hash_file, path, chunk_size)
+
+
+def _concatenate_files(parts: List[str], destination: str, chunk_size: int) -> StoredUpload:
+    hasher = hashlib.sha256()
+    size = 0
+    file_type = UNKNOWN_FILE_TYPE
+    temp_path = f"{destination}.tmp"
+    try:
+        with open(temp_path, "wb") as target:
+            for part in parts:
+                with open(part, "rb") as source:
+                    while chunk := source.read(chunk_size):
+                        if not size:
+                            file_type = sniff_file_type(chunk[:SNIFF_BYTES])
+                        target.write(chunk)
+                        hasher.update(chunk)
+                        size += len(chunk)
+        os.replace(temp_path, destination)
+    except BaseException:
+        _remove_silently(temp_path)
+        raise
+    return StoredUpload(path=destination, size=size, sha256=hasher.hexdigest(), file_type=file_type)
+
+
+async def concatenate_stored_files(parts: List[str], destination: str, chunk_size: int = None) -> StoredUpload:
+    """
+    Склеивает части загрузки в destination за один проход, попутно считая
+    SHA-256 и определяя тип содержимого (вне event loop)
+    """
+    chunk_size = max(chunk_size or settings.UPLOAD_CHUNK_SIZE, SNIFF_BYTES)
+    return await run_in_threadpool(_concatenate_files, parts, destination, chunk_size)
@@ -1,10 +1,24 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
+from app.core.admission import AdmissionController, admission_controller
 from app.database.session import AsyncSessionLocal
 from app.repositories.user_repository import UserRepository
 from app.repositories.token_repository import TokenRepository
+from app.repositories.file_repository import FileRepository
+from app.repositories.blob_repository import BlobRepository
+from app.repositories.task_repository import TaskRepository
+from app.repositories.task_result_repository import TaskResultRepository
+from app.repositories.upload_session_repository import UploadSessionRepository
 from app.services.auth_service import AuthService
+from app.services.file_service import FileService
+from app.services.outbox_relay import OutboxRelay, outbox_relay
+from app.services.progress_channel import TaskProgressChannel, task_progress_channel
+from app.services.result_cache import ResultCache, result_cache
+from app.services.task_dispatcher import TaskDispatcher, task_dispatcher
+from app.services.task_service import TaskService
+from app.storage import IStorageBackend, get_storage
+from app.services.upload_session_service import UploadSessionService
 from app.schemas.user import UserResponse
 
 
@@ -24,12 +38,78 @@ async def get_user_repository(db = Depends(get_db)) -> UserRepository:
 async def get_token_repository(db = Depends(get_db)) -> TokenRepository:
     return TokenRepository(db)
 
+async def get_file_repository(db = Depends(get_db)) -> FileRepository:
+    return FileRepository(db)
+
+async def get_blob_repository(db = Depends(get_db)) -> BlobRepository:
+    return BlobRepository(db)
+
+async def get_task_repository(db = Depends(get_db)) -> TaskRepository:
+    return TaskRepository(db)
+
+async def get_task_result_repository(db = Depends(get_db)) -> TaskResultRepository:
+    return TaskResultRepository(db)
+
+async def get_upload_session_repository(db = Depends(get_db)) -> UploadSessionRepository:
+    return UploadSessionRepository(db)
+
+def get_result_cache() -> ResultCache:
+    return result_cache
+
+def get_storage_backend() -> IStorageBackend:
+    return get_storage()
+
+def get_task_dispatcher() -> TaskDispatcher:
+    return task_dispatcher
+
+def get_admission_controller() -> AdmissionController:
+    return admission_controller
+
+def get_outbox_relay() -> OutboxRelay:
+    return outbox_relay
+
+def get_task_progress_channel() -> TaskProgressChannel:
+    return task_progress_channel
+
 async def get_auth_service(
     user_repo: UserRepository = Depends(get_user_repository),
     token_repo: TokenRepository = Depends(get_token_repository)
 ) -> AuthService:
     return AuthService(user_repo, token_repo)
 
+async def get_file_service(
+    file_repo: FileRepository = Depends(get_file_repository),
+    task_repo: TaskRepository = Depends(get_task_repository),
+    task_result_repo: TaskResultRepository = Depends(get_task_result_repository),
+    blob_repo: BlobRepository = Depends(get_blob_repository),
+    cache: ResultCache = Depends(get_result_cache),
+    storage: IStorageBackend = Depends(get_storage_backend),
+    relay: OutboxRelay = Depends(get_outbox_relay),
+    admission: AdmissionController = Depends(get_admission_controller),
+    progress_channel: TaskProgressChannel = Depends(get_task_progress_channel)
+) -> FileService:
+    return FileService(
+        file_repo, task_repo, task_result_repo, blob_repo, cache, storage, relay, admission, progress_channel
+    )
+
+async def get_task_service(
+    task_repo: TaskRepository = Depends(get_task_repository),
+    file_repo: FileRepository = Depends(get_file_repository),
+    task_result_repo: TaskResultRepository = Depends(get_task_result_repository),
+    cache: ResultCache = Depends(get_result_cache),
+    storage: IStorageBackend = Depends(get_storage_backend),
+    progress_channel: TaskProgressChannel = Depends(get_task_progress_channel),
+    dispatcher: TaskDispatcher = Depends(get_task_dispatcher)
+) -> TaskService:
+    return TaskService(task_repo, file_repo, task_result_repo, cache, storage, progress_channel, dispatcher)
+
+async def get_upload_session_service(
+    session_repo: UploadSessionRepository = Depends(get_upload_session_repository),
+    task_repo: TaskRepository = Depends(get_task_repository),
+    file_service: FileService = Depends(get_file_service)
+) -> UploadSessionService:
+    return UploadSessionService(session_repo, task_repo, file_service)
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     auth_service: AuthService = Depends(get_auth_service)
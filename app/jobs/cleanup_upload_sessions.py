@@ -0,0 +1,51 @@
+"""
+Прерывание просроченных сессий загрузки и удаление их временных файлов.
+
+Запускается периодически из процесса API (app.jobs.maintenance),
+вручную: python -m app.jobs.cleanup_upload_sessions
+"""
+import asyncio
+import logging
+
+from app.core.admission import admission_controller
+from app.database.session import AsyncSessionLocal
+from app.repositories.blob_repository import BlobRepository
+from app.repositories.file_repository import FileRepository
+from app.repositories.task_repository import TaskRepository
+from app.repositories.task_result_repository import TaskResultRepository
+from app.repositories.upload_session_repository import UploadSessionRepository
+from app.services.file_service import FileService
+from app.services.outbox_relay import outbox_relay
+from app.services.progress_channel import task_progress_channel
+from app.services.result_cache import result_cache
+from app.services.upload_session_service import UploadSessionService
+from app.storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+
+async def cleanup_expired_upload_sessions() -> int:
+    """Прерывает просроченные сессии, возвращает их количество"""
+    async with AsyncSessionLocal() as session:
+        task_repo = TaskRepository(session)
+        file_service = FileService(
+            FileRepository(session),
+            task_repo,
+            TaskResultRepository(session),
+            BlobRepository(session),
+            result_cache,
+            get_storage(),
+            outbox_relay,
+            admission_controller,
+            task_progress_channel,
+        )
+        service = UploadSessionService(UploadSessionRepository(session), task_repo, file_service)
+        removed = await service.cleanup_expired_sessions()
+    if removed:
+        logger.info("Removed %d expired upload session(s)", removed)
+    return removed
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(cleanup_expired_upload_sessions())
@@ -0,0 +1,57 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Tuple
+
+from app.core.config import settings
+from app.jobs.cleanup_upload_sessions import cleanup_expired_upload_sessions
+from app.jobs.reconcile_storage import reconcile_storage_usage
+
+logger = logging.getLogger(__name__)
+
+MaintenanceJob = Tuple[str, Callable[[], Awaitable[int]], float]
+
+
+class MaintenanceScheduler:
+    """
+    Периодически запускает обслуживающие задачи в процессе API.
+
+    Каждая задача работает в своем цикле с собственным интервалом; ошибка
+    задачи пишется в лог и не останавливает ни ее, ни остальные. Задачи
+    идемпотентны, поэтому их одновременный запуск в нескольких процессах
+    API безопасен.
+    """
+
+    def __init__(self, jobs: List[MaintenanceJob]):
+        self.jobs = jobs
+        self._runners: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        """Запускает циклы задач в текущем event loop"""
+        self._runners = [
+            asyncio.create_task(self._run(name, job, interval), name=f"maintenance-{name}")
+            for name, job, interval in self.jobs
+        ]
+
+    async def stop(self) -> None:
+        for runner in self._runners:
+            runner.cancel()
+        for runner in self._runners:
+            try:
+                await runner
+            except asyncio.CancelledError:
+                pass
+        self._runners = []
+
+    async def _run(self, name: str, job: Callable[[], Awaitable[int]], interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await job()
+            except Exception:
+                logger.exception("Maintenance job %s failed", name)
+
+
+maintenance_scheduler = MaintenanceScheduler([
+    ("cleanup-upload-sessions", cleanup_expired_upload_sessions, settings.UPLOAD_SESSION_CLEANUP_INTERVAL_SECONDS),
+    ("reconcile-storage", reconcile_storage_usage, settings.STORAGE_RECONCILE_INTERVAL_SECONDS),
+])
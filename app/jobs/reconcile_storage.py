@@ -0,0 +1,27 @@
+"""
+Сверка счетчиков users.storage_used_bytes с таблицей files.
+
+Запускается периодически из процесса API (app.jobs.maintenance),
+вручную: python -m app.jobs.reconcile_storage
+"""
+import asyncio
+import logging
+
+from app.database.session import AsyncSessionLocal
+from app.repositories.user_repository import UserRepository
+
+logger = logging.getLogger(__name__)
+
+
+async def reconcile_storage_usage() -> int:
+    """Исправляет расхождения счетчиков, возвращает количество исправленных пользователей"""
+    async with AsyncSessionLocal() as session:
+        repaired = await UserRepository(session).reconcile_storage_used()
+    if repaired:
+        logger.warning("Storage usage drift repaired for %d users", repaired)
+    return repaired
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(reconcile_storage_usage())
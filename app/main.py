@@ -1,9 +1,36 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 #from fastapi.staticfiles import StaticFiles
 #from app.views.routes import view_router
 from app.api import api_router
+from app.core.admission import UploadAdmissionMiddleware, admission_controller
+from app.core.config import settings
+from app.jobs.maintenance import maintenance_scheduler
+from app.services.outbox_relay import outbox_relay
+from app.storage import get_storage
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    get_storage()
+    worker = None
+    if settings.CELERY_EMBEDDED_WORKER:
+        from app.worker.embedded import start_embedded_worker
+
+        worker = start_embedded_worker()
+    if settings.OUTBOX_RELAY_ENABLED:
+        outbox_relay.start()
+    if settings.MAINTENANCE_ENABLED:
+        maintenance_scheduler.start()
+    yield
+    await maintenance_scheduler.stop()
+    await outbox_relay.stop()
+    if worker:
+        worker.stop()
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(UploadAdmissionMiddleware, controller=admission_controller)
 #app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
 #app.include_router(view_router, prefix="",)
@@ -11,5 +38,5 @@ app.include_router(api_router)
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return {"status": "healthy", "admission": admission_controller.get_stats()}
 
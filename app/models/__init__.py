@@ -1,6 +1,10 @@
 from .user import User
 from .task import Task
 from .file import File
+from .blob import Blob
 from .token import RefreshToken
+from .upload_session import UploadSession
+from .task_result import TaskResult
+from .task_outbox import TaskOutbox
 
-__all__ = ["User", "Task", "File", "RefreshToken"]
\ No newline at end of file
+__all__ = ["User", "Task", "File", "Blob", "RefreshToken", "UploadSession", "TaskResult", "TaskOutbox"]
\ No newline at end of file
@@ -0,0 +1,31 @@
+from app.database.base import Base
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+from sqlalchemy import DateTime, Integer, String, func
+from datetime import datetime
+
+class Blob(Base):
+    """
+    Содержимое файла, адресуемое по SHA-256.
+    Несколько File могут ссылаться на один Blob, ref_count - число таких ссылок.
+    """
+    __tablename__ = "blobs"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4
+    )
+
+    sha256: Mapped[str] = mapped_column(String(64), nullable=False, unique=True)
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
+    storage_path: Mapped[str] = mapped_column(String(512), nullable=False, unique=True)
+    ref_count: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now()
+    )
+
+    files = relationship("File", back_populates="blob", lazy="select")
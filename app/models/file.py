@@ -4,6 +4,7 @@ from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, func, Boolean
 import uuid
 from datetime import datetime
+from typing import Optional
 
 
 class File(Base):
@@ -23,16 +24,25 @@ class File(Base):
         index=True,
     )
 
+    blob_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("blobs.id", ondelete="RESTRICT"),
+        nullable=True,
+        index=True,
+    )
+
     original_filename: Mapped[str] = mapped_column(String(256), nullable=False)
     stored_filename: Mapped[str] = mapped_column(String(256), nullable=False)
-    file_path: Mapped[str] = mapped_column(String(512), nullable=False, unique=True)
+    file_path: Mapped[str] = mapped_column(String(512), nullable=False)
     file_size: Mapped[int] = mapped_column(Integer, nullable=False)
     mime_type: Mapped[str] = mapped_column(String(100), nullable=False)
     extension: Mapped[str] = mapped_column(String(10), nullable=False)
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True, index=True)
     uploaded_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     is_processed: Mapped[bool] = mapped_column(Boolean, default=False)
 
     user = relationship("User", back_populates="files", lazy="select")
+    blob = relationship("Blob", back_populates="files", lazy="select")
     tasks = relationship("Task", back_populates="file", cascade="all, delete-orphan", lazy="select")
 
     __table_args__ = (
@@ -40,3 +50,6 @@ class File(Base):
         Index('idx_files_processed', 'is_processed'),
     )
 
+    # Значения server_default возвращаются прямо из INSERT ... RETURNING
+    __mapper_args__ = {"eager_defaults": True}
+
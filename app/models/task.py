@@ -29,7 +29,8 @@ class Task(Base):
         index=True
     )
 
-    celery_task_id: Mapped[str] = mapped_column(String(256), nullable=False, index=True)
+    # ID сообщения Celery; пусто, пока задача ждет в исходящем ящике
+    celery_task_id: Mapped[Optional[str]] = mapped_column(String(256), nullable=True, index=True)
     operation_type: Mapped[str] = mapped_column(String(30), nullable=False, index=True)
     
     status: Mapped[str] = mapped_column(
@@ -44,6 +45,12 @@ class Task(Base):
     error_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     progress: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
 
+    # Аренда выполняющейся задачи воркером: владелец продлевает ее, пока
+    # работает, а просроченную задачу можно забрать заново
+    lease_owner: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    lease_expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), 
         nullable=False, 
@@ -55,14 +62,22 @@ class Task(Base):
 
     user = relationship("User", back_populates="tasks", lazy="select")
     file = relationship("File", back_populates="tasks", lazy="select")
+    results = relationship("TaskResult", back_populates="task", cascade="all, delete-orphan", lazy="select")
+    outbox = relationship(
+        "TaskOutbox", back_populates="task", cascade="all, delete-orphan", uselist=False, lazy="select"
+    )
 
 
     __table_args__ = (
         Index('ix_tasks_user_status', 'user_id', 'status'),
         Index('ix_tasks_status_created', 'status', 'created_at'),
         Index('ix_tasks_completed_at', 'completed_at'),
+        Index('ix_tasks_status_lease_expires_at', 'status', 'lease_expires_at'),
     )
 
+    # Значения server_default возвращаются прямо из INSERT ... RETURNING
+    __mapper_args__ = {"eager_defaults": True}
+
 
 
 
@@ -0,0 +1,40 @@
+from app.database.base import Base
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+from sqlalchemy import DateTime, ForeignKey, String, func
+from datetime import datetime
+
+class TaskOutbox(Base):
+    """
+    Запись исходящего ящика: задача, которую еще нужно отправить воркерам.
+    Пишется в одной транзакции с задачей и удаляется ретранслятором после
+    публикации сообщения. Записи с одним job_id уходят одним сообщением.
+    """
+    __tablename__ = "task_outbox"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4
+    )
+
+    task_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("tasks.id", ondelete="CASCADE"),
+        nullable=False,
+        unique=True
+    )
+
+    queue: Mapped[str] = mapped_column(String(32), nullable=False)
+    job_id: Mapped[str] = mapped_column(String(256), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        index=True
+    )
+
+    task = relationship("Task", back_populates="outbox", lazy="select")
+
+    __mapper_args__ = {"eager_defaults": True}
@@ -0,0 +1,46 @@
+from app.database.base import Base
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+from sqlalchemy import DateTime, ForeignKey, Integer, String, UniqueConstraint, func
+from datetime import datetime
+
+class TaskResult(Base):
+    """
+    Именованный результат задачи (например, рендишен изображения).
+    Задача с несколькими результатами хранит по строке на каждый.
+    """
+    __tablename__ = "task_results"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4
+    )
+
+    task_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("tasks.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+
+    name: Mapped[str] = mapped_column(String(32), nullable=False)
+    storage_key: Mapped[str] = mapped_column(String(500), nullable=False)
+    file_size: Mapped[int] = mapped_column(Integer, nullable=False)
+    mime_type: Mapped[str] = mapped_column(String(100), nullable=False)
+    width: Mapped[int] = mapped_column(Integer, nullable=False)
+    height: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now()
+    )
+
+    task = relationship("Task", back_populates="results", lazy="select")
+
+    __table_args__ = (
+        UniqueConstraint('task_id', 'name', name='uq_task_results_task_name'),
+    )
+
+    __mapper_args__ = {"eager_defaults": True}
@@ -0,0 +1,52 @@
+from app.database.base import Base
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+from sqlalchemy import ForeignKey, Index, String, JSON, Integer, DateTime, func
+from datetime import datetime
+from typing import Optional
+
+class UploadSession(Base):
+    __tablename__ = "upload_sessions"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4
+    )
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+
+    original_filename: Mapped[str] = mapped_column(String(256), nullable=False)
+    content_type: Mapped[str] = mapped_column(String(100), nullable=False)
+    operation_type: Mapped[str] = mapped_column(String(30), nullable=False)
+    parameters: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+
+    total_size: Mapped[int] = mapped_column(Integer, nullable=False)
+    received_bytes: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    temp_path: Mapped[str] = mapped_column(String(512), nullable=False)
+
+    status: Mapped[str] = mapped_column(String(15), nullable=False, default='active')
+    task_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("tasks.id", ondelete="SET NULL"),
+        nullable=True
+    )
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now()
+    )
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    user = relationship("User", lazy="select")
+
+    __table_args__ = (
+        Index('ix_upload_sessions_status_expires', 'status', 'expires_at'),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, String, DateTime, func
+from sqlalchemy import BigInteger, Boolean, String, DateTime, func
 from app.database.base import Base
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 from sqlalchemy.dialects.postgresql import UUID
@@ -27,6 +27,14 @@ class User(Base):
         nullable=True
     )
 
+    # Сумма file_size всех файлов пользователя, обновляется вместе с files
+    storage_used_bytes: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        default=0,
+        server_default="0"
+    )
+
     files = relationship("File", back_populates="user", cascade="all, delete-orphan", lazy="select")
     tasks = relationship("Task", back_populates="user", cascade="all, delete-orphan", lazy="select")
     refresh_tokens = relationship("RefreshToken", back_populates="user", cascade="all, delete-orphan", lazy="select")
@@ -0,0 +1,67 @@
+import importlib
+from typing import Dict, Optional
+
+from app.processing.base import FileProcessor, ProgressCallback
+from app.schemas.file import FileConversionParameters, FileOperationType
+
+# Обработчики операций в виде "модуль:Класс". Модуль импортируется при первом
+# обращении к операции, поэтому процесс загружает только кодеки (Pillow,
+# zlib, генератор PDF) тех операций, которые он действительно выполняет
+PROCESSORS: Dict[FileOperationType, str] = {
+    FileOperationType.CONVERT_JPG_TO_PNG: "app.processing.image:JpgToPngProcessor",
+    FileOperationType.CONVERT_PNG_TO_JPG: "app.processing.image:PngToJpgProcessor",
+    FileOperationType.CONVERT_TXT_TO_PDF: "app.processing.text:TxtToPdfProcessor",
+    FileOperationType.COMPRESS_ZIP: "app.processing.archive:ZipProcessor",
+    FileOperationType.RESIZE_IMAGE: "app.processing.image:ResizeImageProcessor",
+}
+
+_instances: Dict[FileOperationType, FileProcessor] = {}
+
+
+def register_processor(operation: FileOperationType, path: str) -> None:
+    """Регистрирует (или заменяет) обработчик операции по пути "модуль:Класс" """
+    operation = FileOperationType(operation)
+    PROCESSORS[operation] = path
+    _instances.pop(operation, None)
+
+
+def get_processor(operation: FileOperationType) -> FileProcessor:
+    """
+    Обработчик операции; при первом вызове импортирует его модуль.
+    ValueError, если операция пока не поддерживается
+    """
+    operation = FileOperationType(operation)
+    processor = _instances.get(operation)
+    if processor is not None:
+        return processor
+
+    try:
+        path = PROCESSORS[operation]
+    except KeyError:
+        raise ValueError(f"No processor registered for operation {operation}")
+    module_name, _, class_name = path.partition(":")
+    processor_class = getattr(importlib.import_module(module_name), class_name)
+    processor = _instances[operation] = processor_class()
+    return processor
+
+
+def get_task_processor(
+    operation: FileOperationType,
+    parameters: Optional[FileConversionParameters] = None
+) -> FileProcessor:
+    """Обработчик задачи: конвейер, если в параметрах есть шаги pipeline"""
+    if parameters and parameters.pipeline:
+        from app.processing.pipeline import PipelineProcessor
+
+        return PipelineProcessor(operation)
+    return get_processor(operation)
+
+
+__all__ = [
+    "FileProcessor",
+    "PROCESSORS",
+    "ProgressCallback",
+    "get_processor",
+    "get_task_processor",
+    "register_processor",
+]
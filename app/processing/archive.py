@@ -0,0 +1,167 @@
+import os
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+from app.core.file_types import COMPRESSED_MIME_TYPES, SNIFF_BYTES, sniff_file_type
+from app.processing.base import FileProcessor, ProgressCallback, StageBuffer, StageData
+from app.processing.zip_writer import METHOD_DEFLATED, METHOD_STORED, StreamingZipWriter
+from app.schemas.file import CompressionLevel, FileConversionParameters
+
+ZLIB_LEVELS = {
+    CompressionLevel.STORE: 0,
+    CompressionLevel.FAST: 1,
+    CompressionLevel.DEFAULT: 6,
+    CompressionLevel.MAX: 9,
+}
+
+# Размер окна deflate: столько хвоста предыдущего блока нужно как словарь
+_WINDOW_SIZE = 32 * 1024
+
+
+def _deflate_block(data: bytes, level: int, dictionary: bytes, last: bool) -> bytes:
+    """
+    Сжимает блок в raw deflate. Промежуточные блоки завершаются Z_SYNC_FLUSH
+    (выравнивание по байту без признака конца), поэтому результаты можно
+    просто склеить в один корректный поток, как это делает pigz.
+    """
+    if dictionary:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15, zdict=dictionary)
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+
+class ZipProcessor(FileProcessor):
+    """
+    Упаковка файла в ZIP.
+
+    Исходник читается блоками, блоки сжимаются параллельно в пуле потоков
+    (zlib отпускает GIL) со словарем из хвоста предыдущего блока, так что
+    степень сжатия почти не отличается от однопоточной. Сжатые блоки пишутся
+    в архив по порядку сразу по готовности; одновременно в памяти не больше
+    двух блоков на поток. Уже сжатые форматы (JPEG, PNG, архивы...)
+    сохраняются без сжатия, каким бы ни был уровень.
+    """
+
+    BLOCK_SIZE = 1024 * 1024
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers or os.cpu_count() or 1
+
+    def _process(
+        self,
+        source_path: str,
+        destination_path: str,
+        parameters: FileConversionParameters,
+        progress: ProgressCallback,
+        source_name: Optional[str] = None
+    ) -> None:
+        name = os.path.basename(source_name or source_path)
+        with open(source_path, "rb") as source, open(destination_path, "wb") as output:
+            self._compress(
+                source,
+                output,
+                name,
+                os.path.getsize(source_path),
+                os.path.getmtime(source_path),
+                parameters,
+                progress
+            )
+        progress(100)
+
+    def run_stage(
+        self,
+        data: StageData,
+        parameters: FileConversionParameters,
+        progress: ProgressCallback,
+        output: BinaryIO,
+        source_name: Optional[str] = None
+    ) -> StageData:
+        """Шаг конвейера: буфер предыдущего шага упаковывается в output"""
+        size = data.file.seek(0, os.SEEK_END)
+        data.file.seek(0)
+        name = os.path.basename(source_name or f"file.{data.extension}")
+        self._compress(data.file, output, name, size, time.time(), parameters, progress)
+        output.seek(0)
+        progress(100)
+        return StageBuffer(output, "zip")
+
+    def _compress(
+        self,
+        source: BinaryIO,
+        output: BinaryIO,
+        name: str,
+        total_size: int,
+        modified: float,
+        parameters: FileConversionParameters,
+        progress: ProgressCallback
+    ) -> None:
+        total_size = total_size or 1
+        level = ZLIB_LEVELS[parameters.compression_level or CompressionLevel.DEFAULT]
+        if level and sniff_file_type(source.read(SNIFF_BYTES)).mime_type in COMPRESSED_MIME_TYPES:
+            level = 0
+        source.seek(0)
+
+        writer = StreamingZipWriter(output)
+        if level:
+            blocks = self._deflate_blocks(source, writer, level, total_size, progress)
+            writer.add_member(name, blocks, METHOD_DEFLATED, modified=modified)
+        else:
+            # CRC и размер STORED-элемента пишутся в заголовок до данных:
+            # исходник читается дважды, сначала только ради CRC
+            crc, size = self._checksum(source)
+            blocks = self._stored_blocks(source, total_size, progress)
+            writer.add_member(name, blocks, METHOD_STORED, modified=modified, crc=crc, size=size)
+        writer.finish_member()
+        writer.close()
+
+    def _checksum(self, source: BinaryIO) -> Tuple[int, int]:
+        """CRC-32 и размер исходника; позиция возвращается в начало"""
+        crc = 0
+        size = 0
+        while block := source.read(self.BLOCK_SIZE):
+            crc = zlib.crc32(block, crc)
+            size += len(block)
+        source.seek(0)
+        return crc, size
+
+    def _stored_blocks(
+        self,
+        source: BinaryIO,
+        total_size: int,
+        progress: ProgressCallback
+    ) -> Iterator[bytes]:
+        while block := source.read(self.BLOCK_SIZE):
+            yield block
+            progress(min(source.tell() * 100 // total_size, 99))
+
+    def _deflate_blocks(
+        self,
+        source: BinaryIO,
+        writer: StreamingZipWriter,
+        level: int,
+        total_size: int,
+        progress: ProgressCallback
+    ) -> Iterator[bytes]:
+        pending = deque()
+        dictionary = b""
+        block = source.read(self.BLOCK_SIZE)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while True:
+                next_block = source.read(self.BLOCK_SIZE)
+                last = not next_block
+                writer.update(block)
+                pending.append(executor.submit(_deflate_block, block, level, dictionary, last))
+                dictionary = block[-_WINDOW_SIZE:]
+
+                if len(pending) >= 2 * self.workers or last:
+                    while pending and (last or len(pending) >= 2 * self.workers):
+                        yield pending.popleft().result()
+                    progress(min(source.tell() * 100 // total_size, 99))
+                if last:
+                    break
+                block = next_block
@@ -0,0 +1,109 @@
+import os
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Callable, Iterator, Optional
+
+from app.schemas.file import FileConversionParameters
+
+# Получает прогресс обработки в процентах (0-100)
+ProgressCallback = Callable[[int], None]
+
+
+def ignore_progress(progress: int) -> None:
+    pass
+
+
+@dataclass
+class StageBuffer:
+    """Результат шага конвейера в виде байт: file открыт и стоит на начале"""
+    file: BinaryIO
+    extension: str
+
+
+# Данные между шагами конвейера: StageBuffer или декодированное изображение
+# (app.processing.image.DecodedImage), которое кодируется только при необходимости
+StageData = Any
+
+
+@contextmanager
+def atomic_output(destination_path: str) -> Iterator[str]:
+    """
+    Путь временного файла рядом с destination_path. После успешного выхода
+    он переименовывается в destination_path, при ошибке - удаляется
+    """
+    os.makedirs(os.path.dirname(destination_path) or ".", exist_ok=True)
+    temp_path = f"{destination_path}.part"
+    try:
+        yield temp_path
+        os.replace(temp_path, destination_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+class FileProcessor(ABC):
+    """
+    Обработчик одной операции над файлом.
+
+    Выполняется синхронно в процессе воркера. Результат пишется во временный
+    файл рядом с destination_path и переименовывается только после успешного
+    завершения, поэтому недописанный результат никогда не виден под итоговым
+    путем.
+
+    Обработчик может быть и шагом конвейера (run_stage): тогда он получает
+    результат предыдущего шага в памяти, а не файл на диске.
+    """
+
+    # Принимает ли run_stage декодированное изображение (иначе только StageBuffer)
+    accepts_images = False
+
+    def process(
+        self,
+        source_path: str,
+        destination_path: str,
+        parameters: Optional[FileConversionParameters] = None,
+        progress: Optional[ProgressCallback] = None,
+        source_name: Optional[str] = None
+    ) -> None:
+        """
+        Обрабатывает source_path в destination_path. source_name - исходное
+        имя файла у пользователя (для форматов, которые его сохраняют)
+        """
+        with atomic_output(destination_path) as temp_path:
+            self._process(
+                source_path,
+                temp_path,
+                parameters or FileConversionParameters(),
+                progress or ignore_progress,
+                source_name
+            )
+
+    @abstractmethod
+    def _process(
+        self,
+        source_path: str,
+        destination_path: str,
+        parameters: FileConversionParameters,
+        progress: ProgressCallback,
+        source_name: Optional[str] = None
+    ) -> None:
+        """Выполнить операцию, записав результат в destination_path"""
+        ...
+
+    def run_stage(
+        self,
+        data: StageData,
+        parameters: FileConversionParameters,
+        progress: ProgressCallback,
+        output: BinaryIO,
+        source_name: Optional[str] = None
+    ) -> StageData:
+        """
+        Выполнить операцию как шаг конвейера над результатом предыдущего шага.
+        Байтовый результат пишется в output и возвращается как StageBuffer
+        """
+        raise ValueError(f"{type(self).__name__} cannot be used as a pipeline step")
@@ -0,0 +1,361 @@
+import io
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import BinaryIO, List, Optional, Tuple, Union
+
+from PIL import Image, ImageOps
+
+from app.core.config import settings
+from app.core.exceptions import FileProcessingException, ImageTooLargeException
+from app.processing.base import (
+    FileProcessor,
+    ProgressCallback,
+    StageBuffer,
+    StageData,
+    atomic_output,
+    ignore_progress,
+)
+from app.processing.strips import resize_in_strips, supports_strips
+from app.schemas.file import FileConversionParameters, RenditionParameters
+
+# Защита от decompression bomb: Pillow отказывается открывать изображения
+# больше 2 * MAX_IMAGE_PIXELS, остальное проверяется в _open
+Image.MAX_IMAGE_PIXELS = settings.MAX_IMAGE_PIXELS
+
+# Значения EXIF Orientation, при которых ширина и высота меняются местами
+_TRANSPOSED_ORIENTATIONS = (5, 6, 7, 8)
+_EXIF_ORIENTATION = 0x0112
+
+# Форматы Pillow, расширение которых отличается от имени формата
+_FORMAT_EXTENSIONS = {"JPEG": "jpg"}
+
+
+@dataclass
+class DecodedImage:
+    """Декодированное изображение между шагами конвейера"""
+    image: Image.Image
+    format: str
+    icc_profile: Optional[bytes]
+    parameters: FileConversionParameters
+
+    @property
+    def extension(self) -> str:
+        return _FORMAT_EXTENSIONS.get(self.format, self.format.lower())
+
+    def encode(self, output: BinaryIO) -> StageBuffer:
+        """Кодирует изображение в output (в формате последнего шага-изображения)"""
+        ImageProcessor._save(self.image, output, self.format, self.parameters, self.icc_profile)
+        output.seek(0)
+        return StageBuffer(output, self.extension)
+
+
+class ImageProcessor(FileProcessor):
+    """
+    Конвертация и масштабирование изображений на Pillow.
+
+    Если задан width/height, результат вписывается в этот размер с сохранением
+    пропорций. JPEG при этом декодируется сразу в уменьшенном масштабе
+    (draft: 1/2, 1/4 или 1/8 средствами libjpeg), остальные форматы
+    сначала грубо уменьшаются через reduce() и только потом доводятся
+    фильтром LANCZOS, поэтому полный растр исходника не декодируется
+    и не фильтруется без необходимости.
+
+    Память на слот воркера ограничена IMAGE_PIXEL_BUDGET: исходник, который
+    и после draft больше бюджета, масштабируется полосами (PNG), а если
+    формат этого не позволяет или результат сам не влезает в бюджет,
+    задача отклоняется вместо риска OOM.
+    """
+
+    # Формат результата (None - формат исходного файла)
+    output_format: Optional[str] = None
+
+    accepts_images = True
+
+    # Во сколько раз исходник должен быть больше результата, чтобы сначала применить reduce()
+    REDUCING_GAP = 3.0
+
+    def _process(
+        self,
+        source_path: str,
+        destination_path: str,
+        parameters: FileConversionParameters,
+        progress: ProgressCallback,
+        source_name: Optional[str] = None
+    ) -> None:
+        decoded = self._decode(source_path, parameters, progress)
+        self._save(decoded.image, destination_path, decoded.format, parameters, decoded.icc_profile)
+        progress(100)
+
+    def run_stage(
+        self,
+        data: StageData,
+        parameters: FileConversionParameters,
+        progress: ProgressCallback,
+        output: BinaryIO,
+        source_name: Optional[str] = None
+    ) -> StageData:
+        """
+        Шаг конвейера: байты предыдущего шага декодируются, а уже декодированное
+        изображение только масштабируется. Результат остается в памяти и
+        кодируется один раз - следующим шагом, которому нужны байты, или в конце
+        """
+        if isinstance(data, StageBuffer):
+            decoded = self._decode(data.file, parameters, progress)
+        else:
+            image = data.image
+            target_size = self._get_target_size(image, parameters)
+            if target_size and target_size != image.size:
+                if target_size[0] * target_size[1] > settings.IMAGE_PIXEL_BUDGET:
+                    raise ImageTooLargeException(*target_size, settings.IMAGE_PIXEL_BUDGET)
+                image = image.resize(target_size, Image.Resampling.LANCZOS, reducing_gap=self.REDUCING_GAP)
+            decoded = DecodedImage(image, self.output_format or data.format, data.icc_profile, parameters)
+        progress(100)
+        return decoded
+
+    def _decode(
+        self,
+        source: Union[str, BinaryIO],
+        parameters: FileConversionParameters,
+        progress: ProgressCallback
+    ) -> DecodedImage:
+        """Декодирует исходник в пределах бюджета и вписывает его в заданный размер"""
+        with self._open(source) as image:
+            output_format = self.output_format or image.format
+            icc_profile = image.info.get("icc_profile")
+            target_size = self._get_target_size(image, parameters)
+            image = self._load(image, source, target_size, progress)
+            progress(30)
+
+            image = ImageOps.exif_transpose(image)
+            if target_size and target_size != image.size:
+                image = image.resize(target_size, Image.Resampling.LANCZOS, reducing_gap=self.REDUCING_GAP)
+            progress(70)
+        return DecodedImage(image, output_format, icc_profile, parameters)
+
+    def render_renditions(
+        self,
+        source_path: str,
+        outputs: List[Tuple[RenditionParameters, str]],
+        progress: Optional[ProgressCallback] = None
+    ) -> List[Tuple[int, int]]:
+        """
+        Строит несколько рендишенов из одного декодирования исходника.
+
+        Исходник декодируется один раз в масштабе, достаточном для самого
+        большого рендишена (JPEG - через draft), и каждый рендишен
+        уменьшается из этого растра. Возвращает размеры в порядке outputs.
+        """
+        progress = progress or ignore_progress
+        with self._open(source_path) as image:
+            source_format = image.format
+            icc_profile = image.info.get("icc_profile")
+            target_sizes = [self._get_target_size(image, rendition) for rendition, _ in outputs]
+            largest = max(target_sizes, key=lambda size: size[0] * size[1]) if all(target_sizes) else None
+            image = self._load(image, source_path, largest, progress)
+            progress(30)
+
+            image = ImageOps.exif_transpose(image)
+            sizes = []
+            for index, ((rendition, destination_path), target_size) in enumerate(zip(outputs, target_sizes)):
+                rendered = image
+                if target_size and target_size != image.size:
+                    rendered = image.resize(target_size, Image.Resampling.LANCZOS, reducing_gap=self.REDUCING_GAP)
+                output_format = rendition.format.value.upper() if rendition.format else source_format
+                with atomic_output(destination_path) as temp_path:
+                    self._save(rendered, temp_path, output_format, rendition, icc_profile)
+                sizes.append(rendered.size)
+                progress(30 + 70 * (index + 1) // len(outputs))
+        return sizes
+
+    @staticmethod
+    def _open(source: Union[str, BinaryIO]) -> Image.Image:
+        """Открывает изображение, отклоняя превышающие MAX_IMAGE_PIXELS по заголовку"""
+        try:
+            image = Image.open(source)
+        except Image.DecompressionBombError as error:
+            raise FileProcessingException(str(error))
+        width, height = image.size
+        if width * height > settings.MAX_IMAGE_PIXELS:
+            image.close()
+            raise ImageTooLargeException(width, height, settings.MAX_IMAGE_PIXELS)
+        return image
+
+    def _load(
+        self,
+        image: Image.Image,
+        source: Union[str, BinaryIO],
+        target_size: Optional[Tuple[int, int]],
+        progress: ProgressCallback
+    ) -> Image.Image:
+        """
+        Декодирует изображение, не выходя за IMAGE_PIXEL_BUDGET. Если растр
+        после draft больше бюджета, PNG масштабируется до target_size полосами;
+        возвращаемое изображение тогда уже имеет итоговый размер.
+        """
+        budget = settings.IMAGE_PIXEL_BUDGET
+        if target_size:
+            if target_size[0] * target_size[1] > budget:
+                raise ImageTooLargeException(*target_size, budget)
+            self._draft(image, target_size)
+
+        width, height = image.size
+        if width * height <= budget:
+            image.load()
+            return image
+        if not target_size or not supports_strips(image):
+            raise ImageTooLargeException(width, height, budget)
+
+        target_width, target_height = target_size
+        if _is_transposed(image):
+            target_width, target_height = target_height, target_width
+        with open(source, "rb") if isinstance(source, str) else nullcontext(source) as stream:
+            resized = resize_in_strips(
+                stream,
+                image,
+                (target_width, target_height),
+                settings.IMAGE_STRIP_PIXELS,
+                lambda percent: progress(percent * 30 // 100)
+            )
+        if "exif" in image.info:
+            resized.info["exif"] = image.info["exif"]
+        return resized
+
+    @staticmethod
+    def _get_target_size(
+        image: Image.Image,
+        parameters: Union[FileConversionParameters, RenditionParameters]
+    ) -> Optional[Tuple[int, int]]:
+        """Итоговый размер с учетом EXIF-ориентации (None - без масштабирования)"""
+        if not parameters.width and not parameters.height:
+            return None
+
+        width, height = image.size
+        if _is_transposed(image):
+            width, height = height, width
+
+        scales = []
+        if parameters.width:
+            scales.append(parameters.width / width)
+        if parameters.height:
+            scales.append(parameters.height / height)
+        scale = min(scales)
+        return max(round(width * scale), 1), max(round(height * scale), 1)
+
+    @staticmethod
+    def _draft(image: Image.Image, target_size: Tuple[int, int]) -> None:
+        """
+        Просит JPEG-декодер отдать изображение в наименьшем масштабе, который
+        все еще не меньше целевого. Для остальных форматов ничего не делает.
+        """
+        if image.format != "JPEG":
+            return
+        width, height = target_size
+        if _is_transposed(image):
+            width, height = height, width
+        image.draft(image.mode, (width, height))
+
+    @staticmethod
+    def _save(
+        image: Image.Image,
+        destination: Union[str, BinaryIO],
+        output_format: str,
+        parameters: Union[FileConversionParameters, RenditionParameters],
+        icc_profile: Optional[bytes]
+    ) -> None:
+        options = {}
+        if icc_profile:
+            options["icc_profile"] = icc_profile
+
+        if output_format == "JPEG":
+            image = _flatten_for_jpeg(image)
+            options["quality"] = parameters.quality or 95
+        elif output_format == "WEBP":
+            options["quality"] = parameters.quality or 95
+        elif output_format == "PNG" and image.mode == "CMYK":
+            image = image.convert("RGB")
+
+        if parameters.target_size_bytes:
+            if "quality" not in options:
+                raise FileProcessingException(f"target_size_bytes is not supported for {output_format} output")
+            data = _encode_within_size(image, output_format, options, parameters.target_size_bytes)
+            if isinstance(destination, str):
+                with open(destination, "wb") as output:
+                    output.write(data)
+            else:
+                destination.write(data)
+            return
+
+        image.save(destination, format=output_format, **options)
+
+
+def _encode(image: Image.Image, output_format: str, options: dict, quality: int) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format=output_format, **{**options, "quality": quality})
+    return buffer.getvalue()
+
+
+def _encode_within_size(image: Image.Image, output_format: str, options: dict, max_bytes: int) -> bytes:
+    """
+    Наибольшее качество (не выше options["quality"]), при котором результат
+    не больше max_bytes: бинарный поиск по кодированиям в память уже
+    декодированного изображения. Если не помещается даже качество 1,
+    возвращается самый маленький вариант.
+    """
+    low, high = 1, options["quality"]
+    data = _encode(image, output_format, options, high)
+    if len(data) <= max_bytes:
+        return data
+
+    best = None
+    smallest = data
+    high -= 1
+    while low <= high:
+        quality = (low + high) // 2
+        data = _encode(image, output_format, options, quality)
+        if len(data) <= max_bytes:
+            best = data
+            low = quality + 1
+        else:
+            high = quality - 1
+        if len(data) < len(smallest):
+            smallest = data
+    return best if best is not None else smallest
+
+
+def _is_transposed(image: Image.Image) -> bool:
+    """
+    Меняет ли EXIF-ориентация ширину и высоту местами. У PNG getexif()
+    декодирует весь растр, поэтому EXIF берется только из заголовка
+    """
+    if image.format == "PNG":
+        exif = Image.Exif()
+        if "exif" in image.info:
+            exif.load(image.info["exif"])
+    else:
+        exif = image.getexif()
+    return exif.get(_EXIF_ORIENTATION) in _TRANSPOSED_ORIENTATIONS
+
+
+def _flatten_for_jpeg(image: Image.Image) -> Image.Image:
+    """Убирает прозрачность (на белый фон) и приводит режим к поддерживаемому JPEG"""
+    if image.mode == "P":
+        image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+    if image.mode in ("RGBA", "LA"):
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    if image.mode not in ("RGB", "L", "CMYK"):
+        return image.convert("RGB")
+    return image
+
+
+class JpgToPngProcessor(ImageProcessor):
+    output_format = "PNG"
+
+
+class PngToJpgProcessor(ImageProcessor):
+    output_format = "JPEG"
+
+
+class ResizeImageProcessor(ImageProcessor):
+    output_format = None
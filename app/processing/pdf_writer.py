@@ -0,0 +1,274 @@
+import io
+import os
+import zlib
+from typing import BinaryIO, Dict, List, Optional
+
+# Номера служебных объектов; остальные раздаются по порядку начиная с _FIRST_FREE_OBJECT
+_CATALOG_OBJECT = 1
+_PAGES_OBJECT = 2
+_FONT_OBJECT = 3
+_FIRST_FREE_OBJECT = 4
+
+# Записей в одном блоке bfchar (ограничение формата CMap)
+_CMAP_BLOCK_SIZE = 100
+
+
+class StreamingPdfWriter:
+    """
+    Минимальный писатель PDF 1.4, который выводит каждую страницу сразу
+    после того, как она сверстана.
+
+    В памяти держится только текущая страница и смещения уже записанных
+    объектов (для таблицы xref); дерево страниц, каталог и xref пишутся
+    в конце. Строки, которые кодируются в WinAnsi, набираются стандартным
+    шрифтом Courier без встраивания. Остальные (кириллица и т.п.) -
+    TrueType-шрифтом unicode_font_path: он встраивается в конце
+    подмножеством из использованных глифов (Identity-H с ToUnicode, чтобы
+    текст копировался и искался). Без этого шрифта такая строка - ошибка.
+    """
+
+    def __init__(
+        self,
+        output: BinaryIO,
+        page_width: float,
+        page_height: float,
+        font_size: float,
+        unicode_font_path: Optional[str] = None
+    ):
+        self.output = output
+        self.page_width = page_width
+        self.page_height = page_height
+        self.font_size = font_size
+        self.unicode_font_path = unicode_font_path
+        self._unicode_font: Optional[_UnicodeFont] = None
+        self._offsets: List[int] = []
+        self._page_objects: List[int] = []
+        self._next_object = _FIRST_FREE_OBJECT
+        self._position = 0
+
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._write_object(
+            _FONT_OBJECT,
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>"
+        )
+
+    @property
+    def page_count(self) -> int:
+        return len(self._page_objects)
+
+    def add_text_page(self, lines: List[str], left: float, top: float, leading: float) -> None:
+        """Записывает страницу с моноширинным текстом, первая строка - на высоте top"""
+        content = [b"BT /F1 %g Tf %g TL %g %g Td" % (self.font_size, leading, left, top)]
+        current_font = b"F1"
+        for line in lines:
+            try:
+                font, text = b"F1", b"(%s)" % _escape(line)
+            except UnicodeEncodeError:
+                font, text = b"F2", b"<%s>" % self._get_unicode_font().encode(line)
+            if font != current_font:
+                content.append(b"/%s %g Tf" % (font, self.font_size))
+                current_font = font
+            content.append(b"%s Tj T*" % text)
+        content.append(b"ET")
+        stream = zlib.compress(b"\n".join(content))
+
+        fonts = b"/F1 %d 0 R" % _FONT_OBJECT
+        if self._unicode_font:
+            fonts += b" /F2 %d 0 R" % self._unicode_font.object_number
+        page_object = self._allocate_object()
+        contents_object = self._allocate_object()
+        self._write_object(
+            page_object,
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %g %g] "
+            b"/Resources << /Font << %s >> >> /Contents %d 0 R >>"
+            % (_PAGES_OBJECT, self.page_width, self.page_height, fonts, contents_object)
+        )
+        self._write_object(
+            contents_object,
+            b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(stream), stream)
+        )
+        self._page_objects.append(page_object)
+
+    def close(self) -> None:
+        """Дописывает шрифт, дерево страниц, каталог, таблицу xref и трейлер"""
+        if self._unicode_font:
+            for number, body in self._unicode_font.build_objects():
+                self._write_object(number, body)
+        kids = b" ".join(b"%d 0 R" % number for number in self._page_objects)
+        self._write_object(
+            _PAGES_OBJECT,
+            b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, self.page_count)
+        )
+        self._write_object(_CATALOG_OBJECT, b"<< /Type /Catalog /Pages %d 0 R >>" % _PAGES_OBJECT)
+
+        offsets = dict(self._offsets)
+        xref_position = self._position
+        self._write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(offsets) + 1))
+        for number in range(1, len(offsets) + 1):
+            self._write(b"%010d 00000 n \n" % offsets[number])
+        self._write(
+            b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+            % (len(offsets) + 1, _CATALOG_OBJECT, xref_position)
+        )
+
+    def _get_unicode_font(self) -> "_UnicodeFont":
+        if not self._unicode_font:
+            if not self.unicode_font_path or not os.path.exists(self.unicode_font_path):
+                raise ValueError(
+                    "Text contains characters outside WinAnsi, but no Unicode font is available "
+                    f"(PDF_UNICODE_FONT_PATH={self.unicode_font_path!r})"
+                )
+            first_object = self._next_object
+            self._next_object += _UnicodeFont.OBJECT_COUNT
+            self._unicode_font = _UnicodeFont(self.unicode_font_path, first_object)
+        return self._unicode_font
+
+    def _allocate_object(self) -> int:
+        number = self._next_object
+        self._next_object += 1
+        return number
+
+    def _write_object(self, number: int, body: bytes) -> None:
+        self._offsets.append((number, self._position))
+        self._write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+
+    def _write(self, data: bytes) -> None:
+        self.output.write(data)
+        self._position += len(data)
+
+
+class _UnicodeFont:
+    """
+    Составной шрифт Type0 поверх TrueType: код символа - двухбайтный номер
+    глифа (CIDToGIDMap /Identity). Использованные глифы копятся по ходу
+    верстки, а сам шрифт (подмножество), ширины и ToUnicode пишутся в
+    close(). fontTools импортируется только когда такой шрифт нужен.
+    """
+
+    # Type0, CIDFont, FontDescriptor, FontFile2, ToUnicode
+    OBJECT_COUNT = 5
+
+    def __init__(self, path: str, object_number: int):
+        from fontTools.ttLib import TTFont
+
+        self.path = path
+        self.object_number = object_number
+        self._font = TTFont(path)
+        self._cmap = self._font.getBestCmap()
+        self._glyph_ids = self._font.getReverseGlyphMap()
+        self._scale = 1000 / self._font["head"].unitsPerEm
+        self._fallback = self._cmap.get(0xFFFD) or self._cmap.get(ord("?"))
+        # номер глифа -> символ (для ToUnicode)
+        self._used: Dict[int, str] = {}
+
+    def encode(self, line: str) -> bytes:
+        """Строка как hex-последовательность номеров глифов"""
+        codes = []
+        for char in line:
+            glyph_name = self._cmap.get(ord(char))
+            if not glyph_name:
+                # Символа нет в шрифте: выводится знак замены
+                glyph_name, char = self._fallback, "\ufffd"
+            glyph_id = self._glyph_ids.get(glyph_name, 0)
+            self._used.setdefault(glyph_id, char)
+            codes.append(b"%04X" % glyph_id)
+        return b"".join(codes)
+
+    def build_objects(self):
+        """Объекты шрифта (номер, тело) по использованным глифам"""
+        cid_font, descriptor, font_file, to_unicode = range(self.object_number + 1, self.object_number + 5)
+        postscript_name = self._font["name"].getDebugName(6) or "Unicode"
+        name = b"/AAAAAA+" + postscript_name.encode("ascii", "ignore").replace(b" ", b"")
+
+        font_program = self._subset()
+        compressed = zlib.compress(font_program)
+        yield self.object_number, (
+            b"<< /Type /Font /Subtype /Type0 /BaseFont %s /Encoding /Identity-H "
+            b"/DescendantFonts [%d 0 R] /ToUnicode %d 0 R >>" % (name, cid_font, to_unicode)
+        )
+        yield cid_font, (
+            b"<< /Type /Font /Subtype /CIDFontType2 /BaseFont %s "
+            b"/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> "
+            b"/FontDescriptor %d 0 R /W [%s] /CIDToGIDMap /Identity >>"
+            % (name, descriptor, self._widths())
+        )
+        yield descriptor, self._descriptor(name, font_file)
+        yield font_file, (
+            b"<< /Length %d /Length1 %d /Filter /FlateDecode >>\nstream\n%s\nendstream"
+            % (len(compressed), len(font_program), compressed)
+        )
+        cmap = self._to_unicode()
+        yield to_unicode, b"<< /Length %d >>\nstream\n%s\nendstream" % (len(cmap), cmap)
+
+    def _subset(self) -> bytes:
+        """Подмножество шрифта с исходными номерами глифов"""
+        from fontTools import subset
+
+        options = subset.Options()
+        options.retain_gids = True
+        options.layout_features = []
+        options.name_IDs = ["*"]
+        options.notdef_outline = True
+        options.drop_tables += ["FFTM"]
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(gids=sorted(self._used))
+        subsetter.subset(self._font)
+        buffer = io.BytesIO()
+        self._font.save(buffer)
+        return buffer.getvalue()
+
+    def _widths(self) -> bytes:
+        metrics = self._font["hmtx"].metrics
+        glyph_order = self._font.getGlyphOrder()
+        return b" ".join(
+            b"%d [%d]" % (glyph_id, round(metrics[glyph_order[glyph_id]][0] * self._scale))
+            for glyph_id in sorted(self._used)
+        )
+
+    def _descriptor(self, name: bytes, font_file: int) -> bytes:
+        head, hhea, post = self._font["head"], self._font["hhea"], self._font["post"]
+        os2 = self._font["OS/2"] if "OS/2" in self._font else None
+        cap_height = getattr(os2, "sCapHeight", 0) or hhea.ascent
+        flags = 32 | (1 if post.isFixedPitch else 0)
+        bbox = b" ".join(
+            b"%d" % round(value * self._scale) for value in (head.xMin, head.yMin, head.xMax, head.yMax)
+        )
+        return (
+            b"<< /Type /FontDescriptor /FontName %s /Flags %d /FontBBox [%s] /ItalicAngle %d "
+            b"/Ascent %d /Descent %d /CapHeight %d /StemV 80 /FontFile2 %d 0 R >>"
+            % (
+                name, flags, bbox, round(post.italicAngle),
+                round(hhea.ascent * self._scale), round(hhea.descent * self._scale),
+                round(cap_height * self._scale), font_file,
+            )
+        )
+
+    def _to_unicode(self) -> bytes:
+        entries = [
+            b"<%04X> <%s>" % (glyph_id, char.encode("utf-16-be").hex().upper().encode())
+            for glyph_id, char in sorted(self._used.items())
+        ]
+        blocks = []
+        for start in range(0, len(entries), _CMAP_BLOCK_SIZE):
+            block = entries[start:start + _CMAP_BLOCK_SIZE]
+            blocks.append(b"%d beginbfchar\n%s\nendbfchar" % (len(block), b"\n".join(block)))
+        return b"\n".join([
+            b"/CIDInit /ProcSet findresource begin",
+            b"12 dict begin",
+            b"begincmap",
+            b"/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def",
+            b"/CMapName /Adobe-Identity-UCS def",
+            b"/CMapType 2 def",
+            b"1 begincodespacerange\n<0000> <FFFF>\nendcodespacerange",
+            *blocks,
+            b"endcmap",
+            b"CMapName currentdict /CMap defineresource pop",
+            b"end",
+            b"end",
+        ])
+
+
+def _escape(line: str) -> bytes:
+    """Строка PDF в WinAnsi; UnicodeEncodeError - строку нужно набирать Unicode-шрифтом"""
+    data = line.encode("cp1252")
+    return data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
@@ -0,0 +1,78 @@
+import os
+import tempfile
+from contextlib import ExitStack
+from typing import BinaryIO, Optional
+
+from app.core.config import settings
+from app.processing.base import FileProcessor, ProgressCallback, StageBuffer
+from app.schemas.file import FileConversionParameters, FileOperationType
+
+
+class PipelineProcessor(FileProcessor):
+    """
+    Цепочка операций в одном воркере: основная операция задачи и шаги
+    parameters.pipeline по порядку.
+
+    Шаги передают друг другу результат в памяти: изображение остается
+    декодированным между шагами-изображениями и кодируется один раз, а
+    байтовые результаты (PDF, ZIP) пишутся в SpooledTemporaryFile, который
+    уходит на диск, только если превысит PIPELINE_SPOOL_MAX_BYTES. Последний
+    шаг пишет сразу в итоговый файл.
+    """
+
+    def __init__(self, operation: FileOperationType):
+        self.operation = FileOperationType(operation)
+
+    def _process(
+        self,
+        source_path: str,
+        destination_path: str,
+        parameters: FileConversionParameters,
+        progress: ProgressCallback,
+        source_name: Optional[str] = None
+    ) -> None:
+        from app.processing import get_processor
+
+        steps = [(self.operation, parameters.model_copy(update={"pipeline": None}))]
+        steps += [(step.operation, step.to_parameters()) for step in parameters.pipeline or []]
+        stem, extension = os.path.splitext(os.path.basename(source_name or source_path))
+
+        with ExitStack() as stack:
+            destination = stack.enter_context(open(destination_path, "wb"))
+            data = StageBuffer(stack.enter_context(open(source_path, "rb")), extension.lstrip(".").lower())
+
+            for index, (operation, step_parameters) in enumerate(steps):
+                processor = get_processor(operation)
+                stage_input = data if processor.accepts_images else self._as_buffer(data, stack)
+                last = index == len(steps) - 1
+                data = processor.run_stage(
+                    stage_input,
+                    step_parameters,
+                    _scaled_progress(progress, index, len(steps)),
+                    destination if last else stack.enter_context(self._spool()),
+                    f"{stem}.{stage_input.extension}"
+                )
+                # Промежуточный буфер больше не нужен (исходник закроет ExitStack)
+                if index and isinstance(stage_input, StageBuffer):
+                    stage_input.file.close()
+
+            if not isinstance(data, StageBuffer):
+                data.encode(destination)
+        progress(100)
+
+    def _as_buffer(self, data, stack: ExitStack) -> StageBuffer:
+        """Кодирует декодированное изображение в байты для шага, которому они нужны"""
+        if isinstance(data, StageBuffer):
+            return data
+        return data.encode(stack.enter_context(self._spool()))
+
+    @staticmethod
+    def _spool() -> BinaryIO:
+        temp_dir = os.path.join(settings.UPLOAD_DIR, "tmp")
+        os.makedirs(temp_dir, exist_ok=True)
+        return tempfile.SpooledTemporaryFile(max_size=settings.PIPELINE_SPOOL_MAX_BYTES, dir=temp_dir)
+
+
+def _scaled_progress(progress: ProgressCallback, index: int, total: int) -> ProgressCallback:
+    """Прогресс шага index из total в долю общего прогресса конвейера"""
+    return lambda percent: progress((index * 100 + percent) // total)
@@ -0,0 +1,162 @@
+import math
+import struct
+import zlib
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+from PIL import Image
+
+from app.processing.base import ProgressCallback
+
+# Режимы PNG глубиной 8 бит на канал, у которых сырой формат строки Pillow
+# совпадает с форматом строки PNG
+_STRIP_MODES = ("L", "LA", "RGB", "RGBA", "P")
+_READ_SIZE = 1024 * 1024
+
+# Радиус ядра LANCZOS в пикселях исходника при масштабе 1:1
+_LANCZOS_SUPPORT = 3.0
+
+
+def supports_strips(image: Image.Image) -> bool:
+    """Можно ли декодировать изображение полосами, не загружая его целиком"""
+    return (
+        image.format == "PNG"
+        and image.mode in _STRIP_MODES
+        and not image.info.get("interlace")
+        and len(image.tile) == 1
+        and image.tile[0].codec_name == "zip"
+        and image.tile[0].args == image.mode
+    )
+
+
+def iter_png_strips(source: BinaryIO, image: Image.Image, strip_rows: int) -> Iterator[Image.Image]:
+    """
+    Декодирует неинтерлейсный PNG полосами по strip_rows строк.
+
+    Поток IDAT распаковывается zlib порционно, а фильтры строк снимает
+    декодер Pillow. Фильтры PNG ссылаются на предыдущую строку, поэтому
+    перед каждой полосой подставляется уже декодированная последняя строка
+    прошлой полосы с фильтром None. Полосы палитровых изображений
+    приводятся к RGB/RGBA.
+    """
+    width, height = image.size
+    mode = image.mode
+    row_bytes = 1 + width * len(image.getbands())
+    decompressor = zlib.decompressobj()
+    idat = _iter_idat(source)
+    pending = b""
+    previous_row = None
+    y = 0
+
+    while y < height:
+        rows = min(strip_rows, height - y)
+        needed = rows * row_bytes
+        data = bytearray()
+        while len(data) < needed:
+            if not pending:
+                pending = next(idat, b"")
+                if not pending:
+                    raise ValueError("Truncated PNG image data")
+            data += decompressor.decompress(pending, needed - len(data))
+            pending = decompressor.unconsumed_tail
+
+        if previous_row is not None:
+            data[:0] = b"\x00" + previous_row
+        strip = Image.frombytes(mode, (width, len(data) // row_bytes), zlib.compress(bytes(data), 1), "zip", mode)
+        if previous_row is not None:
+            strip = strip.crop((0, 1, width, strip.height))
+        previous_row = strip.crop((0, strip.height - 1, width, strip.height)).tobytes()
+        y += rows
+        yield _with_palette(strip, image)
+
+
+def resize_in_strips(
+    source: BinaryIO,
+    image: Image.Image,
+    target_size: Tuple[int, int],
+    strip_pixels: int,
+    progress: Optional[ProgressCallback] = None
+) -> Image.Image:
+    """
+    Масштабирует PNG до target_size, держа в памяти только окно исходных
+    строк вокруг текущей полосы результата и сам результат.
+
+    Каждая полоса результата считается resize(box=...) по окну, которое
+    захватывает весь радиус фильтра LANCZOS, поэтому результат совпадает
+    с масштабированием целого изображения (без reducing_gap).
+    """
+    width, height = image.size
+    target_width, target_height = target_size
+    scale = height / target_height
+    margin = math.ceil(_LANCZOS_SUPPORT * max(scale, 1.0)) + 1
+    strip_rows = max(strip_pixels // width, 1)
+    band_rows = max(int(strip_rows / scale), 1)
+
+    strips = iter_png_strips(source, image, strip_rows)
+    result = None
+    window = None
+    window_top = 0
+
+    for band_top in range(0, target_height, band_rows):
+        band_bottom = min(band_top + band_rows, target_height)
+        box_top = band_top * scale
+        box_bottom = band_bottom * scale
+        need_top = max(math.floor(box_top) - margin, 0)
+        need_bottom = min(math.ceil(box_bottom) + margin, height)
+
+        if window is not None and need_top > window_top:
+            window = window.crop((0, need_top - window_top, width, window.height))
+            window_top = need_top
+        while window is None or window_top + window.height < need_bottom:
+            strip = next(strips)
+            window = strip if window is None else _stack(window, strip)
+
+        band = window.resize(
+            (target_width, band_bottom - band_top),
+            Image.Resampling.LANCZOS,
+            box=(0, box_top - window_top, width, box_bottom - window_top)
+        )
+        if result is None:
+            result = Image.new(band.mode, target_size)
+        result.paste(band, (0, band_top))
+        if progress:
+            progress(band_bottom * 100 // target_height)
+
+    return result
+
+
+def _iter_idat(source: BinaryIO) -> Iterator[bytes]:
+    """Содержимое чанков IDAT порциями не больше _READ_SIZE"""
+    source.seek(8)
+    while header := source.read(8):
+        length, chunk_type = struct.unpack(">I4s", header)
+        if chunk_type == b"IDAT":
+            remaining = length
+            while remaining:
+                chunk = source.read(min(remaining, _READ_SIZE))
+                if not chunk:
+                    return
+                remaining -= len(chunk)
+                yield chunk
+            source.seek(4, 1)
+        elif chunk_type == b"IEND":
+            return
+        else:
+            source.seek(length + 4, 1)
+
+
+def _with_palette(strip: Image.Image, image: Image.Image) -> Image.Image:
+    if strip.mode != "P":
+        return strip
+    strip.putpalette(image.palette.palette, image.palette.rawmode or image.palette.mode)
+    transparency = image.info.get("transparency")
+    if transparency is not None:
+        strip.info["transparency"] = transparency
+        return strip.convert("RGBA")
+    return strip.convert("RGB")
+
+
+def _stack(top: Image.Image, bottom: Image.Image) -> Image.Image:
+    stacked = Image.new(top.mode, (top.width, top.height + bottom.height))
+    stacked.paste(top, (0, 0))
+    stacked.paste(bottom, (0, top.height))
+    return stacked
@@ -0,0 +1,121 @@
+import io
+import os
+from typing import BinaryIO, Optional
+
+from app.core.config import settings
+from app.processing.base import FileProcessor, ProgressCallback, StageBuffer, StageData
+from app.processing.pdf_writer import StreamingPdfWriter
+from app.schemas.file import FileConversionParameters
+
+# Управляющие символы, которые нельзя выводить в текст PDF
+_CONTROL_CHARACTERS = dict.fromkeys(c for c in range(0x20) if c != 0x0C)
+
+
+class TxtToPdfProcessor(FileProcessor):
+    """
+    Потоковая конвертация текста в PDF (A4, Courier; строки вне WinAnsi -
+    встраиваемым моноширинным шрифтом PDF_UNICODE_FONT_PATH).
+
+    Входной файл читается построчно (длинные строки - кусками по ширине
+    страницы), каждая сверстанная страница сразу пишется в результат,
+    поэтому потребление памяти не зависит от размера файла. Прогресс
+    сообщается после каждой страницы по доле прочитанных байт.
+    """
+
+    PAGE_WIDTH = 595.0
+    PAGE_HEIGHT = 842.0
+    MARGIN = 42.0
+    FONT_SIZE = 9.0
+    LEADING = 11.0
+    TAB_SIZE = 4
+    # Ширина глифа Courier - 600/1000 кегля
+    CHAR_WIDTH = FONT_SIZE * 0.6
+
+    CHARS_PER_LINE = int((PAGE_WIDTH - 2 * MARGIN) // CHAR_WIDTH)
+    LINES_PER_PAGE = int((PAGE_HEIGHT - 2 * MARGIN) // LEADING)
+
+    def _process(
+        self,
+        source_path: str,
+        destination_path: str,
+        parameters: FileConversionParameters,
+        progress: ProgressCallback,
+        source_name: Optional[str] = None
+    ) -> None:
+        with open(source_path, "rb") as raw, open(destination_path, "wb") as output:
+            self._convert(raw, output, os.path.getsize(source_path), progress)
+        progress(100)
+
+    def run_stage(
+        self,
+        data: StageData,
+        parameters: FileConversionParameters,
+        progress: ProgressCallback,
+        output: BinaryIO,
+        source_name: Optional[str] = None
+    ) -> StageData:
+        """Шаг конвейера: текст из буфера предыдущего шага верстается в output"""
+        size = data.file.seek(0, os.SEEK_END)
+        data.file.seek(0)
+        self._convert(data.file, output, size, progress)
+        output.seek(0)
+        progress(100)
+        return StageBuffer(output, "pdf")
+
+    def _convert(self, raw: BinaryIO, output: BinaryIO, total_size: int, progress: ProgressCallback) -> None:
+        total_size = total_size or 1
+        reported = -1
+        source = io.TextIOWrapper(raw, encoding="utf-8-sig", errors="replace")
+        writer = StreamingPdfWriter(
+            output, self.PAGE_WIDTH, self.PAGE_HEIGHT, self.FONT_SIZE, settings.PDF_UNICODE_FONT_PATH
+        )
+        page = []
+
+        for line in self._read_lines(source):
+            if line == "\f" or len(page) == self.LINES_PER_PAGE:
+                self._flush_page(writer, page)
+                page = []
+                percent = min(raw.tell() * 100 // total_size, 99)
+                if percent != reported:
+                    progress(percent)
+                    reported = percent
+                if line == "\f":
+                    continue
+            page.append(line)
+
+        if page or not writer.page_count:
+            self._flush_page(writer, page)
+        writer.close()
+        # raw принадлежит вызывающему: обертка не должна закрыть его при сборке мусора
+        source.detach()
+
+    def _read_lines(self, source: io.TextIOWrapper):
+        """
+        Выдает строки, помещающиеся в ширину страницы. Чтение ограничено
+        по длине, поэтому файл без переводов строк не читается целиком.
+        Символ перевода страницы выдается отдельным элементом "\\f".
+        """
+        wrapped = False
+        while chunk := source.readline(self.CHARS_PER_LINE):
+            # Перевод строки сразу после строки ровно во всю ширину уже учтен переносом
+            if wrapped and chunk == "\n":
+                wrapped = False
+                continue
+            wrapped = not chunk.endswith("\n")
+            chunk = chunk.rstrip("\n")
+            for index, part in enumerate(chunk.split("\f")):
+                if index:
+                    yield "\f"
+                part = part.expandtabs(self.TAB_SIZE).translate(_CONTROL_CHARACTERS)
+                while len(part) > self.CHARS_PER_LINE:
+                    yield part[:self.CHARS_PER_LINE]
+                    part = part[self.CHARS_PER_LINE:]
+                yield part
+
+    def _flush_page(self, writer: StreamingPdfWriter, lines: list) -> None:
+        writer.add_text_page(
+            lines,
+            left=self.MARGIN,
+            top=self.PAGE_HEIGHT - self.MARGIN - self.FONT_SIZE,
+            leading=self.LEADING
+        )
@@ -0,0 +1,143 @@
+import struct
+import time
+import zlib
+from dataclasses import dataclass
+from typing import BinaryIO, Iterable, List, Optional
+
+METHOD_STORED = 0
+METHOD_DEFLATED = 8
+
+# Бит 11 - имя в UTF-8, бит 3 - размеры и CRC в дескрипторе после данных
+_FLAG_UTF8 = 0x0800
+_FLAG_DATA_DESCRIPTOR = 0x0008
+_VERSION = 20
+_MADE_BY_UNIX = (3 << 8) | _VERSION
+_FILE_ATTRIBUTES = 0o100644 << 16
+_MAX_SIZE = 0xFFFFFFFF
+
+
+@dataclass
+class _Member:
+    name: bytes
+    method: int
+    flags: int
+    dos_time: int
+    dos_date: int
+    header_offset: int
+    crc: int = 0
+    compressed_size: int = 0
+    size: int = 0
+
+
+class StreamingZipWriter:
+    """
+    Писатель ZIP-архива в неперематываемый поток.
+
+    Данные элемента пишутся сразу по мере поступления. У DEFLATED-элемента
+    CRC и размеры выводятся после данных в дескрипторе, поэтому сжатые
+    данные не нужно держать целиком или копировать во временный файл.
+    STORED-элемент пишется с настоящими CRC и размером в локальном заголовке
+    и без дескриптора (его иначе не прочитать потоково): они передаются в
+    add_member заранее. ZIP64 не поддерживается: элемент и архив ограничены 4 ГБ.
+    """
+
+    def __init__(self, output: BinaryIO):
+        self.output = output
+        self._members: List[_Member] = []
+        self._position = 0
+
+    def add_member(
+        self,
+        name: str,
+        blocks: Iterable[bytes],
+        method: int,
+        modified: float = None,
+        crc: Optional[int] = None,
+        size: Optional[int] = None
+    ) -> None:
+        """
+        Записывает элемент. blocks - данные в готовом виде (для DEFLATED -
+        raw deflate-поток). Для DEFLATED несжатые размер и CRC передаются
+        через update(), для STORED - заранее в crc и size
+        """
+        dos_time, dos_date = _to_dos_datetime(modified or time.time())
+        if method == METHOD_STORED:
+            if crc is None or size is None:
+                raise ValueError("STORED member needs its CRC and size up front")
+            if size > _MAX_SIZE:
+                raise ValueError("ZIP member exceeds 4 GB, ZIP64 is not supported")
+            member = _Member(
+                name.encode("utf-8"), method, _FLAG_UTF8, dos_time, dos_date, self._position,
+                crc=crc, size=size
+            )
+            header_sizes = (crc, size, size)
+        else:
+            member = _Member(
+                name.encode("utf-8"), method, _FLAG_UTF8 | _FLAG_DATA_DESCRIPTOR, dos_time, dos_date, self._position
+            )
+            header_sizes = (0, 0, 0)
+        self._write(struct.pack(
+            "<IHHHHHIIIHH",
+            0x04034B50, _VERSION, member.flags, method, dos_time, dos_date,
+            *header_sizes, len(member.name), 0
+        ))
+        self._write(member.name)
+        self._members.append(member)
+
+        for block in blocks:
+            self._write(block)
+            member.compressed_size += len(block)
+
+    def update(self, data: bytes) -> None:
+        """Учитывает очередной кусок несжатых данных текущего DEFLATED-элемента"""
+        member = self._members[-1]
+        member.crc = zlib.crc32(data, member.crc)
+        member.size += len(data)
+
+    def finish_member(self) -> None:
+        """
+        Завершает текущий элемент: для DEFLATED пишет дескриптор данных, для
+        STORED проверяет, что записано ровно объявленное в заголовке
+        """
+        member = self._members[-1]
+        if member.method == METHOD_STORED:
+            if member.compressed_size != member.size:
+                raise ValueError(
+                    f"STORED member has {member.compressed_size} bytes, its header declares {member.size}"
+                )
+            return
+        if member.size > _MAX_SIZE or member.compressed_size > _MAX_SIZE:
+            raise ValueError("ZIP member exceeds 4 GB, ZIP64 is not supported")
+        self._write(struct.pack("<IIII", 0x08074B50, member.crc, member.compressed_size, member.size))
+
+    def close(self) -> None:
+        """Пишет центральный каталог и запись конца архива"""
+        directory_offset = self._position
+        for member in self._members:
+            self._write(struct.pack(
+                "<IHHHHHHIIIHHHHHII",
+                0x02014B50, _MADE_BY_UNIX, _VERSION, member.flags, member.method,
+                member.dos_time, member.dos_date, member.crc,
+                member.compressed_size, member.size, len(member.name),
+                0, 0, 0, 0, _FILE_ATTRIBUTES, member.header_offset
+            ))
+            self._write(member.name)
+        if self._position > _MAX_SIZE:
+            raise ValueError("ZIP archive exceeds 4 GB, ZIP64 is not supported")
+        self._write(struct.pack(
+            "<IHHHHIIH",
+            0x06054B50, 0, 0, len(self._members), len(self._members),
+            self._position - directory_offset, directory_offset, 0
+        ))
+
+    def _write(self, data: bytes) -> None:
+        self.output.write(data)
+        self._position += len(data)
+
+
+def _to_dos_datetime(timestamp: float):
+    value = time.localtime(timestamp)
+    year = min(max(value.tm_year, 1980), 2107)
+    dos_time = (value.tm_hour << 11) | (value.tm_min << 5) | (value.tm_sec // 2)
+    dos_date = ((year - 1980) << 9) | (value.tm_mon << 5) | value.tm_mday
+    return dos_time, dos_date
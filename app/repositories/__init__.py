@@ -1,12 +1,20 @@
 from app.repositories.user_repository import UserRepository
 from app.repositories.token_repository import TokenRepository
 from app.repositories.file_repository import FileRepository
+from app.repositories.blob_repository import BlobRepository
 from app.repositories.task_repository import TaskRepository
+from app.repositories.upload_session_repository import UploadSessionRepository
+from app.repositories.task_result_repository import TaskResultRepository
+from app.repositories.task_outbox_repository import TaskOutboxRepository
 
 __all__ = [
     "UserRepository",
     "TokenRepository", 
     "FileRepository",
+    "BlobRepository",
     "TaskRepository",
+    "UploadSessionRepository",
+    "TaskResultRepository",
+    "TaskOutboxRepository",
 ]
 
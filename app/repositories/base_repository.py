@@ -26,6 +26,18 @@ class BaseRepository(IBaseRepository[T]):
         await self.db.commit()
         await self.db.refresh(entity)
         return entity
+
+    async def create_many(self, entities: List[T]) -> List[T]:
+        """
+        Создает сущности одной транзакцией. INSERT отправляются пачками,
+        а значения по умолчанию со стороны БД возвращаются через RETURNING
+        (eager_defaults у модели), поэтому refresh на каждую сущность не нужен.
+        """
+        if not entities:
+            return []
+        self.db.add_all(entities)
+        await self.db.commit()
+        return entities
     
     async def update(self, id: uuid.UUID, update_data: dict) -> Optional[T]:
         stmt = (
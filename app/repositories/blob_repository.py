@@ -0,0 +1,98 @@
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+import uuid
+from sqlalchemy import and_, select, update as sql_update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.repositories.interfaces.blob_repository import IBlobRepository
+from app.repositories.base_repository import BaseRepository
+from app.models import Blob
+
+class BlobRepository(BaseRepository[Blob], IBlobRepository):
+    """
+    Репозиторий для работы с блобами, адресуемыми по содержимому
+    """
+
+    def __init__(self, db: AsyncSession):
+        super().__init__(db, Blob)
+
+    async def get_by_sha256(self, sha256: str) -> Optional[Blob]:
+        result = await self.db.execute(
+            select(Blob).where(Blob.sha256 == sha256)
+        )
+        return result.scalar_one_or_none()
+
+    async def acquire(self, sha256: str, size: int, storage_path: str) -> Blob:
+        stmt = (
+            insert(Blob)
+            .values(id=uuid.uuid4(), sha256=sha256, size=size, storage_path=storage_path, ref_count=1)
+            .on_conflict_do_update(
+                index_elements=[Blob.sha256],
+                set_={"ref_count": Blob.ref_count + 1}
+            )
+            .returning(Blob)
+            .execution_options(populate_existing=True)
+        )
+        result = await self.db.execute(stmt)
+        await self.db.commit()
+        return result.scalar_one()
+
+    async def acquire_many(self, items: List[Tuple[str, int, str]]) -> Dict[str, Blob]:
+        """
+        Один INSERT ... ON CONFLICT на всю пачку. Повторяющееся содержимое
+        схлопывается в одну строку с соответствующим числом ссылок, строки
+        идут в порядке sha256, чтобы параллельные пачки не взаимоблокировались.
+        """
+        if not items:
+            return {}
+        counts = Counter(sha256 for sha256, _, _ in items)
+        first = {}
+        for sha256, size, storage_path in items:
+            first.setdefault(sha256, (size, storage_path))
+
+        stmt = insert(Blob).values([
+            dict(
+                id=uuid.uuid4(),
+                sha256=sha256,
+                size=first[sha256][0],
+                storage_path=first[sha256][1],
+                ref_count=counts[sha256]
+            )
+            for sha256 in sorted(first)
+        ])
+        stmt = (
+            stmt.on_conflict_do_update(
+                index_elements=[Blob.sha256],
+                set_={"ref_count": Blob.ref_count + stmt.excluded.ref_count}
+            )
+            .returning(Blob)
+            .execution_options(populate_existing=True)
+        )
+        result = await self.db.execute(stmt)
+        await self.db.commit()
+        return {blob.sha256: blob for blob in result.scalars().all()}
+
+    async def release(self, blob_id: uuid.UUID) -> Optional[int]:
+        stmt = (
+            sql_update(Blob)
+            .where(Blob.id == blob_id)
+            .values(ref_count=Blob.ref_count - 1)
+            .returning(Blob.ref_count)
+        )
+        result = await self.db.execute(stmt)
+        await self.db.commit()
+        return result.scalar_one_or_none()
+
+    async def lock_unreferenced(self, blob_id: uuid.UUID) -> Optional[Blob]:
+        result = await self.db.execute(
+            select(Blob)
+            .where(
+                and_(
+                    Blob.id == blob_id,
+                    Blob.ref_count <= 0
+                )
+            )
+            .with_for_update()
+        )
+        return result.scalar_one_or_none()
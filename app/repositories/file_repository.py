@@ -1,12 +1,13 @@
+from collections import Counter
 from datetime import datetime
 from typing import List, Optional
 import uuid
-from sqlalchemy import and_, func, select
+from sqlalchemy import and_, func, select, update as sql_update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.repositories.interfaces.file_repository import IFileRepository
 from app.repositories.base_repository import BaseRepository
-from app.models import File
+from app.models import File, User
 
 class FileRepository(BaseRepository[File], IFileRepository):
     """
@@ -15,6 +16,47 @@ class FileRepository(BaseRepository[File], IFileRepository):
     def __init__(self, db : AsyncSession):
         super().__init__(db, File)
 
+    async def create(self, entity: File) -> File:
+        """
+        Создает файл и в той же транзакции увеличивает счетчик
+        занятого пользователем места
+        """
+        self.db.add(entity)
+        await self._add_storage_used(entity.user_id, entity.file_size)
+        await self.db.commit()
+        await self.db.refresh(entity)
+        return entity
+
+    async def create_many(self, entities: List[File]) -> List[File]:
+        """
+        Создает файлы (вместе с их задачами, если они привязаны через
+        File.tasks) одной транзакцией, счетчик места обновляется один раз
+        на пользователя
+        """
+        if not entities:
+            return []
+        self.db.add_all(entities)
+        used_by_user = Counter()
+        for entity in entities:
+            used_by_user[entity.user_id] += entity.file_size
+        for user_id, delta in used_by_user.items():
+            await self._add_storage_used(user_id, delta)
+        await self.db.commit()
+        return entities
+
+    async def delete(self, id: uuid.UUID) -> bool:
+        """
+        Удаляет файл и в той же транзакции уменьшает счетчик
+        занятого пользователем места
+        """
+        entity = await self.get_by_id(id)
+        if not entity:
+            return False
+        await self.db.delete(entity)
+        await self._add_storage_used(entity.user_id, -entity.file_size)
+        await self.db.commit()
+        return True
+
     async def get_by_user_id(self, user_id: uuid.UUID) -> List[File]:
         result = await self.db.execute(
             select(File).where(File.user_id == user_id)
@@ -87,6 +129,12 @@ class FileRepository(BaseRepository[File], IFileRepository):
         return result.scalar_one() or 0
     
     async def get_total_storage_used(self, user_id: uuid.UUID) -> int:
+        result = await self.db.execute(
+            select(User.storage_used_bytes).where(User.id == user_id)
+        )
+        return result.scalar_one_or_none() or 0
+
+    async def calculate_total_storage_used(self, user_id: uuid.UUID) -> int:
         result = await self.db.execute(
             select(func.coalesce(func.sum(File.file_size), 0)).where(File.user_id == user_id)
         )
@@ -119,3 +167,10 @@ class FileRepository(BaseRepository[File], IFileRepository):
             )
         )
         return result.scalar_one_or_none() is not None
+
+    async def _add_storage_used(self, user_id: uuid.UUID, delta: int) -> None:
+        await self.db.execute(
+            sql_update(User)
+            .where(User.id == user_id)
+            .values(storage_used_bytes=User.storage_used_bytes + delta)
+        )
@@ -11,6 +11,9 @@ class IBaseRepository(ABC, Generic[T]):
     
     @abstractmethod
     async def create(self, entity: T) -> T: ...
+
+    @abstractmethod
+    async def create_many(self, entities: List[T]) -> List[T]: ...
     
     @abstractmethod
     async def update(self, id: uuid.UUID, update_data: dict) -> Optional[T]: ...
@@ -0,0 +1,35 @@
+from abc import abstractmethod, ABC
+from typing import Dict, List, Optional, Tuple
+import uuid
+from app.models import Blob
+from app.repositories.interfaces.base_repository import IBaseRepository
+
+class IBlobRepository(IBaseRepository[Blob], ABC):
+    """
+    Интерфейс репозитория для работы с блобами, адресуемыми по содержимому
+    """
+
+    @abstractmethod
+    async def get_by_sha256(self, sha256: str) -> Optional[Blob]:
+        """Найти блоб по SHA-256 содержимого"""
+        ...
+
+    @abstractmethod
+    async def acquire(self, sha256: str, size: int, storage_path: str) -> Blob:
+        """Создать блоб или атомарно увеличить счетчик ссылок существующего"""
+        ...
+
+    @abstractmethod
+    async def acquire_many(self, items: List[Tuple[str, int, str]]) -> Dict[str, Blob]:
+        """Взять ссылки на блобы (sha256, size, storage_path) одним запросом, по ссылке на элемент"""
+        ...
+
+    @abstractmethod
+    async def release(self, blob_id: uuid.UUID) -> Optional[int]:
+        """Атомарно уменьшить счетчик ссылок (возвращает оставшееся количество)"""
+        ...
+
+    @abstractmethod
+    async def lock_unreferenced(self, blob_id: uuid.UUID) -> Optional[Blob]:
+        """Заблокировать блоб без ссылок до конца транзакции (для удаления)"""
+        ...
@@ -57,6 +57,11 @@ class IFileRepository(IBaseRepository[File], ABC):
         """Получить общий объем хранилища, используемый пользователем (в байтах)"""
         ...
 
+    @abstractmethod
+    async def calculate_total_storage_used(self, user_id: uuid.UUID) -> int:
+        """Посчитать объем хранилища пользователя по таблице files (без счетчика)"""
+        ...
+
     @abstractmethod
     async def get_files_uploaded_in_period(
         self, 
@@ -0,0 +1,25 @@
+from abc import abstractmethod, ABC
+from typing import Dict, List
+import uuid
+from app.models import TaskOutbox
+from app.repositories.interfaces.base_repository import IBaseRepository
+
+class ITaskOutboxRepository(IBaseRepository[TaskOutbox], ABC):
+    """
+    Интерфейс репозитория исходящего ящика задач
+    """
+
+    @abstractmethod
+    async def claim_batch(self, limit: int) -> List[TaskOutbox]:
+        """Заблокировать до limit самых старых записей (вместе с задачами) до release"""
+        ...
+
+    @abstractmethod
+    async def release(self, entry_ids: List[uuid.UUID], published: Dict[str, List[uuid.UUID]]) -> None:
+        """Удалить обработанные записи и проставить задачам ID отправленных сообщений"""
+        ...
+
+    @abstractmethod
+    async def requeue(self, queues: Dict[uuid.UUID, str], exhausted: List[uuid.UUID], error_message: str) -> None:
+        """Вернуть задачи с просроченной арендой в очередь, исчерпавшие попытки - в failed"""
+        ...
@@ -1,7 +1,7 @@
 from abc import abstractmethod, ABC
 from typing import List, Optional
 import uuid
-from app.models import Task
+from app.models import Task, TaskResult
 from app.repositories.interfaces.base_repository import IBaseRepository
 
 class ITaskRepository(IBaseRepository[Task], ABC):
@@ -19,6 +19,16 @@ class ITaskRepository(IBaseRepository[Task], ABC):
         """Найти задачу по ID задачи Celery"""
         ...
 
+    @abstractmethod
+    async def get_status(self, task_id: uuid.UUID) -> Optional[str]:
+        """Получить текущий статус задачи"""
+        ...
+
+    @abstractmethod
+    async def count_by_celery_task_id(self, celery_task_id: str) -> int:
+        """Сколько задач отправлено сообщением Celery с этим ID"""
+        ...
+
     @abstractmethod
     async def get_by_status(self, status: str) -> List[Task]:
         """Получить задачи по статусу"""
@@ -55,22 +65,52 @@ class ITaskRepository(IBaseRepository[Task], ABC):
         ...
 
     @abstractmethod
-    async def update_progress(self, task_id: uuid.UUID, progress: int) -> Optional[Task]:
-        """Обновить прогресс задачи"""
+    async def update_progress(self, task_id: uuid.UUID, progress: int) -> bool:
+        """Поднять прогресс задачи (без чтения строки), True если он изменился"""
+        ...
+
+    @abstractmethod
+    async def claim(self, task_id: uuid.UUID, lease_owner: str, lease_seconds: int) -> Optional[Task]:
+        """Взять задачу в работу с арендой (None, если ее нельзя взять)"""
+        ...
+
+    @abstractmethod
+    async def extend_lease(self, task_id: uuid.UUID, lease_owner: str, lease_seconds: int) -> bool:
+        """Продлить аренду задачи, True если владелец все еще держит ее"""
+        ...
+
+    @abstractmethod
+    async def get_expired_leases(self, limit: int) -> List[Task]:
+        """Заблокировать задачи с просроченной арендой"""
         ...
 
     @abstractmethod
     async def mark_as_completed(
         self, 
         task_id: uuid.UUID, 
-        result_file_path: Optional[str] = None
+        result_file_path: Optional[str] = None,
+        lease_owner: Optional[str] = None,
+        results: Optional[List[TaskResult]] = None
     ) -> Optional[Task]:
-        """Пометить задачу как завершенную"""
+        """
+        Пометить задачу как завершенную и в той же транзакции сохранить ее
+        именованные результаты (None, если задача отменена или аренда потеряна)
+        """
         ...
 
     @abstractmethod
-    async def mark_as_failed(self, task_id: uuid.UUID, error_message: str) -> Optional[Task]:
-        """Пометить задачу как failed"""
+    async def mark_as_failed(
+        self,
+        task_id: uuid.UUID,
+        error_message: str,
+        lease_owner: Optional[str] = None
+    ) -> Optional[Task]:
+        """Пометить задачу как failed (None, если задача отменена или аренда потеряна)"""
+        ...
+
+    @abstractmethod
+    async def mark_as_cancelled(self, task_id: uuid.UUID) -> bool:
+        """Отменить незавершенную задачу, True если она была отменена"""
         ...
 
     @abstractmethod
@@ -112,6 +152,11 @@ class ITaskRepository(IBaseRepository[Task], ABC):
         """Получить количество задач пользователя"""
         ...
 
+    @abstractmethod
+    async def count_active_tasks(self, user_id: Optional[uuid.UUID] = None) -> int:
+        """Количество задач в очереди и в работе (всего или у пользователя)"""
+        ...
+
     @abstractmethod
     async def get_tasks_stats(self) -> dict:
         """Получить статистику по задачам"""
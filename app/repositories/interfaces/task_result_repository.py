@@ -0,0 +1,20 @@
+from abc import abstractmethod, ABC
+from typing import List, Optional
+import uuid
+from app.models import TaskResult
+from app.repositories.interfaces.base_repository import IBaseRepository
+
+class ITaskResultRepository(IBaseRepository[TaskResult], ABC):
+    """
+    Интерфейс репозитория для работы с именованными результатами задач
+    """
+
+    @abstractmethod
+    async def get_by_task_id(self, task_id: uuid.UUID) -> List[TaskResult]:
+        """Получить все результаты задачи"""
+        ...
+
+    @abstractmethod
+    async def get_by_name(self, task_id: uuid.UUID, name: str) -> Optional[TaskResult]:
+        """Получить результат задачи по имени"""
+        ...
@@ -0,0 +1,50 @@
+from abc import abstractmethod, ABC
+from typing import List, Optional
+import uuid
+from app.models import UploadSession
+from app.repositories.interfaces.base_repository import IBaseRepository
+
+class IUploadSessionRepository(IBaseRepository[UploadSession], ABC):
+    """
+    Интерфейс репозитория для работы с сессиями возобновляемой загрузки
+    """
+
+    @abstractmethod
+    async def get_user_session(self, user_id: uuid.UUID, session_id: uuid.UUID) -> Optional[UploadSession]:
+        """Получить сессию загрузки пользователя"""
+        ...
+
+    @abstractmethod
+    async def advance_offset(
+        self,
+        session_id: uuid.UUID,
+        expected_offset: int,
+        new_offset: int
+    ) -> Optional[UploadSession]:
+        """Сдвинуть подтвержденный offset, если он не изменился с момента чтения"""
+        ...
+
+    @abstractmethod
+    async def start_completion(self, session_id: uuid.UUID) -> bool:
+        """Перевести полностью загруженную сессию из active в completing"""
+        ...
+
+    @abstractmethod
+    async def reopen(self, session_id: uuid.UUID) -> bool:
+        """Вернуть сессию из completing в active"""
+        ...
+
+    @abstractmethod
+    async def mark_as_completed(self, session_id: uuid.UUID, task_id: uuid.UUID) -> Optional[UploadSession]:
+        """Пометить сессию как завершенную"""
+        ...
+
+    @abstractmethod
+    async def mark_as_aborted(self, session_id: uuid.UUID) -> Optional[UploadSession]:
+        """Пометить сессию как прерванную"""
+        ...
+
+    @abstractmethod
+    async def get_expired_sessions(self) -> List[UploadSession]:
+        """Получить незавершенные сессии с истекшим сроком жизни"""
+        ...
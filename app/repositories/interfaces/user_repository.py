@@ -32,3 +32,6 @@ class IUserRepository(IBaseRepository[User], ABC):
         start_date: datetime, 
         end_date: datetime
     ) -> List[User]: ...
+
+    @abstractmethod
+    async def reconcile_storage_used(self) -> int: ...
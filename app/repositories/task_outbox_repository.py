@@ -0,0 +1,75 @@
+from datetime import datetime, timezone
+from typing import Dict, List
+import uuid
+from sqlalchemy import delete, select, update as sql_update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager
+
+from app.repositories.interfaces.task_outbox_repository import ITaskOutboxRepository
+from app.repositories.base_repository import BaseRepository
+from app.models import Task, TaskOutbox
+
+class TaskOutboxRepository(BaseRepository[TaskOutbox], ITaskOutboxRepository):
+    """
+    Репозиторий исходящего ящика задач. claim_batch и release образуют одну
+    транзакцию: записи заблокированы, пока сообщения отправляются брокеру
+    """
+
+    def __init__(self, db: AsyncSession):
+        super().__init__(db, TaskOutbox)
+
+    async def claim_batch(self, limit: int) -> List[TaskOutbox]:
+        """
+        SKIP LOCKED: параллельные ретрансляторы (по одному на процесс API)
+        разбирают разные записи, не дожидаясь друг друга
+        """
+        result = await self.db.execute(
+            select(TaskOutbox)
+            .join(TaskOutbox.task)
+            .options(contains_eager(TaskOutbox.task))
+            .order_by(TaskOutbox.created_at)
+            .limit(limit)
+            .with_for_update(of=TaskOutbox, skip_locked=True)
+        )
+        return result.scalars().all()
+
+    async def release(self, entry_ids: List[uuid.UUID], published: Dict[str, List[uuid.UUID]]) -> None:
+        for job_id, task_ids in published.items():
+            await self.db.execute(
+                sql_update(Task)
+                .where(Task.id.in_(task_ids))
+                .values(celery_task_id=job_id)
+            )
+        if entry_ids:
+            await self.db.execute(delete(TaskOutbox).where(TaskOutbox.id.in_(entry_ids)))
+        await self.db.commit()
+
+    async def requeue(self, queues: Dict[uuid.UUID, str], exhausted: List[uuid.UUID], error_message: str) -> None:
+        """
+        Возвращает задачи с просроченной арендой в pending с новой записью
+        ящика (queues: ID задачи -> очередь), а исчерпавшие попытки
+        помечает failed - одной транзакцией с их блокировкой
+        """
+        if queues:
+            await self.db.execute(
+                sql_update(Task)
+                .where(Task.id.in_(list(queues)))
+                .values(status='pending', lease_owner=None, lease_expires_at=None)
+            )
+            self.db.add_all([
+                TaskOutbox(task_id=task_id, queue=queue, job_id=str(uuid.uuid4()))
+                for task_id, queue in queues.items()
+            ])
+        if exhausted:
+            await self.db.execute(
+                sql_update(Task)
+                .where(Task.id.in_(exhausted))
+                .values(
+                    status='failed',
+                    completed_at=datetime.now(timezone.utc),
+                    error_message=error_message,
+                    lease_owner=None,
+                    lease_expires_at=None
+                )
+            )
+        await self.db.commit()
@@ -1,12 +1,13 @@
 from typing import List, Optional, Dict
 import uuid
 from datetime import datetime, timedelta, timezone
-from sqlalchemy import select, and_, func
+from sqlalchemy import select, and_, or_, func, update as sql_update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager
 
 from app.repositories.interfaces.task_repository import ITaskRepository
 from app.repositories.base_repository import BaseRepository
-from app.models import Task
+from app.models import Task, TaskResult
 
 class TaskRepository(BaseRepository[Task], ITaskRepository):
     """
@@ -28,6 +29,17 @@ class TaskRepository(BaseRepository[Task], ITaskRepository):
         )
         return result.scalar_one_or_none()
 
+    async def get_status(self, task_id: uuid.UUID) -> Optional[str]:
+        """Текущий статус из БД, мимо уже загруженного в сессию объекта"""
+        result = await self.db.execute(select(Task.status).where(Task.id == task_id))
+        return result.scalar_one_or_none()
+
+    async def count_by_celery_task_id(self, celery_task_id: str) -> int:
+        result = await self.db.execute(
+            select(func.count(Task.id)).where(Task.celery_task_id == celery_task_id)
+        )
+        return result.scalar_one() or 0
+
     async def get_by_status(self, status: str) -> List[Task]:
         result = await self.db.execute(
             select(Task).where(Task.status == status)
@@ -81,13 +93,85 @@ class TaskRepository(BaseRepository[Task], ITaskRepository):
             
         return await self.update(task_id, update_data)
 
-    async def update_progress(self, task_id: uuid.UUID, progress: int) -> Optional[Task]:
-        return await self.update(task_id, {"progress": progress})
+    async def update_progress(self, task_id: uuid.UUID, progress: int) -> bool:
+        """
+        Один UPDATE без RETURNING и refresh. Прогресс только растет,
+        поэтому запоздавшее меньшее значение ничего не перезаписывает.
+        """
+        result = await self.db.execute(
+            sql_update(Task)
+            .where(and_(Task.id == task_id, Task.progress < progress))
+            .values(progress=progress)
+        )
+        await self.db.commit()
+        return result.rowcount > 0
+
+    async def claim(self, task_id: uuid.UUID, lease_owner: str, lease_seconds: int) -> Optional[Task]:
+        """
+        Атомарно берет задачу в работу: pending -> processing или перехват
+        просроченной аренды. None - задачу уже выполняет другой воркер,
+        либо она завершена или отменена. Время берется из часов БД, чтобы
+        расхождение часов воркеров не влияло на аренду
+        """
+        result = await self.db.execute(
+            sql_update(Task)
+            .where(and_(
+                Task.id == task_id,
+                or_(Task.status == 'pending', self._lease_expired())
+            ))
+            .values(
+                status='processing',
+                started_at=func.now(),
+                lease_owner=lease_owner,
+                lease_expires_at=func.now() + timedelta(seconds=lease_seconds),
+                attempts=Task.attempts + 1
+            )
+            .returning(Task)
+        )
+        await self.db.commit()
+
+        task = result.scalar_one_or_none()
+        if task:
+            await self.db.refresh(task)
+        return task
+
+    async def extend_lease(self, task_id: uuid.UUID, lease_owner: str, lease_seconds: int) -> bool:
+        """Продлевает аренду; False - задача отменена или ее перехватил другой воркер"""
+        result = await self.db.execute(
+            sql_update(Task)
+            .where(and_(
+                Task.id == task_id,
+                Task.status == 'processing',
+                Task.lease_owner == lease_owner
+            ))
+            .values(lease_expires_at=func.now() + timedelta(seconds=lease_seconds))
+        )
+        await self.db.commit()
+        return result.rowcount > 0
+
+    async def get_expired_leases(self, limit: int) -> List[Task]:
+        """
+        Задачи с просроченной арендой (воркер упал) вместе с файлами.
+        Строки блокируются до конца транзакции вызывающего; задачи, уже
+        стоящие в исходящем ящике, пропускаются
+        """
+        result = await self.db.execute(
+            select(Task)
+            .join(Task.file)
+            .options(contains_eager(Task.file))
+            .where(and_(self._lease_expired(), ~Task.outbox.has()))
+            .order_by(Task.lease_expires_at)
+            .limit(limit)
+            .with_for_update(of=Task, skip_locked=True)
+        )
+        return result.scalars().all()
 
     async def mark_as_completed(
         self, 
         task_id: uuid.UUID, 
-        result_file_path: Optional[str] = None
+        result_file_path: Optional[str] = None,
+        lease_owner: Optional[str] = None,
+        results: Optional[List[TaskResult]] = None
     ) -> Optional[Task]:
         update_data = {
             "status": "completed",
@@ -97,14 +181,69 @@ class TaskRepository(BaseRepository[Task], ITaskRepository):
         if result_file_path:
             update_data["result_file_path"] = result_file_path
             
-        return await self.update(task_id, update_data)
+        return await self._finish(task_id, update_data, lease_owner, results)
 
-    async def mark_as_failed(self, task_id: uuid.UUID, error_message: str) -> Optional[Task]:
-        return await self.update(task_id, {
+    async def mark_as_failed(
+        self,
+        task_id: uuid.UUID,
+        error_message: str,
+        lease_owner: Optional[str] = None
+    ) -> Optional[Task]:
+        return await self._finish(task_id, {
             "status": "failed",
             "completed_at": datetime.now(timezone.utc),
             "error_message": error_message
-        })
+        }, lease_owner)
+
+    async def mark_as_cancelled(self, task_id: uuid.UUID) -> bool:
+        """Отменяет задачу, только если она еще pending или processing"""
+        result = await self.db.execute(
+            sql_update(Task)
+            .where(and_(Task.id == task_id, Task.status.in_(['pending', 'processing'])))
+            .values(status='cancelled', completed_at=datetime.now(timezone.utc))
+        )
+        await self.db.commit()
+        return result.rowcount > 0
+
+    async def _finish(
+        self,
+        task_id: uuid.UUID,
+        update_data: dict,
+        lease_owner: Optional[str] = None,
+        results: Optional[List[TaskResult]] = None
+    ) -> Optional[Task]:
+        """
+        Итоговое обновление задачи. Отмененная задача не перезаписывается:
+        отмена могла прийти, пока воркер дописывал результат. С lease_owner
+        задачу завершает только воркер, который все еще держит аренду.
+        Результаты (results) вставляются той же транзакцией и только если
+        обновление прошло, поэтому завершенная задача не видна без них
+        """
+        condition = and_(Task.id == task_id, Task.status != 'cancelled')
+        if lease_owner:
+            condition = and_(condition, Task.status == 'processing', Task.lease_owner == lease_owner)
+        result = await self.db.execute(
+            sql_update(Task)
+            .where(condition)
+            .values(**update_data, lease_expires_at=None)
+            .returning(Task)
+        )
+        task = result.scalar_one_or_none()
+        if task and results:
+            self.db.add_all(results)
+        await self.db.commit()
+
+        if task:
+            await self.db.refresh(task)
+        return task
+
+    @staticmethod
+    def _lease_expired():
+        """Задача в работе, но ее аренда истекла (или не ставилась)"""
+        return and_(
+            Task.status == 'processing',
+            or_(Task.lease_expires_at.is_(None), Task.lease_expires_at < func.now())
+        )
 
     async def get_recent_tasks(self, user_id: uuid.UUID, limit: int = 10) -> List[Task]:
         result = await self.db.execute(
@@ -168,6 +307,13 @@ class TaskRepository(BaseRepository[Task], ITaskRepository):
         )
         return result.scalar_one() or 0
 
+    async def count_active_tasks(self, user_id: Optional[uuid.UUID] = None) -> int:
+        stmt = select(func.count(Task.id)).where(Task.status.in_(['pending', 'processing']))
+        if user_id:
+            stmt = stmt.where(Task.user_id == user_id)
+        result = await self.db.execute(stmt)
+        return result.scalar_one() or 0
+
     async def get_tasks_stats(self) -> Dict[str, int]:
         result = await self.db.execute(
             select(
@@ -0,0 +1,35 @@
+from typing import List, Optional
+import uuid
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.repositories.interfaces.task_result_repository import ITaskResultRepository
+from app.repositories.base_repository import BaseRepository
+from app.models import TaskResult
+
+class TaskResultRepository(BaseRepository[TaskResult], ITaskResultRepository):
+    """
+    Репозиторий для работы с именованными результатами задач
+    """
+
+    def __init__(self, db: AsyncSession):
+        super().__init__(db, TaskResult)
+
+    async def get_by_task_id(self, task_id: uuid.UUID) -> List[TaskResult]:
+        result = await self.db.execute(
+            select(TaskResult)
+            .where(TaskResult.task_id == task_id)
+            .order_by(TaskResult.created_at, TaskResult.name)
+        )
+        return result.scalars().all()
+
+    async def get_by_name(self, task_id: uuid.UUID, name: str) -> Optional[TaskResult]:
+        result = await self.db.execute(
+            select(TaskResult).where(
+                and_(
+                    TaskResult.task_id == task_id,
+                    TaskResult.name == name
+                )
+            )
+        )
+        return result.scalar_one_or_none()
@@ -0,0 +1,96 @@
+from datetime import datetime, timezone
+from typing import List, Optional
+import uuid
+from sqlalchemy import and_, select, update as sql_update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.repositories.interfaces.upload_session_repository import IUploadSessionRepository
+from app.repositories.base_repository import BaseRepository
+from app.models import UploadSession
+
+class UploadSessionRepository(BaseRepository[UploadSession], IUploadSessionRepository):
+    """
+    Репозиторий для работы с сессиями возобновляемой загрузки
+    """
+
+    def __init__(self, db: AsyncSession):
+        super().__init__(db, UploadSession)
+
+    async def get_user_session(self, user_id: uuid.UUID, session_id: uuid.UUID) -> Optional[UploadSession]:
+        result = await self.db.execute(
+            select(UploadSession).where(
+                and_(
+                    UploadSession.id == session_id,
+                    UploadSession.user_id == user_id
+                )
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def advance_offset(
+        self,
+        session_id: uuid.UUID,
+        expected_offset: int,
+        new_offset: int
+    ) -> Optional[UploadSession]:
+        stmt = (
+            sql_update(UploadSession)
+            .where(
+                and_(
+                    UploadSession.id == session_id,
+                    UploadSession.status == 'active',
+                    UploadSession.received_bytes == expected_offset
+                )
+            )
+            .values(received_bytes=new_offset)
+            .returning(UploadSession)
+        )
+        result = await self.db.execute(stmt)
+        await self.db.commit()
+        return result.scalar_one_or_none()
+
+    async def start_completion(self, session_id: uuid.UUID) -> bool:
+        """
+        Условный переход active -> completing: из параллельных вызовов
+        завершения файл и задачу создаст только один
+        """
+        result = await self.db.execute(
+            sql_update(UploadSession)
+            .where(
+                and_(
+                    UploadSession.id == session_id,
+                    UploadSession.status == 'active',
+                    UploadSession.received_bytes == UploadSession.total_size
+                )
+            )
+            .values(status='completing')
+        )
+        await self.db.commit()
+        return result.rowcount > 0
+
+    async def reopen(self, session_id: uuid.UUID) -> bool:
+        """Возвращает сессию из completing в active, чтобы завершение можно было повторить"""
+        result = await self.db.execute(
+            sql_update(UploadSession)
+            .where(and_(UploadSession.id == session_id, UploadSession.status == 'completing'))
+            .values(status='active')
+        )
+        await self.db.commit()
+        return result.rowcount > 0
+
+    async def mark_as_completed(self, session_id: uuid.UUID, task_id: uuid.UUID) -> Optional[UploadSession]:
+        return await self.update(session_id, {"status": "completed", "task_id": task_id})
+
+    async def mark_as_aborted(self, session_id: uuid.UUID) -> Optional[UploadSession]:
+        return await self.update(session_id, {"status": "aborted"})
+
+    async def get_expired_sessions(self) -> List[UploadSession]:
+        result = await self.db.execute(
+            select(UploadSession).where(
+                and_(
+                    UploadSession.status.in_(['active', 'completing']),
+                    UploadSession.expires_at <= datetime.now(timezone.utc)
+                )
+            )
+        )
+        return result.scalars().all()
@@ -1,12 +1,12 @@
 from datetime import timezone
 from typing import List, Optional
 import uuid
-from sqlalchemy import select
+from sqlalchemy import and_, func, select, update as sql_update
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 from app.repositories.interfaces.user_repository import IUserRepository
 from app.repositories.base_repository import BaseRepository
-from app.models import User
+from app.models import File, User
 
 class UserRepository(BaseRepository[User], IUserRepository):
     """
@@ -83,4 +83,45 @@ class UserRepository(BaseRepository[User], IUserRepository):
             )
         )
         return result.scalars().all()
-    
+
+    async def reconcile_storage_used(self) -> int:
+        """
+        Исправляет расхождения storage_used_bytes с фактической суммой размеров файлов.
+        Каждый пользователь пересчитывается в отдельной транзакции под блокировкой
+        строки, чтобы параллельная загрузка не потеряла свое приращение
+        Возвращает количество исправленных пользователей
+        """
+        actual_usage = (
+            select(func.coalesce(func.sum(File.file_size), 0))
+            .where(File.user_id == User.id)
+            .scalar_subquery()
+        )
+        result = await self.db.execute(
+            select(User.id).where(User.storage_used_bytes != actual_usage)
+        )
+        user_ids = result.scalars().all()
+        await self.db.commit()
+
+        repaired = 0
+        for user_id in user_ids:
+            await self.db.execute(
+                select(User.id).where(User.id == user_id).with_for_update()
+            )
+            usage_result = await self.db.execute(
+                select(func.coalesce(func.sum(File.file_size), 0)).where(File.user_id == user_id)
+            )
+            usage = usage_result.scalar_one()
+            update_result = await self.db.execute(
+                sql_update(User)
+                .where(
+                    and_(
+                        User.id == user_id,
+                        User.storage_used_bytes != usage
+                    )
+                )
+                .values(storage_used_bytes=usage)
+            )
+            await self.db.commit()
+            repaired += update_result.rowcount
+        return repaired
+
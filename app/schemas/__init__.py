@@ -2,6 +2,7 @@ from app.schemas.user import *
 from app.schemas.token import *
 from app.schemas.file import *
 from app.schemas.task import *
+from app.schemas.upload_session import *
 
 __all__ = [
     # User schemas
@@ -14,5 +15,8 @@ __all__ = [
     "FileBase", "FileCreate", "FileResponse", "FileUpload", "FileListResponse",
     
     # Task schemas
-    "TaskBase", "TaskCreate", "TaskResponse", "TaskUpdate", "TaskListResponse",
+    "TaskBase", "TaskCreate", "TaskResponse", "TaskUpdate", "TaskListResponse", "TaskResultResponse",
+
+    # Upload session schemas
+    "UploadSessionCreate", "UploadSessionResponse", "UploadSessionStatus",
 ]
\ No newline at end of file
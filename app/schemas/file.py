@@ -1,5 +1,5 @@
-from pydantic import BaseModel, ConfigDict
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+from typing import List, Optional
 import uuid
 from datetime import datetime
 from enum import Enum
@@ -11,6 +11,137 @@ class FileOperationType(str, Enum):
     COMPRESS_ZIP = "compress_zip"
     RESIZE_IMAGE = "resize_image"
 
+class CompressionLevel(str, Enum):
+    STORE = "store"
+    FAST = "fast"
+    DEFAULT = "default"
+    MAX = "max"
+
+class ImageFormat(str, Enum):
+    JPEG = "jpeg"
+    PNG = "png"
+    WEBP = "webp"
+
+class RenditionParameters(BaseModel):
+    name: str = Field(pattern=r"^[a-z0-9_-]{1,32}$")
+    width: Optional[int] = Field(default=None, gt=0)
+    height: Optional[int] = Field(default=None, gt=0)
+    format: Optional[ImageFormat] = None
+    quality: Optional[int] = 95
+    target_size_bytes: Optional[int] = Field(default=None, gt=0)
+
+    @model_validator(mode="after")
+    def check_target_size_format(self):
+        if self.target_size_bytes and self.format == ImageFormat.PNG:
+            raise ValueError("target_size_bytes requires jpeg or webp format")
+        return self
+
+class PipelineStep(BaseModel):
+    """Шаг конвейера, выполняемый после основной операции задачи"""
+    operation: FileOperationType
+    width: Optional[int] = Field(default=None, gt=0)
+    height: Optional[int] = Field(default=None, gt=0)
+    quality: Optional[int] = 95
+    target_size_bytes: Optional[int] = Field(default=None, gt=0)
+    compression_level: Optional[CompressionLevel] = None
+
+    def to_parameters(self) -> "FileConversionParameters":
+        return FileConversionParameters(**self.model_dump(exclude={"operation"}))
+
+class FileConversionParameters(BaseModel):
+    width: Optional[int] = None
+    height: Optional[int] = None
+    quality: Optional[int] = 95
+    # Максимальный размер результата JPEG/WebP: quality подбирается не выше заданного
+    target_size_bytes: Optional[int] = Field(default=None, gt=0)
+    compression_level: Optional[CompressionLevel] = None
+    renditions: Optional[List[RenditionParameters]] = Field(default=None, min_length=1, max_length=10)
+    # Следующие шаги в том же воркере: результат шага передается дальше в памяти
+    pipeline: Optional[List[PipelineStep]] = Field(default=None, min_length=1, max_length=4)
+
+    @field_validator("renditions")
+    @classmethod
+    def check_unique_rendition_names(cls, renditions):
+        if renditions and len({rendition.name for rendition in renditions}) != len(renditions):
+            raise ValueError("Rendition names must be unique")
+        return renditions
+
+
+# Операции, результат которых может быть JPEG/WebP. Остальные форматы
+# сжимаются без потерь, и target_size_bytes для них отклоняется: здесь, если
+# формат результата известен заранее, иначе - при загрузке по типу файла
+TARGET_SIZE_OPERATIONS = frozenset({
+    FileOperationType.CONVERT_PNG_TO_JPG,
+    FileOperationType.RESIZE_IMAGE,
+})
+
+
+def check_operation_parameters(
+    operation: FileOperationType,
+    parameters: Optional[FileConversionParameters]
+) -> None:
+    """
+    Несколько рендишенов поддерживает только RESIZE_IMAGE и только без
+    конвейера; target_size_bytes - только операции с JPEG/WebP на выходе.
+    В конвейере каждый шаг должен принимать то, что отдает предыдущий
+    """
+    if not parameters:
+        return
+    if parameters.renditions:
+        if operation != FileOperationType.RESIZE_IMAGE:
+            raise ValueError("renditions are only supported for resize_image")
+        if parameters.pipeline:
+            raise ValueError("renditions cannot be combined with a pipeline")
+
+    from app.core.file_types import LOSSY_IMAGE_MIME_TYPES, OPERATION_OUTPUT_TYPES
+
+    steps = [(operation, parameters.target_size_bytes)]
+    steps += [(step.operation, step.target_size_bytes) for step in parameters.pipeline or []]
+    output = None  # тип результата предыдущего шага; None - зависит от файла
+    for step_operation, target_size_bytes in steps:
+        output = OPERATION_OUTPUT_TYPES.get(step_operation) or output
+        if not target_size_bytes:
+            continue
+        if step_operation not in TARGET_SIZE_OPERATIONS:
+            raise ValueError(f"target_size_bytes is not supported for {step_operation.value}")
+        if output is not None and output.mime_type not in LOSSY_IMAGE_MIME_TYPES:
+            raise ValueError(f"target_size_bytes is not supported for {output.mime_type} output")
+    check_operation_chain(get_operation_chain(operation, parameters))
+
+
+def check_operation_chain(chain: List[FileOperationType]) -> None:
+    """
+    Проверяет совместимость шагов конвейера, не зная самого файла: типы,
+    которые может получить шаг, сужаются по входу первой операции и
+    выходам предыдущих. Конкретный файл проверяется при загрузке
+    """
+    from app.core.file_types import OPERATION_INPUT_TYPES, OPERATION_OUTPUT_TYPES
+
+    possible = None  # None - любой тип
+    previous = None
+    for step in chain:
+        accepted = OPERATION_INPUT_TYPES.get(step)
+        if accepted is not None:
+            if possible is not None and not possible & accepted:
+                raise ValueError(
+                    f"{step.value} cannot follow {previous.value}: it accepts {', '.join(sorted(accepted))}, "
+                    f"got {', '.join(sorted(possible))}"
+                )
+            possible = accepted if possible is None else possible & accepted
+        output = OPERATION_OUTPUT_TYPES.get(step)
+        if output is not None:
+            possible = frozenset({output.mime_type})
+        previous = step
+
+
+def get_operation_chain(
+    operation: FileOperationType,
+    parameters: Optional[FileConversionParameters] = None
+) -> List[FileOperationType]:
+    """Операция задачи и следующие за ней шаги конвейера по порядку"""
+    steps = parameters.pipeline if parameters and parameters.pipeline else []
+    return [FileOperationType(operation)] + [step.operation for step in steps]
+
 class FileBase(BaseModel):
     original_filename: str
 
@@ -21,9 +152,16 @@ class FileCreate(FileBase):
     file_size: int
     mime_type: str
     extension: str
+    content_hash: Optional[str] = None
 
 class FileUpload(BaseModel):
     operation: FileOperationType
+    parameters: Optional[FileConversionParameters] = None
+
+    @model_validator(mode="after")
+    def check_parameters(self):
+        check_operation_parameters(self.operation, self.parameters)
+        return self
 
 class FileResponse(FileBase):
     model_config = ConfigDict(from_attributes=True)
@@ -35,15 +173,18 @@ class FileResponse(FileBase):
     file_size: int
     mime_type: str
     extension: str
+    content_hash: Optional[str] = None
     is_processed: bool
     uploaded_at: datetime
 
 class FileListResponse(BaseModel):
     files: list[FileResponse]
     total_count: int
-    total_size: int  
+    total_size: int
 
-class FileConversionParameters(BaseModel):
-    width: Optional[int] = None
-    height: Optional[int] = None
-    quality: Optional[int] = 95
\ No newline at end of file
+class FileDownloadInfo(BaseModel):
+    storage_key: str
+    filename: str
+    media_type: str
+    etag: Optional[str] = None
+    immutable: bool = False
@@ -20,7 +20,7 @@ class TaskBase(BaseModel):
 class TaskCreate(TaskBase):
     user_id: uuid.UUID
     file_id: uuid.UUID
-    celery_task_id: str
+    celery_task_id: Optional[str] = None
 
 class TaskUpdate(BaseModel):
     status: Optional[TaskStatus] = None
@@ -37,7 +37,7 @@ class TaskResponse(TaskBase):
     id: uuid.UUID
     user_id: uuid.UUID
     file_id: uuid.UUID
-    celery_task_id: str
+    celery_task_id: Optional[str] = None
     status: TaskStatus
     progress: int
     result_file_path: Optional[str]
@@ -47,6 +47,16 @@ class TaskResponse(TaskBase):
     completed_at: Optional[datetime]
     notification_sent: bool
 
+class TaskResultResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    name: str
+    mime_type: str
+    file_size: int
+    width: int
+    height: int
+    created_at: datetime
+
 class TaskListResponse(BaseModel):
     tasks: list[TaskResponse]
     total_count: int
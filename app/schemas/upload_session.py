@@ -0,0 +1,38 @@
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from typing import Optional
+import uuid
+from datetime import datetime
+from enum import Enum
+
+from app.schemas.file import FileConversionParameters, FileOperationType, check_operation_parameters
+
+class UploadSessionStatus(str, Enum):
+    ACTIVE = "active"
+    COMPLETING = "completing"
+    COMPLETED = "completed"
+    ABORTED = "aborted"
+
+class UploadSessionCreate(BaseModel):
+    original_filename: str
+    total_size: int = Field(gt=0)
+    content_type: Optional[str] = None
+    operation: FileOperationType
+    parameters: Optional[FileConversionParameters] = None
+
+    @model_validator(mode="after")
+    def check_parameters(self):
+        check_operation_parameters(self.operation, self.parameters)
+        return self
+
+class UploadSessionResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: uuid.UUID
+    original_filename: str
+    operation_type: FileOperationType
+    total_size: int
+    received_bytes: int
+    status: UploadSessionStatus
+    task_id: Optional[uuid.UUID]
+    created_at: datetime
+    expires_at: datetime
@@ -0,0 +1,597 @@
+import mimetypes
+import os
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from app.core.admission import AdmissionController
+from app.core.config import settings
+from app.core.exceptions import (
+    FileNotFoundException,
+    FileProcessingException,
+    InsufficientStorageException,
+    TaskNotFoundException,
+    TaskResultNotReadyException,
+)
+from app.core.file_types import (
+    UNKNOWN_FILE_TYPE,
+    ensure_operation_accepts,
+    get_rendition_extension,
+    get_result_extension,
+)
+from app.core.uploads import StoredUpload, stream_upload_to_disk
+from app.models import Blob, File, Task, TaskOutbox, TaskResult
+from app.repositories.interfaces.blob_repository import IBlobRepository
+from app.repositories.interfaces.file_repository import IFileRepository
+from app.repositories.interfaces.task_repository import ITaskRepository
+from app.repositories.interfaces.task_result_repository import ITaskResultRepository
+from app.schemas.file import (
+    FileConversionParameters,
+    FileDownloadInfo,
+    FileListResponse,
+    FileOperationType,
+    FileResponse,
+    FileUpload,
+    RenditionParameters,
+)
+from app.schemas.task import (
+    TaskListResponse,
+    TaskProgressUpdate,
+    TaskResponse,
+    TaskResultResponse,
+    TaskStatus,
+)
+from app.services.interfaces import IFileService
+from app.services.outbox_relay import OutboxRelay
+from app.services.progress_channel import TaskProgressChannel
+from app.services.result_cache import ResultCache
+from app.storage import IStorageBackend, blob_key, result_key
+from app.worker import get_message_size, get_queue
+
+
+class FileService(IFileService):
+
+    def __init__(
+        self,
+        file_repository: IFileRepository,
+        task_repository: ITaskRepository,
+        task_result_repository: ITaskResultRepository,
+        blob_repository: IBlobRepository,
+        result_cache: ResultCache,
+        storage: IStorageBackend,
+        outbox_relay: OutboxRelay,
+        admission: AdmissionController,
+        progress_channel: TaskProgressChannel
+    ):
+        self.file_repo = file_repository
+        self.task_repo = task_repository
+        self.task_result_repo = task_result_repository
+        self.blob_repo = blob_repository
+        self.result_cache = result_cache
+        self.storage = storage
+        self.outbox_relay = outbox_relay
+        self.admission = admission
+        self.progress_channel = progress_channel
+
+    async def upload_file(
+        self,
+        user_id: uuid.UUID,
+        file: UploadFile,
+        upload_data: FileUpload
+    ) -> TaskResponse:
+        """
+        Потоково принимает файл во временный каталог, кладет его в хранилище
+        и создает задачу обработки. Содержимое, не подходящее для операции,
+        отклоняется по первым байтам до записи на диск.
+        """
+        await self._check_task_capacity(user_id, 1)
+        await self._check_storage_quota(user_id, file.size or 0)
+
+        temp_path = os.path.join(settings.UPLOAD_DIR, "tmp", uuid.uuid4().hex)
+        stored = await stream_upload_to_disk(
+            file, temp_path, operation=upload_data.operation, parameters=upload_data.parameters
+        )
+        return await self._register_stored_upload(
+            user_id, stored, file.filename, file.content_type, upload_data
+        )
+
+    async def create_from_stored_upload(
+        self,
+        user_id: uuid.UUID,
+        stored: StoredUpload,
+        original_filename: Optional[str],
+        content_type: Optional[str],
+        upload_data: FileUpload
+    ) -> TaskResponse:
+        """
+        Регистрирует уже записанный на локальный диск файл: содержимое кладется
+        в хранилище как блоб по SHA-256 (или переиспользуется существующий),
+        создаются File и задача. MIME-тип и расширение берутся из определенного
+        по сигнатуре типа; заявленные клиентом используются, только если
+        сигнатура не распознана. При переполненной очереди (429) файл остается
+        на месте, чтобы вызов можно было повторить.
+        """
+        await self._check_task_capacity(user_id, 1)
+        return await self._register_stored_upload(
+            user_id, stored, original_filename, content_type, upload_data
+        )
+
+    async def _register_stored_upload(
+        self,
+        user_id: uuid.UUID,
+        stored: StoredUpload,
+        original_filename: Optional[str],
+        content_type: Optional[str],
+        upload_data: FileUpload
+    ) -> TaskResponse:
+        try:
+            ensure_operation_accepts(upload_data.operation, stored.file_type, upload_data.parameters)
+            await self._check_storage_quota(user_id, stored.size)
+            blob = await self._store_blob(stored)
+        except BaseException:
+            await run_in_threadpool(self._remove_from_disk, stored.path)
+            raise
+
+        task = None
+        try:
+            db_file = self._build_file(user_id, blob, stored, original_filename, content_type)
+            db_file = await self.file_repo.create(db_file)
+            task = self._build_task(user_id, upload_data)
+            if not await self._complete_from_cache(task, db_file):
+                queue = get_queue(upload_data.operation, db_file.file_size, upload_data.parameters)
+                task.outbox = TaskOutbox(queue=queue, job_id=str(uuid.uuid4()))
+            task.file_id = db_file.id
+            task = await self.task_repo.create(task)
+        except BaseException:
+            if task is not None:
+                await self._remove_cached_results([task])
+            await self._release_blob(blob.id)
+            raise
+
+        if task.status == TaskStatus.PENDING.value:
+            self.outbox_relay.notify()
+
+        return TaskResponse.model_validate(task)
+
+    async def upload_files(
+        self,
+        user_id: uuid.UUID,
+        files: List[UploadFile],
+        upload_data: FileUpload
+    ) -> TaskListResponse:
+        """
+        Пакетная загрузка: файлы потоково пишутся во временный каталог,
+        ссылки на блобы берутся одним запросом, все File и Task создаются
+        одной транзакцией вместе с записями исходящего ящика, а задачи, не
+        завершенные из кэша, уходят воркерам сообщениями не больше
+        get_message_size(очередь) задач, все через одно соединение с брокером.
+        Если хотя бы один файл не подходит, отклоняется вся пачка.
+        """
+        if not files:
+            raise FileProcessingException("No files provided")
+        if len(files) > settings.MAX_BATCH_FILES:
+            raise FileProcessingException(f"Too many files in one batch (max {settings.MAX_BATCH_FILES})")
+        await self._check_task_capacity(user_id, len(files))
+        await self._check_storage_quota(user_id, sum(file.size or 0 for file in files))
+
+        stored_uploads: List[StoredUpload] = []
+        try:
+            for file in files:
+                temp_path = os.path.join(settings.UPLOAD_DIR, "tmp", uuid.uuid4().hex)
+                stored_uploads.append(
+                    await stream_upload_to_disk(
+                        file, temp_path, operation=upload_data.operation, parameters=upload_data.parameters
+                    )
+                )
+            await self._check_storage_quota(user_id, sum(stored.size for stored in stored_uploads))
+            blobs = await self._store_blobs(stored_uploads)
+        except BaseException:
+            for stored in stored_uploads:
+                await run_in_threadpool(self._remove_from_disk, stored.path)
+            raise
+
+        db_files = []
+        tasks = []
+        queue_counts: Dict[str, int] = {}
+        job_ids: Dict[Tuple[str, int], str] = {}
+        try:
+            for file, stored in zip(files, stored_uploads):
+                db_file = self._build_file(user_id, blobs[stored.sha256], stored, file.filename, file.content_type)
+                task = self._build_task(user_id, upload_data)
+                tasks.append(task)
+                if not await self._complete_from_cache(task, db_file):
+                    queue = get_queue(upload_data.operation, db_file.file_size, upload_data.parameters)
+                    index = queue_counts.get(queue, 0)
+                    queue_counts[queue] = index + 1
+                    job_id = job_ids.setdefault((queue, index // get_message_size(queue)), str(uuid.uuid4()))
+                    task.outbox = TaskOutbox(queue=queue, job_id=job_id)
+                db_file.tasks = [task]
+                db_files.append(db_file)
+            db_files = await self.file_repo.create_many(db_files)
+        except BaseException:
+            await self._remove_cached_results(tasks)
+            for stored in stored_uploads:
+                await self._release_blob(blobs[stored.sha256].id)
+            raise
+
+        if queue_counts:
+            self.outbox_relay.notify()
+
+        return TaskListResponse(
+            tasks=[TaskResponse.model_validate(task) for task in tasks],
+            total_count=len(tasks)
+        )
+
+    async def get_user_files(self, user_id: uuid.UUID) -> FileListResponse:
+        """Получение всех файлов пользователя"""
+        files = await self.file_repo.get_by_user_id(user_id)
+        return FileListResponse(
+            files=[FileResponse.model_validate(f) for f in files],
+            total_count=len(files),
+            total_size=sum(f.file_size for f in files)
+        )
+
+    async def get_file_by_id(
+        self,
+        user_id: uuid.UUID,
+        file_id: uuid.UUID
+    ) -> Optional[FileResponse]:
+        """Получение файла по ID"""
+        db_file = await self.file_repo.get_by_id(file_id)
+        if not db_file or db_file.user_id != user_id:
+            return None
+        return FileResponse.model_validate(db_file)
+
+    async def delete_file(
+        self,
+        user_id: uuid.UUID,
+        file_id: uuid.UUID
+    ) -> bool:
+        """
+        Удаление файла. Блоб с содержимым удаляется из хранилища только
+        когда на него не осталось ссылок
+        """
+        db_file = await self.file_repo.get_by_id(file_id)
+        if not db_file or db_file.user_id != user_id:
+            raise FileNotFoundException(str(file_id))
+
+        blob_id, file_path = db_file.blob_id, db_file.file_path
+        deleted = await self.file_repo.delete(file_id)
+        if deleted:
+            if blob_id:
+                await self._release_blob(blob_id)
+            else:
+                await self.storage.delete(file_path)
+        return deleted
+
+    async def get_file_download_url(
+        self,
+        user_id: uuid.UUID,
+        file_id: uuid.UUID
+    ) -> Optional[str]:
+        """Получение URL для скачивания файла"""
+        db_file = await self.file_repo.get_by_id(file_id)
+        if not db_file or db_file.user_id != user_id:
+            return None
+        return f"/api/files/{file_id}/download"
+
+    async def get_file_download(
+        self,
+        user_id: uuid.UUID,
+        file_id: uuid.UUID
+    ) -> FileDownloadInfo:
+        """Описание исходного файла для отдачи клиенту"""
+        db_file = await self.file_repo.get_by_id(file_id)
+        if not db_file or db_file.user_id != user_id:
+            raise FileNotFoundException(str(file_id))
+        return FileDownloadInfo(
+            storage_key=db_file.file_path,
+            filename=db_file.original_filename,
+            media_type=db_file.mime_type,
+            etag=db_file.content_hash,
+            immutable=True
+        )
+
+    async def get_task_result_download(
+        self,
+        user_id: uuid.UUID,
+        task_id: uuid.UUID
+    ) -> FileDownloadInfo:
+        """Описание результата задачи для отдачи клиенту"""
+        task = await self.task_repo.get_by_id(task_id)
+        if not task or task.user_id != user_id:
+            raise TaskNotFoundException(str(task_id))
+        if task.status != TaskStatus.COMPLETED.value or not task.result_file_path:
+            raise TaskResultNotReadyException(str(task_id))
+
+        db_file = await self.file_repo.get_by_id(task.file_id)
+        stem = os.path.splitext(db_file.original_filename)[0] if db_file else str(task_id)
+        extension = os.path.splitext(task.result_file_path)[1]
+        filename = f"{stem}{extension}"
+        return FileDownloadInfo(
+            storage_key=task.result_file_path,
+            filename=filename,
+            media_type=mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        )
+
+    async def get_task_progress(
+        self,
+        user_id: uuid.UUID,
+        task_id: uuid.UUID
+    ) -> TaskProgressUpdate:
+        """
+        Статус и прогресс задачи. Пока задача выполняется, промежуточный
+        прогресс берется из быстрого канала: в БД пишутся только вехи
+        """
+        task = await self.task_repo.get_by_id(task_id)
+        if not task or task.user_id != user_id:
+            raise TaskNotFoundException(str(task_id))
+
+        progress = task.progress
+        if task.status == TaskStatus.PROCESSING.value:
+            live = await self.progress_channel.get(task_id)
+            if live is not None:
+                progress = max(progress, live)
+        return TaskProgressUpdate(progress=progress, status=task.status)
+
+    async def get_task_results(
+        self,
+        user_id: uuid.UUID,
+        task_id: uuid.UUID
+    ) -> List[TaskResultResponse]:
+        """Именованные результаты (рендишены) задачи"""
+        task = await self.task_repo.get_by_id(task_id)
+        if not task or task.user_id != user_id:
+            raise TaskNotFoundException(str(task_id))
+        results = await self.task_result_repo.get_by_task_id(task_id)
+        return [TaskResultResponse.model_validate(result) for result in results]
+
+    async def get_task_rendition_download(
+        self,
+        user_id: uuid.UUID,
+        task_id: uuid.UUID,
+        name: str
+    ) -> FileDownloadInfo:
+        """Описание рендишена задачи для отдачи клиенту"""
+        task = await self.task_repo.get_by_id(task_id)
+        if not task or task.user_id != user_id:
+            raise TaskNotFoundException(str(task_id))
+        result = await self.task_result_repo.get_by_name(task_id, name)
+        if not result:
+            raise TaskResultNotReadyException(f"{task_id}/{name}")
+
+        db_file = await self.file_repo.get_by_id(task.file_id)
+        stem = os.path.splitext(db_file.original_filename)[0] if db_file else str(task_id)
+        return FileDownloadInfo(
+            storage_key=result.storage_key,
+            filename=f"{stem}-{name}{os.path.splitext(result.storage_key)[1]}",
+            media_type=result.mime_type
+        )
+
+    async def get_storage_usage(self, user_id: uuid.UUID) -> dict:
+        """Получение статистики использования хранилища"""
+        used = await self.file_repo.get_total_storage_used(user_id)
+        files_count = await self.file_repo.get_user_files_count(user_id)
+        return {
+            "used": used,
+            "limit": settings.MAX_USER_STORAGE,
+            "available": max(settings.MAX_USER_STORAGE - used, 0),
+            "files_count": files_count,
+        }
+
+    async def _check_storage_quota(self, user_id: uuid.UUID, required: int) -> None:
+        used = await self.file_repo.get_total_storage_used(user_id)
+        available = settings.MAX_USER_STORAGE - used
+        if required > available:
+            raise InsufficientStorageException(max(available, 0), required)
+
+    async def _check_task_capacity(self, user_id: uuid.UUID, new_tasks: int) -> None:
+        self.admission.check_task_capacity(
+            await self.task_repo.count_active_tasks(),
+            await self.task_repo.count_active_tasks(user_id),
+            new_tasks
+        )
+
+    async def _store_blob(self, stored: StoredUpload) -> Blob:
+        """
+        Берет ссылку на блоб с таким же содержимым и кладет файл в хранилище,
+        если его там еще нет. Пока ссылка удерживается, блоб не может быть удален,
+        поэтому проверка существования и запись не гоняются с удалением.
+        """
+        blob = await self.blob_repo.acquire(stored.sha256, stored.size, blob_key(stored.sha256))
+        if await self.storage.exists(blob.storage_path):
+            await run_in_threadpool(self._remove_from_disk, stored.path)
+        else:
+            await self.storage.save_file(blob.storage_path, stored.path)
+        return blob
+
+    async def _store_blobs(self, stored_uploads: List[StoredUpload]) -> Dict[str, Blob]:
+        """
+        Пакетный вариант _store_blob: ссылки на все блобы берутся одним
+        запросом, одинаковое содержимое внутри пачки записывается один раз
+        """
+        blobs = await self.blob_repo.acquire_many([
+            (stored.sha256, stored.size, blob_key(stored.sha256)) for stored in stored_uploads
+        ])
+        try:
+            placed = set()
+            for stored in stored_uploads:
+                blob = blobs[stored.sha256]
+                if blob.sha256 in placed or await self.storage.exists(blob.storage_path):
+                    await run_in_threadpool(self._remove_from_disk, stored.path)
+                else:
+                    await self.storage.save_file(blob.storage_path, stored.path)
+                placed.add(blob.sha256)
+        except BaseException:
+            for stored in stored_uploads:
+                await self._release_blob(blobs[stored.sha256].id)
+            raise
+        return blobs
+
+    async def _release_blob(self, blob_id: uuid.UUID) -> None:
+        """
+        Отпускает ссылку на блоб. Последняя ссылка удаляет файл под блокировкой
+        строки: параллельная загрузка того же содержимого дождется коммита и
+        создаст блоб заново, а не сошлется на удаленный файл.
+        """
+        remaining = await self.blob_repo.release(blob_id)
+        if remaining is None or remaining > 0:
+            return
+
+        blob = await self.blob_repo.lock_unreferenced(blob_id)
+        if blob:
+            await self.storage.delete(blob.storage_path)
+            await self.blob_repo.delete(blob.id)
+
+    def _build_file(
+        self,
+        user_id: uuid.UUID,
+        blob: Blob,
+        stored: StoredUpload,
+        original_filename: Optional[str],
+        content_type: Optional[str]
+    ) -> File:
+        extension = stored.file_type.extension or self._get_extension(original_filename).lstrip(".")
+        return File(
+            user_id=user_id,
+            blob_id=blob.id,
+            original_filename=original_filename or f"{blob.sha256}.{extension or 'bin'}",
+            stored_filename=blob.sha256,
+            file_path=blob.storage_path,
+            file_size=stored.size,
+            mime_type=(
+                stored.file_type.mime_type if stored.file_type != UNKNOWN_FILE_TYPE
+                else content_type or UNKNOWN_FILE_TYPE.mime_type
+            ),
+            extension=extension,
+            content_hash=blob.sha256
+        )
+
+    @staticmethod
+    def _build_task(user_id: uuid.UUID, upload_data: FileUpload) -> Task:
+        """
+        Новая ждущая задача. ID задается сразу: по нему строятся ключи
+        результатов, если задача завершится из кэша еще до сохранения.
+        Незавершенной задаче добавляется запись исходящего ящика, обе
+        сохраняются одной транзакцией, а отправляет задачу воркерам OutboxRelay
+        """
+        parameters = None
+        if upload_data.parameters:
+            parameters = upload_data.parameters.model_dump(mode="json", exclude_none=True)
+
+        return Task(
+            id=uuid.uuid4(),
+            user_id=user_id,
+            operation_type=upload_data.operation.value,
+            status=TaskStatus.PENDING.value,
+            parameters=parameters
+        )
+
+    async def _complete_from_cache(self, task: Task, db_file: File) -> bool:
+        """
+        Если такой же файл уже обрабатывался той же операцией с теми же
+        параметрами, кэшированный результат кладется в хранилище, а еще не
+        сохраненная задача помечается завершенной: в БД она попадет сразу
+        такой и без записи в исходящем ящике. Возвращает True при попадании
+        """
+        parameters = FileConversionParameters(**(task.parameters or {}))
+        if parameters.renditions:
+            return await self._complete_renditions_from_cache(task, db_file, parameters.renditions)
+
+        operation = FileOperationType(task.operation_type)
+        extension = get_result_extension(operation, db_file.extension, task.parameters)
+        key = self.result_cache.make_key(
+            db_file.content_hash, operation, task.parameters, db_file.original_filename
+        )
+        cached_copy = await run_in_threadpool(
+            self.result_cache.materialize,
+            key,
+            extension,
+            os.path.join(settings.UPLOAD_DIR, "tmp", uuid.uuid4().hex)
+        )
+        if not cached_copy:
+            return False
+
+        task_result_key = result_key(task.id, extension)
+        await self.storage.save_file(task_result_key, cached_copy)
+        self._mark_completed(task, task_result_key)
+        return True
+
+    async def _complete_renditions_from_cache(
+        self,
+        task: Task,
+        db_file: File,
+        renditions: List[RenditionParameters]
+    ) -> bool:
+        """Задача с рендишенами завершается из кэша, только если в нем есть все"""
+        cached = []
+        try:
+            for rendition in renditions:
+                extension = get_rendition_extension(rendition, db_file.extension)
+                cached_copy = await run_in_threadpool(
+                    self.result_cache.materialize,
+                    self.result_cache.make_rendition_key(db_file.content_hash, rendition),
+                    extension,
+                    os.path.join(settings.UPLOAD_DIR, "tmp", uuid.uuid4().hex)
+                )
+                if not cached_copy:
+                    return False
+                cached.append((rendition, extension, cached_copy))
+
+            results = []
+            for rendition, extension, cached_copy in cached:
+                width, height = await run_in_threadpool(self._get_image_size, cached_copy)
+                results.append(TaskResult(
+                    name=rendition.name,
+                    storage_key=result_key(task.id, extension, rendition.name),
+                    file_size=os.path.getsize(cached_copy),
+                    mime_type=mimetypes.guess_type(f"result.{extension}")[0] or "application/octet-stream",
+                    width=width,
+                    height=height
+                ))
+                await self.storage.save_file(results[-1].storage_key, cached_copy)
+                task.results.append(results[-1])
+        finally:
+            for _, _, cached_copy in cached:
+                await run_in_threadpool(self._remove_from_disk, cached_copy)
+
+        self._mark_completed(task, results[0].storage_key)
+        return True
+
+    @staticmethod
+    def _mark_completed(task: Task, result_file_path: str) -> None:
+        task.status = TaskStatus.COMPLETED.value
+        task.result_file_path = result_file_path
+        task.progress = 100
+        task.completed_at = datetime.now(timezone.utc)
+
+    async def _remove_cached_results(self, tasks: List[Task]) -> None:
+        """Удаляет из хранилища результаты задач, завершенных из кэша, но не сохраненных"""
+        for task in tasks:
+            keys = {result.storage_key for result in task.results}
+            if task.result_file_path:
+                keys.add(task.result_file_path)
+            for key in keys:
+                await self.storage.delete(key)
+
+    @staticmethod
+    def _get_image_size(path: str):
+        # Pillow нужен API только здесь, поэтому импортируется при первом вызове
+        from PIL import Image
+
+        with Image.open(path) as image:
+            return image.size
+
+    @staticmethod
+    def _get_extension(filename: Optional[str]) -> str:
+        return os.path.splitext(filename or "")[1].lower()[:11]
+
+    @staticmethod
+    def _remove_from_disk(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
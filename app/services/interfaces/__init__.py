@@ -2,10 +2,12 @@ from app.services.interfaces.auth_service import IAuthService
 from app.services.interfaces.file_service import IFileService
 from app.services.interfaces.task_service import ITaskService
 from app.services.interfaces.email_service import IEmailService
+from app.services.interfaces.upload_session_service import IUploadSessionService
 
 __all__ = [
     "IAuthService",
     "IFileService", 
     "ITaskService",
     "IEmailService",
+    "IUploadSessionService",
 ]
\ No newline at end of file
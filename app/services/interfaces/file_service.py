@@ -1,9 +1,10 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import List, Optional
 import uuid
 from fastapi import UploadFile
-from app.schemas.file import FileResponse, FileUpload, FileListResponse
-from app.schemas.task import TaskResponse
+from app.schemas.file import FileDownloadInfo, FileResponse, FileUpload, FileListResponse
+from app.schemas.task import TaskListResponse, TaskProgressUpdate, TaskResponse, TaskResultResponse
+from app.core.uploads import StoredUpload
 
 class IFileService(ABC):
     
@@ -16,6 +17,28 @@ class IFileService(ABC):
     ) -> TaskResponse:
         """Загрузка файла и создание задачи обработки"""
         ...
+
+    @abstractmethod
+    async def upload_files(
+        self,
+        user_id: uuid.UUID,
+        files: List[UploadFile],
+        upload_data: FileUpload
+    ) -> TaskListResponse:
+        """Пакетная загрузка файлов с одной операцией для всех"""
+        ...
+
+    @abstractmethod
+    async def create_from_stored_upload(
+        self,
+        user_id: uuid.UUID,
+        stored: StoredUpload,
+        original_filename: Optional[str],
+        content_type: Optional[str],
+        upload_data: FileUpload
+    ) -> TaskResponse:
+        """Регистрация уже записанного на диск файла и создание задачи обработки"""
+        ...
     
     @abstractmethod
     async def get_user_files(self, user_id: uuid.UUID) -> FileListResponse:
@@ -48,8 +71,54 @@ class IFileService(ABC):
     ) -> Optional[str]:
         """Получение URL для скачивания файла"""
         ...
+
+    @abstractmethod
+    async def get_file_download(
+        self, 
+        user_id: uuid.UUID, 
+        file_id: uuid.UUID
+    ) -> FileDownloadInfo:
+        """Получение исходного файла для скачивания"""
+        ...
+
+    @abstractmethod
+    async def get_task_result_download(
+        self, 
+        user_id: uuid.UUID, 
+        task_id: uuid.UUID
+    ) -> FileDownloadInfo:
+        """Получение результата обработки для скачивания"""
+        ...
     
     @abstractmethod
     async def get_storage_usage(self, user_id: uuid.UUID) -> dict:
         """Получение статистики использования хранилища"""
-        ...
\ No newline at end of file
+        ...
+
+    @abstractmethod
+    async def get_task_progress(
+        self, 
+        user_id: uuid.UUID, 
+        task_id: uuid.UUID
+    ) -> TaskProgressUpdate:
+        """Получение статуса и текущего прогресса задачи"""
+        ...
+
+    @abstractmethod
+    async def get_task_results(
+        self, 
+        user_id: uuid.UUID, 
+        task_id: uuid.UUID
+    ) -> List[TaskResultResponse]:
+        """Получение именованных результатов (рендишенов) задачи"""
+        ...
+
+    @abstractmethod
+    async def get_task_rendition_download(
+        self, 
+        user_id: uuid.UUID, 
+        task_id: uuid.UUID,
+        name: str
+    ) -> FileDownloadInfo:
+        """Получение рендишена задачи для скачивания"""
+        ...
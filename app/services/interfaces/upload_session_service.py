@@ -0,0 +1,60 @@
+from abc import ABC, abstractmethod
+from typing import AsyncIterator
+import uuid
+from app.schemas.task import TaskResponse
+from app.schemas.upload_session import UploadSessionCreate, UploadSessionResponse
+
+class IUploadSessionService(ABC):
+
+    @abstractmethod
+    async def create_session(
+        self,
+        user_id: uuid.UUID,
+        session_data: UploadSessionCreate
+    ) -> UploadSessionResponse:
+        """Открытие сессии возобновляемой загрузки"""
+        ...
+
+    @abstractmethod
+    async def get_session(
+        self,
+        user_id: uuid.UUID,
+        session_id: uuid.UUID
+    ) -> UploadSessionResponse:
+        """Получение сессии и подтвержденного offset"""
+        ...
+
+    @abstractmethod
+    async def upload_chunk(
+        self,
+        user_id: uuid.UUID,
+        session_id: uuid.UUID,
+        offset: int,
+        length: int,
+        chunks: AsyncIterator[bytes]
+    ) -> UploadSessionResponse:
+        """Запись диапазона из length байт начиная с offset"""
+        ...
+
+    @abstractmethod
+    async def complete_session(
+        self,
+        user_id: uuid.UUID,
+        session_id: uuid.UUID
+    ) -> TaskResponse:
+        """Завершение загрузки: создание файла и задачи обработки"""
+        ...
+
+    @abstractmethod
+    async def abort_session(
+        self,
+        user_id: uuid.UUID,
+        session_id: uuid.UUID
+    ) -> bool:
+        """Прерывание загрузки с удалением принятых данных"""
+        ...
+
+    @abstractmethod
+    async def cleanup_expired_sessions(self) -> int:
+        """Удаление просроченных сессий (возвращает количество удаленных)"""
+        ...
@@ -0,0 +1,158 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.database.session import AsyncSessionLocal
+from app.repositories.task_outbox_repository import TaskOutboxRepository
+from app.repositories.task_repository import TaskRepository
+from app.schemas.file import FileConversionParameters, FileOperationType
+from app.schemas.task import TaskStatus
+from app.services.task_dispatcher import TaskDispatcher, task_dispatcher
+from app.worker import get_queue
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxRelay:
+    """
+    Переносит задачи из исходящего ящика (task_outbox) в брокер.
+
+    Задача и ее запись в ящике создаются одной транзакцией, поэтому задача
+    не теряется, если брокер недоступен после коммита, а сообщение не
+    уходит, если коммит не удался. Ретранслятор забирает записи пачками,
+    отправляет их через одно соединение с брокером и в той же транзакции
+    удаляет записи и проставляет задачам celery_task_id. Доставка - не
+    меньше одного раза: при падении между отправкой и коммитом сообщение
+    уйдет повторно, а воркер пропустит уже выполненные задачи.
+
+    Работает фоном в процессе API; после создания задачи его будит
+    notify(), а без этого он раз в poll_interval проверяет ящик сам.
+    Заодно он возвращает в ящик задачи, чья аренда истекла (воркер упал,
+    не завершив их).
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        dispatcher: TaskDispatcher,
+        batch_size: int,
+        poll_interval: float
+    ):
+        self.session_factory = session_factory
+        self.dispatcher = dispatcher
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._wakeup: Optional[asyncio.Event] = None
+        self._runner: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Запускает фоновую ретрансляцию в текущем event loop"""
+        self._wakeup = asyncio.Event()
+        self._runner = asyncio.create_task(self._run(), name="task-outbox-relay")
+
+    async def stop(self) -> None:
+        if self._runner:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+
+    def notify(self) -> None:
+        """Будит ретранслятор: в ящике появились записи"""
+        if self._wakeup:
+            self._wakeup.set()
+
+    async def relay_batch(self) -> int:
+        """
+        Отправляет одну пачку записей, возвращает число обработанных.
+        Записи уже не ждущих задач (например, отмененных)
+        удаляются без отправки
+        """
+        async with self.session_factory() as session:
+            repo = TaskOutboxRepository(session)
+            entries = await repo.claim_batch(self.batch_size)
+            if not entries:
+                await session.rollback()
+                return 0
+
+            done = []
+            messages: Dict[Tuple[str, str], List] = {}
+            for entry in entries:
+                if entry.task.status != TaskStatus.PENDING.value:
+                    done.append(entry.id)
+                    continue
+                messages.setdefault((entry.job_id, entry.queue), []).append(entry)
+
+            sent = set(await self.dispatcher.dispatch_many([
+                (job_id, queue, [entry.task_id for entry in group])
+                for (job_id, queue), group in messages.items()
+            ]))
+            published = {}
+            for (job_id, _), group in messages.items():
+                if job_id in sent:
+                    published[job_id] = [entry.task_id for entry in group]
+                    done.extend(entry.id for entry in group)
+
+            await repo.release(done, published)
+            return len(done)
+
+    async def requeue_expired_leases(self) -> int:
+        """
+        Задачи с просроченной арендой возвращаются в pending и в ящик;
+        после TASK_MAX_ATTEMPTS попыток задача помечается failed, чтобы
+        файл, который роняет воркер, не крутился по кругу
+        """
+        async with self.session_factory() as session:
+            tasks = await TaskRepository(session).get_expired_leases(self.batch_size)
+            if not tasks:
+                await session.rollback()
+                return 0
+
+            queues = {}
+            exhausted = []
+            for task in tasks:
+                if task.attempts >= settings.TASK_MAX_ATTEMPTS:
+                    exhausted.append(task.id)
+                    continue
+                queues[task.id] = get_queue(
+                    FileOperationType(task.operation_type),
+                    task.file.file_size,
+                    FileConversionParameters(**(task.parameters or {}))
+                )
+            if exhausted:
+                logger.warning("Giving up on %d task(s) after %d attempts", len(exhausted), settings.TASK_MAX_ATTEMPTS)
+
+            await TaskOutboxRepository(session).requeue(
+                queues, exhausted, f"Processing was interrupted {settings.TASK_MAX_ATTEMPTS} times"
+            )
+            return len(tasks)
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                await self.requeue_expired_leases()
+                relayed = await self.relay_batch()
+            except Exception:
+                logger.exception("Task outbox relay failed")
+                relayed = 0
+            if relayed >= self.batch_size:
+                continue
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+outbox_relay = OutboxRelay(
+    session_factory=AsyncSessionLocal,
+    dispatcher=task_dispatcher,
+    batch_size=settings.OUTBOX_RELAY_BATCH_SIZE,
+    poll_interval=settings.OUTBOX_RELAY_POLL_INTERVAL_SECONDS,
+)
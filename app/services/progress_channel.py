@@ -0,0 +1,91 @@
+import logging
+import uuid
+from typing import Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TaskProgressChannel:
+    """
+    Быстрый канал промежуточного прогресса задач через Redis.
+
+    Последнее значение лежит в ключе task-progress:<id> с TTL и дублируется
+    в одноименный pub/sub канал для подписчиков. В Postgres пишутся только
+    вехи и итоговое состояние. Канал необязательный: ошибки Redis логируются
+    и не прерывают обработку, а читатели откатываются на значение из БД.
+
+    В обратную сторону по каналу идет запрос отмены: флаг task-cancel:<id>,
+    который воркер проверяет в точках прогресса выполняемой задачи.
+    """
+
+    KEY_PREFIX = "task-progress:"
+    CANCEL_KEY_PREFIX = "task-cancel:"
+
+    def __init__(self, redis_url: str, ttl_seconds: int):
+        self.redis_url = redis_url
+        self.ttl_seconds = ttl_seconds
+        self._client = None
+        self._async_client = None
+
+    def publish(self, task_id: uuid.UUID, progress: int) -> None:
+        """Публикует прогресс задачи (синхронно, из процесса воркера)"""
+        key = self._key(task_id)
+        try:
+            pipe = self._get_client().pipeline(transaction=False)
+            pipe.set(key, progress, ex=self.ttl_seconds)
+            pipe.publish(key, progress)
+            pipe.execute()
+        except Exception:
+            logger.warning("Failed to publish progress of task %s", task_id, exc_info=True)
+
+    async def get(self, task_id: uuid.UUID) -> Optional[int]:
+        """Последний опубликованный прогресс задачи или None"""
+        try:
+            value = await self._get_async_client().get(self._key(task_id))
+        except Exception:
+            logger.warning("Failed to read progress of task %s", task_id, exc_info=True)
+            return None
+        return int(value) if value is not None else None
+
+    async def request_cancel(self, task_id: uuid.UUID) -> None:
+        """Просит воркер остановить задачу (из API)"""
+        try:
+            await self._get_async_client().set(self._cancel_key(task_id), 1, ex=self.ttl_seconds)
+        except Exception:
+            logger.warning("Failed to request cancellation of task %s", task_id, exc_info=True)
+
+    def is_cancel_requested(self, task_id: uuid.UUID) -> bool:
+        """Запрошена ли отмена задачи (синхронно, из процесса воркера)"""
+        try:
+            return bool(self._get_client().exists(self._cancel_key(task_id)))
+        except Exception:
+            logger.warning("Failed to check cancellation of task %s", task_id, exc_info=True)
+            return False
+
+    def _key(self, task_id: uuid.UUID) -> str:
+        return f"{self.KEY_PREFIX}{task_id}"
+
+    def _cancel_key(self, task_id: uuid.UUID) -> str:
+        return f"{self.CANCEL_KEY_PREFIX}{task_id}"
+
+    def _get_client(self):
+        if self._client is None:
+            import redis
+
+            self._client = redis.Redis.from_url(self.redis_url)
+        return self._client
+
+    def _get_async_client(self):
+        if self._async_client is None:
+            import redis.asyncio
+
+            self._async_client = redis.asyncio.Redis.from_url(self.redis_url)
+        return self._async_client
+
+
+task_progress_channel = TaskProgressChannel(
+    redis_url=settings.REDIS_URL,
+    ttl_seconds=settings.TASK_PROGRESS_TTL_SECONDS,
+)
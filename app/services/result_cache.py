@@ -0,0 +1,202 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+from typing import Optional
+
+from app.core.config import settings
+from app.schemas.file import (
+    FileConversionParameters,
+    FileOperationType,
+    RenditionParameters,
+    get_operation_chain,
+)
+
+
+class ResultCache:
+    """
+    Дисковый кэш результатов обработки.
+
+    Ключ - SHA-256 от (хэш входного файла, тип операции, нормализованные параметры).
+    Записи лежат в root/<aa>/<ключ>.<расширение>, время последнего обращения
+    хранится в mtime пустого файла-метки рядом (<запись>.used) и используется
+    для LRU-вытеснения при превышении max_bytes. Результаты задач создаются
+    жесткими ссылками на запись кэша, поэтому вытеснение записи не затрагивает
+    уже выданные результаты, а сама запись не меняется: ее mtime - это mtime
+    результатов, из которого строятся ETag и Last-Modified при скачивании.
+
+    Лимит относится к месту, которое вытеснение может освободить: запись,
+    на которую еще ссылается результат (st_nlink > 1), удалять бесполезно,
+    и она не учитывается. Размер ведется приблизительно: put прибавляет
+    размер новой записи, а каталог сканируется только когда сумма
+    переходит лимит (и при первом put в процессе); скан пересчитывает ее
+    точно. Записи, освободившиеся после скана (результат удален), будут
+    учтены следующим сканом.
+    """
+
+    EVICTION_WATERMARK = 0.9
+    USAGE_SUFFIX = ".used"
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        # Оценка освобождаемого объема сверху; None - каталог еще не сканировался
+        self._reclaimable_bytes = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(
+        content_hash: str,
+        operation: FileOperationType,
+        parameters: Optional[dict],
+        source_name: Optional[str] = None
+    ) -> str:
+        """
+        Строит ключ кэша; параметры дополняются значениями по умолчанию.
+        Если в цепочке есть COMPRESS_ZIP, в ключ входит и имя файла
+        (source_name): оно сохраняется в архиве как имя элемента
+        """
+        normalized = {
+            **FileConversionParameters().model_dump(mode="json"),
+            **(parameters or {}),
+        }
+        normalized = {key: value for key, value in normalized.items() if value is not None}
+        key_data = {"input": content_hash, "operation": FileOperationType(operation).value, "parameters": normalized}
+
+        chain = get_operation_chain(operation, FileConversionParameters.model_validate(normalized))
+        if source_name and FileOperationType.COMPRESS_ZIP in chain:
+            key_data["name"] = os.path.basename(source_name)
+
+        payload = json.dumps(key_data, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @classmethod
+    def make_rendition_key(cls, content_hash: str, rendition: RenditionParameters) -> str:
+        """
+        Ключ рендишена совпадает с ключом обычного RESIZE_IMAGE с теми же
+        размерами и качеством, поэтому их результаты взаимозаменяемы
+        """
+        parameters = rendition.model_dump(mode="json", exclude={"name"}, exclude_none=True)
+        return cls.make_key(content_hash, FileOperationType.RESIZE_IMAGE, parameters)
+
+    def get(self, key: str, extension: str) -> Optional[str]:
+        """Возвращает путь к записи и отмечает обращение к ней"""
+        path = self._entry_path(key, extension)
+        if not os.path.exists(path):
+            return None
+        self._mark_used(path)
+        return path
+
+    def materialize(self, key: str, extension: str, destination: str) -> Optional[str]:
+        """Создает destination как копию записи кэша (жесткой ссылкой, если возможно)"""
+        path = self.get(key, extension)
+        if not path:
+            return None
+        os.makedirs(os.path.dirname(destination) or ".", exist_ok=True)
+        try:
+            self._link_or_copy(path, destination)
+        except FileNotFoundError:
+            return None
+        return destination
+
+    def put(self, key: str, extension: str, source_path: str) -> str:
+        """Кладет результат в кэш и вытесняет старые записи при превышении лимита"""
+        path = self._entry_path(key, extension)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        self._link_or_copy(source_path, temp_path)
+        os.replace(temp_path, path)
+        self._mark_used(path)
+
+        with self._lock:
+            if self._reclaimable_bytes is not None:
+                self._reclaimable_bytes += os.path.getsize(path)
+            if self._reclaimable_bytes is None or self._reclaimable_bytes > self.max_bytes:
+                self.evict()
+        return path
+
+    def evict(self) -> int:
+        """
+        Удаляет самые давние по обращению записи без внешних ссылок, пока
+        их суммарный размер не опустится ниже EVICTION_WATERMARK * max_bytes.
+        Возвращает количество удаленных
+        """
+        entries = []
+        total = 0
+        for shard in self._scandir(self.root):
+            if not shard.is_dir():
+                continue
+            files = {}
+            used = {}
+            for entry in self._scandir(shard.path):
+                if entry.name.endswith(".tmp"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if entry.name.endswith(self.USAGE_SUFFIX):
+                    used[entry.path[:-len(self.USAGE_SUFFIX)]] = stat.st_mtime
+                else:
+                    files[entry.path] = stat
+
+            for path in used.keys() - files.keys():
+                self._remove(f"{path}{self.USAGE_SUFFIX}")
+            for path, stat in files.items():
+                if stat.st_nlink > 1:
+                    continue
+                entries.append((used.get(path, stat.st_mtime), stat.st_size, path))
+                total += stat.st_size
+
+        removed = 0
+        if total > self.max_bytes:
+            target = self.max_bytes * self.EVICTION_WATERMARK
+            for _, size, path in sorted(entries):
+                if total <= target:
+                    break
+                self._remove(path)
+                self._remove(f"{path}{self.USAGE_SUFFIX}")
+                total -= size
+                removed += 1
+        self._reclaimable_bytes = total
+        return removed
+
+    def _entry_path(self, key: str, extension: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.{extension.lstrip('.')}")
+
+    @classmethod
+    def _mark_used(cls, path: str) -> None:
+        marker = f"{path}{cls.USAGE_SUFFIX}"
+        try:
+            os.utime(marker)
+        except FileNotFoundError:
+            open(marker, "ab").close()
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _link_or_copy(source: str, destination: str) -> None:
+        try:
+            os.link(source, destination)
+        except OSError:
+            shutil.copyfile(source, destination)
+
+    @staticmethod
+    def _scandir(path: str):
+        try:
+            return list(os.scandir(path))
+        except FileNotFoundError:
+            return []
+
+
+result_cache = ResultCache(
+    root=os.path.join(settings.UPLOAD_DIR, "cache"),
+    max_bytes=settings.RESULT_CACHE_MAX_BYTES,
+)
@@ -0,0 +1,66 @@
+import logging
+import uuid
+from typing import List, Tuple
+
+from celery import Celery
+from starlette.concurrency import run_in_threadpool
+
+from app.worker import PROCESS_TASKS, celery_app
+
+logger = logging.getLogger(__name__)
+
+
+class TaskDispatcher:
+    """
+    Отправляет задачи обработки воркерам.
+
+    Задачи с общим job_id уходят одним сообщением (пачка делится на такие
+    группы при создании, см. get_message_size), а все сообщения - через
+    одно соединение с брокером. Вызывается ретранслятором исходящего ящика
+    (OutboxRelay), а не обработчиком запроса.
+    """
+
+    def __init__(self, celery: Celery):
+        self.celery = celery
+
+    async def dispatch_many(self, messages: List[Tuple[str, str, List[uuid.UUID]]]) -> List[str]:
+        """
+        Отправляет сообщения (job_id, очередь, ID задач) через одно соединение
+        с брокером. На первой ошибке останавливается; возвращает ID
+        отправленных сообщений
+        """
+        if not messages:
+            return []
+        return await run_in_threadpool(self._send_many, messages)
+
+    def _send_many(self, messages: List[Tuple[str, str, List[uuid.UUID]]]) -> List[str]:
+        sent = []
+        try:
+            with self.celery.producer_or_acquire() as producer:
+                for job_id, queue, task_ids in messages:
+                    self.celery.send_task(
+                        PROCESS_TASKS,
+                        args=[[str(task_id) for task_id in task_ids]],
+                        task_id=job_id,
+                        queue=queue,
+                        producer=producer,
+                        retry=False,
+                    )
+                    sent.append(job_id)
+        except Exception:
+            logger.exception("Failed to enqueue %d message(s), they stay in the outbox", len(messages) - len(sent))
+        return sent
+
+    async def revoke(self, job_id: str) -> None:
+        """
+        Отзывает сообщение, которое еще ждет в очереди: воркеры выбросят его
+        при получении. Ошибка брокера не критична - воркер все равно
+        пропускает отмененные задачи
+        """
+        try:
+            await run_in_threadpool(self.celery.control.revoke, job_id)
+        except Exception:
+            logger.warning("Failed to revoke message %s", job_id, exc_info=True)
+
+
+task_dispatcher = TaskDispatcher(celery_app)
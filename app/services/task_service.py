@@ -0,0 +1,344 @@
+import asyncio
+import logging
+import mimetypes
+import os
+import threading
+import uuid
+from typing import List, Optional
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.exceptions import TaskCancelledException, TaskLeaseLostException
+from app.core.file_types import get_rendition_extension, get_result_extension
+from app.models import File, Task, TaskResult
+from app.processing import get_processor, get_task_processor
+from app.repositories.interfaces.file_repository import IFileRepository
+from app.repositories.interfaces.task_repository import ITaskRepository
+from app.repositories.interfaces.task_result_repository import ITaskResultRepository
+from app.schemas.file import FileConversionParameters, FileOperationType
+from app.schemas.task import TaskListResponse, TaskResponse, TaskStatus
+from app.services.interfaces import ITaskService
+from app.services.progress_channel import TaskProgressChannel
+from app.services.result_cache import ResultCache
+from app.services.task_dispatcher import TaskDispatcher
+from app.storage import IStorageBackend, open_local_copy, result_key
+from app.worker.progress import ProgressReporter
+
+logger = logging.getLogger(__name__)
+
+
+class TaskService(ITaskService):
+    """
+    Задачи обработки: просмотр пользователем и выполнение в воркере.
+
+    Источник истины о задаче - таблица tasks: воркер не возвращает
+    результатов через Celery, а пишет статус, прогресс-вехи и ключ
+    результата в БД.
+
+    Отмена вытесняющая: ждущее сообщение отзывается у брокера, а
+    выполняющаяся задача останавливается в ближайшей точке прогресса
+    обработчика, освобождая слот воркера.
+
+    Воркер берет задачу атомарным UPDATE с арендой и продлевает ее в точках
+    прогресса, поэтому повторная или дублирующая доставка сообщения не
+    запускает обработку второй раз, а задачу упавшего воркера после
+    истечения аренды возвращает в очередь OutboxRelay.
+    """
+
+    def __init__(
+        self,
+        task_repository: ITaskRepository,
+        file_repository: IFileRepository,
+        task_result_repository: ITaskResultRepository,
+        result_cache: ResultCache,
+        storage: IStorageBackend,
+        progress_channel: TaskProgressChannel,
+        dispatcher: TaskDispatcher
+    ):
+        self.task_repo = task_repository
+        self.file_repo = file_repository
+        self.task_result_repo = task_result_repository
+        self.result_cache = result_cache
+        self.storage = storage
+        self.progress_channel = progress_channel
+        self.dispatcher = dispatcher
+
+    async def get_user_tasks(self, user_id: uuid.UUID) -> TaskListResponse:
+        """Получение всех задач пользователя"""
+        tasks = await self.task_repo.get_by_user_id(user_id)
+        return TaskListResponse(
+            tasks=[TaskResponse.model_validate(task) for task in tasks],
+            total_count=len(tasks)
+        )
+
+    async def get_task_by_id(self, user_id: uuid.UUID, task_id: uuid.UUID) -> Optional[TaskResponse]:
+        """Получение задачи по ID (None, если задачи нет или она чужая)"""
+        task = await self.task_repo.get_by_id(task_id)
+        if not task or task.user_id != user_id:
+            return None
+        return TaskResponse.model_validate(task)
+
+    async def get_task_status(self, user_id: uuid.UUID, task_id: uuid.UUID) -> Optional[str]:
+        """Получение статуса задачи"""
+        task = await self.task_repo.get_by_id(task_id)
+        if not task or task.user_id != user_id:
+            return None
+        return task.status
+
+    async def cancel_task(self, user_id: uuid.UUID, task_id: uuid.UUID) -> bool:
+        """
+        Отмена незавершенной задачи. Статус в БД меняется условным UPDATE,
+        поэтому отмена не затирает задачу, которую воркер успел завершить.
+        Еще не отправленную задачу ретранслятор просто не отправит, а
+        сообщение пачки не отзывается (в нем чужие задачи) - воркер сам
+        пропустит отмененную задачу
+        """
+        task = await self.task_repo.get_by_id(task_id)
+        if not task or task.user_id != user_id:
+            return False
+        if not await self.task_repo.mark_as_cancelled(task_id):
+            return False
+
+        if (
+            task.status == TaskStatus.PENDING.value
+            and task.celery_task_id
+            and await self.task_repo.count_by_celery_task_id(task.celery_task_id) == 1
+        ):
+            await self.dispatcher.revoke(task.celery_task_id)
+        await self.progress_channel.request_cancel(task_id)
+        return True
+
+    async def process_file_conversion(self, task_id: uuid.UUID) -> bool:
+        """
+        Выполняет задачу в воркере. Задача берется в работу, только если
+        она pending или ее аренда истекла: дубликаты сообщения и задачи,
+        которые уже выполняет другой воркер, пропускаются. Ошибка обработки
+        переводит задачу в failed, а не пробрасывается.
+        """
+        lease_owner = uuid.uuid4().hex
+        task = await self.task_repo.claim(task_id, lease_owner, settings.TASK_LEASE_SECONDS)
+        if not task:
+            logger.info("Task %s is not claimable, skipping duplicate delivery", task_id)
+            return False
+
+        db_file = await self.file_repo.get_by_id(task.file_id)
+        if not db_file:
+            await self.task_repo.mark_as_failed(task_id, "Source file no longer exists", lease_owner)
+            return False
+
+        parameters = FileConversionParameters(**(task.parameters or {}))
+        try:
+            if parameters.renditions:
+                await self._render_renditions(task, db_file, parameters, lease_owner)
+            else:
+                await self._convert(task, db_file, parameters, lease_owner)
+        except TaskCancelledException:
+            logger.info("Task %s was cancelled while processing", task_id)
+            return False
+        except TaskLeaseLostException:
+            logger.warning("Task %s is no longer leased by this worker (cancelled or taken over)", task_id)
+            return False
+        except Exception as error:
+            logger.exception("Task %s failed", task_id)
+            await self.task_repo.mark_as_failed(task_id, self._get_error_message(error), lease_owner)
+            return False
+
+        await self.file_repo.update_file_status(db_file.id, True)
+        return True
+
+    async def update_task_progress(self, task_id: uuid.UUID, progress: int) -> bool:
+        """Обновление прогресса задачи в БД"""
+        return await self.task_repo.update_progress(task_id, progress)
+
+    async def get_pending_tasks(self) -> List[TaskResponse]:
+        """Получение ожидающих задач"""
+        tasks = await self.task_repo.get_pending_tasks()
+        return [TaskResponse.model_validate(task) for task in tasks]
+
+    async def _convert(
+        self,
+        task: Task,
+        db_file: File,
+        parameters: FileConversionParameters,
+        lease_owner: str
+    ) -> None:
+        """Результат берется из кэша или вычисляется обработчиком и кладется в кэш"""
+        operation = FileOperationType(task.operation_type)
+        extension = get_result_extension(operation, db_file.extension, task.parameters)
+        key = self.result_cache.make_key(
+            db_file.content_hash, operation, task.parameters, db_file.original_filename
+        )
+        destination = self._temp_path(extension)
+        try:
+            cached_copy = await run_in_threadpool(self.result_cache.materialize, key, extension, destination)
+            if not cached_copy:
+                processor = get_task_processor(operation, parameters)
+                async with open_local_copy(self.storage, db_file.file_path) as source_path:
+                    await self._run_with_progress(
+                        task.id, lease_owner, processor.process, source_path, destination, parameters,
+                        source_name=db_file.original_filename
+                    )
+                await run_in_threadpool(self.result_cache.put, key, extension, destination)
+
+            await self._extend_lease(task.id, lease_owner)
+            task_result_key = result_key(task.id, extension)
+            await self.storage.save_file(task_result_key, destination)
+        finally:
+            await run_in_threadpool(self._remove_silently, destination)
+        if not await self.task_repo.mark_as_completed(task.id, task_result_key, lease_owner):
+            await self._discard_results(task.id, [task_result_key])
+
+    async def _render_renditions(
+        self,
+        task: Task,
+        db_file: File,
+        parameters: FileConversionParameters,
+        lease_owner: str
+    ) -> None:
+        """Все рендишены строятся из одного декодирования исходника"""
+        outputs = []
+        for rendition in parameters.renditions:
+            outputs.append((rendition, self._temp_path(get_rendition_extension(rendition, db_file.extension))))
+
+        try:
+            processor = get_processor(FileOperationType.RESIZE_IMAGE)
+            async with open_local_copy(self.storage, db_file.file_path) as source_path:
+                sizes = await self._run_with_progress(
+                    task.id, lease_owner, processor.render_renditions, source_path, outputs
+                )
+            await self._extend_lease(task.id, lease_owner)
+
+            results = []
+            storage_keys = []
+            for (rendition, path), (width, height) in zip(outputs, sizes):
+                extension = get_rendition_extension(rendition, db_file.extension)
+                await run_in_threadpool(
+                    self.result_cache.put,
+                    self.result_cache.make_rendition_key(db_file.content_hash, rendition),
+                    extension,
+                    path
+                )
+                storage_key = result_key(task.id, extension, rendition.name)
+                storage_keys.append(storage_key)
+                file_size = os.path.getsize(path)
+                await self.storage.save_file(storage_key, path)
+                results.append(TaskResult(
+                    task_id=task.id,
+                    name=rendition.name,
+                    storage_key=storage_key,
+                    file_size=file_size,
+                    mime_type=mimetypes.guess_type(f"result.{extension}")[0] or "application/octet-stream",
+                    width=width,
+                    height=height
+                ))
+        finally:
+            for _, path in outputs:
+                await run_in_threadpool(self._remove_silently, path)
+
+        if not await self.task_repo.mark_as_completed(task.id, storage_keys[0], lease_owner, results):
+            await self._discard_results(task.id, storage_keys)
+
+    async def _run_with_progress(self, task_id: uuid.UUID, lease_owner: str, function, *args, **kwargs):
+        """
+        Выполняет синхронную обработку в пуле потоков. Прогресс прореживается
+        ProgressReporter: промежуточные значения уходят в быстрый канал,
+        вехи пишутся в БД через event loop воркера.
+
+        Аренда задачи продлевается фоном в event loop воркера все время,
+        пока работает обработчик, а не только в точках прогресса: декодирование
+        большого файла или подбор качества могут долго ничего не сообщать.
+        Запросы к БД из фона и из обработчика идут через одну сессию, поэтому
+        выполняются по очереди. В точках прогресса проверяется запрос отмены
+        и потеря аренды: TaskCancelledException или TaskLeaseLostException
+        прерывает обработчик, а его незавершенный вывод удаляется
+        """
+        loop = asyncio.get_running_loop()
+        db_lock = asyncio.Lock()
+        stopped = asyncio.Event()
+        lease_lost = threading.Event()
+
+        async def serialized(query, *query_args):
+            async with db_lock:
+                return await query(*query_args)
+
+        async def heartbeat() -> None:
+            while True:
+                try:
+                    await asyncio.wait_for(stopped.wait(), timeout=settings.TASK_LEASE_HEARTBEAT_SECONDS)
+                    return
+                except asyncio.TimeoutError:
+                    pass
+                try:
+                    await serialized(self._extend_lease, task_id, lease_owner)
+                except TaskLeaseLostException:
+                    lease_lost.set()
+                    return
+                except Exception:
+                    logger.exception("Failed to extend lease of task %s", task_id)
+
+        def persist(progress: int) -> None:
+            asyncio.run_coroutine_threadsafe(
+                serialized(self.task_repo.update_progress, task_id, progress), loop
+            ).result()
+
+        def checkpoint() -> None:
+            if lease_lost.is_set():
+                raise TaskLeaseLostException(str(task_id))
+            if self.progress_channel.is_cancel_requested(task_id):
+                raise TaskCancelledException(str(task_id))
+
+        reporter = ProgressReporter(
+            publish=lambda progress: self.progress_channel.publish(task_id, progress),
+            persist=persist,
+            checkpoint=checkpoint
+        )
+        heartbeat_task = asyncio.create_task(heartbeat())
+        try:
+            result = await run_in_threadpool(function, *args, progress=reporter, **kwargs)
+            await run_in_threadpool(reporter.flush)
+        finally:
+            # Без отмены: продление, которое уже идет, должно дойти до конца в общей сессии
+            stopped.set()
+            await heartbeat_task
+        if lease_lost.is_set():
+            raise TaskLeaseLostException(str(task_id))
+        return result
+
+    async def _extend_lease(self, task_id: uuid.UUID, lease_owner: str) -> None:
+        """Продлевает аренду; задачу отменили или перехватили - дальше не работаем"""
+        if not await self.task_repo.extend_lease(task_id, lease_owner, settings.TASK_LEASE_SECONDS):
+            raise TaskLeaseLostException(str(task_id))
+
+    async def _discard_results(self, task_id: uuid.UUID, storage_keys: List[str]) -> None:
+        """
+        Удаляет результаты задачи, отмененной, пока они сохранялись. Если
+        аренду перехватил другой воркер, ключи результатов у него те же,
+        поэтому они не трогаются
+        """
+        if await self.task_repo.get_status(task_id) != TaskStatus.CANCELLED.value:
+            logger.warning("Task %s lease was lost before completion, keeping its results", task_id)
+            return
+        logger.info("Task %s was cancelled before completion, discarding its results", task_id)
+        for storage_key in storage_keys:
+            await self.storage.delete(storage_key)
+
+    @staticmethod
+    def _temp_path(extension: str) -> str:
+        temp_dir = os.path.join(settings.UPLOAD_DIR, "tmp")
+        os.makedirs(temp_dir, exist_ok=True)
+        return os.path.join(temp_dir, f"{uuid.uuid4().hex}.{extension}")
+
+    @staticmethod
+    def _remove_silently(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _get_error_message(error: Exception) -> str:
+        if isinstance(error, HTTPException):
+            return str(error.detail)
+        return str(error) or type(error).__name__
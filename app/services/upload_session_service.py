@@ -0,0 +1,261 @@
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.exceptions import (
+    FileProcessingException,
+    FileTooLargeException,
+    UploadOffsetMismatchException,
+    UploadSessionNotFoundException,
+    UploadSessionStateException,
+)
+from app.core.uploads import append_stream_to_file, check_stream_head, concatenate_stored_files
+from app.models import UploadSession
+from app.repositories.interfaces.task_repository import ITaskRepository
+from app.repositories.interfaces.upload_session_repository import IUploadSessionRepository
+from app.schemas.file import FileConversionParameters, FileOperationType, FileUpload
+from app.schemas.task import TaskResponse
+from app.schemas.upload_session import UploadSessionCreate, UploadSessionResponse, UploadSessionStatus
+from app.services.interfaces import IFileService, IUploadSessionService
+
+
+class UploadSessionService(IUploadSessionService):
+
+    def __init__(
+        self,
+        session_repository: IUploadSessionRepository,
+        task_repository: ITaskRepository,
+        file_service: IFileService
+    ):
+        self.session_repo = session_repository
+        self.task_repo = task_repository
+        self.file_service = file_service
+
+    async def create_session(
+        self,
+        user_id: uuid.UUID,
+        session_data: UploadSessionCreate
+    ) -> UploadSessionResponse:
+        """
+        Открывает сессию загрузки, данные копятся частями в UPLOAD_DIR/sessions
+        """
+        if session_data.total_size > settings.MAX_FILE_SIZE:
+            raise FileTooLargeException(settings.MAX_FILE_SIZE)
+
+        session_id = uuid.uuid4()
+        parameters = None
+        if session_data.parameters:
+            parameters = session_data.parameters.model_dump(mode="json", exclude_none=True)
+
+        session = UploadSession(
+            id=session_id,
+            user_id=user_id,
+            original_filename=session_data.original_filename,
+            content_type=session_data.content_type or "application/octet-stream",
+            operation_type=session_data.operation.value,
+            parameters=parameters,
+            total_size=session_data.total_size,
+            received_bytes=0,
+            temp_path=os.path.join(settings.UPLOAD_DIR, "sessions", f"{session_id.hex}.part"),
+            status=UploadSessionStatus.ACTIVE.value,
+            expires_at=datetime.now(timezone.utc) + timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS)
+        )
+        session = await self.session_repo.create(session)
+        return UploadSessionResponse.model_validate(session)
+
+    async def get_session(
+        self,
+        user_id: uuid.UUID,
+        session_id: uuid.UUID
+    ) -> UploadSessionResponse:
+        """Возвращает сессию вместе с подтвержденным offset"""
+        session = await self._get_user_session(user_id, session_id)
+        return UploadSessionResponse.model_validate(session)
+
+    async def upload_chunk(
+        self,
+        user_id: uuid.UUID,
+        session_id: uuid.UUID,
+        offset: int,
+        length: int,
+        chunks: AsyncIterator[bytes]
+    ) -> UploadSessionResponse:
+        """
+        Принимает диапазон из length байт начиная с offset.
+
+        Offset должен совпадать с уже подтвержденным, иначе клиенту возвращается
+        ожидаемое значение (409), и он продолжает с него. Тело каждого запроса
+        пишется в собственный файл и становится частью загрузки, только когда
+        условный UPDATE подтвердил offset. Поэтому параллельные запросы и
+        повторы с тем же offset не трогают уже принятые байты: проигравший
+        удаляет свой файл и получает 409. Первый диапазон проверяется по
+        сигнатуре до записи на диск. Тело, длина которого не совпадает с
+        Content-Range, отклоняется целиком.
+        """
+        session = await self._get_active_session(user_id, session_id)
+        if offset != session.received_bytes:
+            raise UploadOffsetMismatchException(session.received_bytes, offset)
+        if offset + length > session.total_size:
+            raise FileProcessingException("Content-Range exceeds the declared upload size")
+        if offset == 0:
+            chunks = check_stream_head(
+                chunks, FileOperationType(session.operation_type), self._session_parameters(session)
+            )
+
+        chunk_path = f"{session.temp_path}.{uuid.uuid4().hex}.chunk"
+        try:
+            written = await append_stream_to_file(
+                chunks,
+                chunk_path,
+                0,
+                max_bytes=session.total_size - offset
+            )
+            if written != length:
+                raise FileProcessingException(
+                    f"Content-Range declares {length} bytes, request body has {written}"
+                )
+
+            updated = await self.session_repo.advance_offset(session_id, offset, offset + written)
+            if not updated:
+                current = await self._get_user_session(user_id, session_id)
+                raise UploadOffsetMismatchException(current.received_bytes, offset)
+            await run_in_threadpool(os.replace, chunk_path, self._part_path(session, offset))
+        finally:
+            await run_in_threadpool(self._remove_from_disk, chunk_path)
+        return UploadSessionResponse.model_validate(updated)
+
+    async def complete_session(
+        self,
+        user_id: uuid.UUID,
+        session_id: uuid.UUID
+    ) -> TaskResponse:
+        """
+        Завершает загрузку: части склеиваются в один файл, он регистрируется
+        через IFileService, создается задача.
+
+        Сессия сначала условно переводится в completing, поэтому из
+        параллельных вызовов файл и задачу создаст только один; повторный
+        вызов для завершенной сессии возвращает уже созданную задачу.
+        Сессия прерывается только если само содержимое не подходит для
+        операции. При переполненной очереди, нехватке места или обрыве
+        соединения она возвращается в active, и завершение можно повторить.
+        """
+        session = await self._get_user_session(user_id, session_id)
+        if session.status == UploadSessionStatus.COMPLETED.value and session.task_id:
+            task = await self.task_repo.get_by_id(session.task_id)
+            return TaskResponse.model_validate(task)
+        if session.status != UploadSessionStatus.ACTIVE.value:
+            raise UploadSessionStateException(f"Upload session is {session.status}")
+        if session.received_bytes != session.total_size:
+            raise UploadSessionStateException(
+                f"Upload is incomplete: received {session.received_bytes} of {session.total_size} bytes"
+            )
+        if not await self.session_repo.start_completion(session_id):
+            current = await self._get_user_session(user_id, session_id)
+            raise UploadSessionStateException(f"Upload session is {current.status}")
+
+        upload_data = FileUpload(
+            operation=FileOperationType(session.operation_type),
+            parameters=self._session_parameters(session)
+        )
+        try:
+            stored = await concatenate_stored_files(
+                await run_in_threadpool(self._list_parts, session), session.temp_path
+            )
+            if stored.size != session.total_size:
+                raise FileProcessingException("Uploaded data does not match the committed offset")
+            task = await self.file_service.create_from_stored_upload(
+                user_id, stored, session.original_filename, session.content_type, upload_data
+            )
+        except FileProcessingException:
+            await self.session_repo.mark_as_aborted(session_id)
+            await run_in_threadpool(self._remove_session_files, session)
+            raise
+        except BaseException:
+            await self.session_repo.reopen(session_id)
+            await run_in_threadpool(self._remove_from_disk, session.temp_path)
+            raise
+
+        await self.session_repo.mark_as_completed(session_id, task.id)
+        await run_in_threadpool(self._remove_session_files, session)
+        return task
+
+    async def abort_session(
+        self,
+        user_id: uuid.UUID,
+        session_id: uuid.UUID
+    ) -> bool:
+        """Прерывает загрузку и удаляет принятые данные"""
+        session = await self._get_active_session(user_id, session_id)
+        await self.session_repo.mark_as_aborted(session_id)
+        await run_in_threadpool(self._remove_session_files, session)
+        return True
+
+    async def cleanup_expired_sessions(self) -> int:
+        """Удаляет временные файлы просроченных сессий"""
+        sessions = await self.session_repo.get_expired_sessions()
+        for session in sessions:
+            await self.session_repo.mark_as_aborted(session.id)
+            await run_in_threadpool(self._remove_session_files, session)
+        return len(sessions)
+
+    async def _get_user_session(self, user_id: uuid.UUID, session_id: uuid.UUID) -> UploadSession:
+        session = await self.session_repo.get_user_session(user_id, session_id)
+        if not session:
+            raise UploadSessionNotFoundException(str(session_id))
+        return session
+
+    async def _get_active_session(self, user_id: uuid.UUID, session_id: uuid.UUID) -> UploadSession:
+        session = await self._get_user_session(user_id, session_id)
+        if session.status != UploadSessionStatus.ACTIVE.value:
+            raise UploadSessionStateException(f"Upload session is {session.status}")
+        if session.expires_at <= datetime.now(timezone.utc):
+            raise UploadSessionStateException("Upload session has expired")
+        return session
+
+    @staticmethod
+    def _session_parameters(session: UploadSession) -> Optional[FileConversionParameters]:
+        return FileConversionParameters(**session.parameters) if session.parameters else None
+
+    @staticmethod
+    def _part_path(session: UploadSession, offset: int) -> str:
+        """Часть загрузки, начинающаяся с offset"""
+        return f"{session.temp_path}.{offset:012d}"
+
+    @classmethod
+    def _list_parts(cls, session: UploadSession) -> List[str]:
+        """Подтвержденные части по порядку: каждая начинается там, где кончилась предыдущая"""
+        parts = []
+        offset = 0
+        while offset < session.received_bytes:
+            path = cls._part_path(session, offset)
+            try:
+                size = os.path.getsize(path)
+            except FileNotFoundError:
+                raise FileProcessingException(f"Upload data is missing from offset {offset}")
+            parts.append(path)
+            offset += size
+        return parts
+
+    @classmethod
+    def _remove_session_files(cls, session: UploadSession) -> None:
+        cls._remove_from_disk(session.temp_path)
+        offset = 0
+        while offset < session.received_bytes:
+            path = cls._part_path(session, offset)
+            try:
+                offset += os.path.getsize(path)
+            except FileNotFoundError:
+                break
+            cls._remove_from_disk(path)
+
+    @staticmethod
+    def _remove_from_disk(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
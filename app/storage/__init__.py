@@ -0,0 +1,84 @@
+import os
+import uuid
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import AsyncIterator, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.storage.interfaces import IStorageBackend
+
+
+@lru_cache
+def get_storage() -> IStorageBackend:
+    """
+    Хранилище, выбранное настройкой STORAGE_BACKEND (один экземпляр на процесс).
+    Вызывается при старте API и воркера, чтобы ошибки конфигурации
+    проявлялись сразу, а не на первом запросе
+    """
+    if settings.STORAGE_BACKEND == "s3":
+        if not settings.UPLOAD_DIR_SHARED:
+            raise RuntimeError(
+                'STORAGE_BACKEND="s3" keeps upload session parts and the result cache in UPLOAD_DIR; '
+                "mount it as a volume shared by all API and worker nodes (or pin upload sessions "
+                "to one node) and set UPLOAD_DIR_SHARED=true"
+            )
+        from app.storage.s3_storage import S3Storage
+
+        return S3Storage(
+            bucket=settings.S3_BUCKET,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region=settings.S3_REGION,
+            access_key_id=settings.S3_ACCESS_KEY_ID,
+            secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+            presigned_url_expire_seconds=settings.S3_PRESIGNED_URL_EXPIRE_SECONDS,
+        )
+
+    from app.storage.local_storage import LocalStorage
+
+    return LocalStorage(settings.UPLOAD_DIR)
+
+
+def blob_key(sha256: str) -> str:
+    """Ключ содержимого файла, адресуемого по SHA-256"""
+    return f"blobs/{sha256}"
+
+
+def result_key(task_id: uuid.UUID, extension: str, name: Optional[str] = None) -> str:
+    """Ключ результата обработки задачи (name - для именованных результатов-рендишенов)"""
+    suffix = f"-{name}" if name else ""
+    return f"results/{task_id}{suffix}.{extension.lstrip('.')}"
+
+
+@asynccontextmanager
+async def open_local_copy(storage: IStorageBackend, key: str) -> AsyncIterator[str]:
+    """
+    Путь к содержимому ключа на локальном диске: для локального хранилища -
+    сам файл, для удаленного - временная копия, удаляемая на выходе
+    """
+    local_path = storage.get_local_path(key)
+    if local_path:
+        yield local_path
+        return
+
+    temp_dir = os.path.join(settings.UPLOAD_DIR, "tmp")
+    await run_in_threadpool(os.makedirs, temp_dir, exist_ok=True)
+    temp_path = os.path.join(temp_dir, uuid.uuid4().hex)
+    try:
+        await storage.download_to(key, temp_path)
+        yield temp_path
+    finally:
+        try:
+            await run_in_threadpool(os.remove, temp_path)
+        except FileNotFoundError:
+            pass
+
+
+__all__ = [
+    "IStorageBackend",
+    "blob_key",
+    "get_storage",
+    "open_local_copy",
+    "result_key",
+]
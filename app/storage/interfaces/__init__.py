@@ -0,0 +1,5 @@
+from app.storage.interfaces.storage_backend import IStorageBackend
+
+__all__ = [
+    "IStorageBackend",
+]
@@ -0,0 +1,47 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class IStorageBackend(ABC):
+    """
+    Хранилище содержимого файлов.
+
+    Файлы адресуются ключами вида "<пространство>/<имя>" (например
+    "blobs/<sha256>" или "results/<task_id>.png"); раскладка ключей по
+    каталогам или объектам - забота конкретной реализации.
+    """
+
+    @abstractmethod
+    async def save_file(self, key: str, source_path: str) -> None:
+        """Поместить локальный файл в хранилище под ключом key (source_path забирается)"""
+        ...
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        """Проверить наличие ключа"""
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> bool:
+        """Удалить ключ (возвращает False, если его не было)"""
+        ...
+
+    @abstractmethod
+    async def download_to(self, key: str, destination_path: str) -> None:
+        """Скачать содержимое ключа в локальный файл"""
+        ...
+
+    @abstractmethod
+    def get_local_path(self, key: str) -> Optional[str]:
+        """Путь к файлу на локальном диске (None, если хранилище удаленное)"""
+        ...
+
+    @abstractmethod
+    async def get_download_url(
+        self,
+        key: str,
+        filename: str,
+        media_type: str
+    ) -> Optional[str]:
+        """Прямая ссылка на скачивание в обход API (None, если не поддерживается)"""
+        ...
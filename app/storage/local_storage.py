@@ -0,0 +1,72 @@
+import hashlib
+import os
+import shutil
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.storage.interfaces import IStorageBackend
+
+
+class LocalStorage(IStorageBackend):
+    """
+    Хранилище на локальном диске.
+
+    Ключ "<пространство>/<имя>" хранится в root/<пространство>/<aa>/<bb>/<имя>,
+    где aa и bb - первые байты SHA-256 от имени. Так каталоги остаются
+    небольшими даже при миллионах файлов. Ключи, которые уже являются путями
+    внутри root (записи, созданные до появления хранилища), используются как есть.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def get_local_path(self, key: str) -> Optional[str]:
+        return self._resolve(key)
+
+    async def save_file(self, key: str, source_path: str) -> None:
+        await run_in_threadpool(self._move_into_place, source_path, self._resolve(key))
+
+    async def exists(self, key: str) -> bool:
+        return await run_in_threadpool(os.path.exists, self._resolve(key))
+
+    async def delete(self, key: str) -> bool:
+        return await run_in_threadpool(self._remove, self._resolve(key))
+
+    async def download_to(self, key: str, destination_path: str) -> None:
+        await run_in_threadpool(shutil.copyfile, self._resolve(key), destination_path)
+
+    async def get_download_url(
+        self,
+        key: str,
+        filename: str,
+        media_type: str
+    ) -> Optional[str]:
+        return None
+
+    def _resolve(self, key: str) -> str:
+        if os.path.isabs(key) or key.startswith(self.root.rstrip(os.sep) + os.sep):
+            return key
+        namespace, _, name = key.rpartition("/")
+        digest = hashlib.sha256(name.encode()).hexdigest()
+        return os.path.join(self.root, namespace, digest[:2], digest[2:4], name)
+
+    @staticmethod
+    def _move_into_place(source_path: str, destination: str) -> None:
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        try:
+            os.replace(source_path, destination)
+        except OSError:
+            # Источник на другом разделе: копируем во временный файл рядом и переименовываем
+            temp_path = f"{destination}.part"
+            shutil.copyfile(source_path, temp_path)
+            os.replace(temp_path, destination)
+            os.remove(source_path)
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
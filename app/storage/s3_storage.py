@@ -0,0 +1,91 @@
+import os
+from typing import Optional
+from urllib.parse import quote
+
+from starlette.concurrency import run_in_threadpool
+
+from app.storage.interfaces import IStorageBackend
+
+
+class S3Storage(IStorageBackend):
+    """
+    Хранилище в S3-совместимом объектном хранилище (AWS S3, MinIO, Ceph RGW).
+
+    Ключи используются как имена объектов без изменений. Файлы отдаются
+    клиентам по presigned URL, поэтому несколько узлов API и воркеров могут
+    работать с одними данными без общего тома. boto3 импортируется только
+    при выборе этого драйвера.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        access_key_id: Optional[str] = None,
+        secret_access_key: Optional[str] = None,
+        presigned_url_expire_seconds: int = 3600
+    ):
+        try:
+            import boto3
+            from botocore.config import Config
+        except ImportError as exc:
+            raise RuntimeError('STORAGE_BACKEND="s3" requires the "boto3" package') from exc
+
+        self.bucket = bucket
+        self.presigned_url_expire_seconds = presigned_url_expire_seconds
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            region_name=region,
+            aws_access_key_id=access_key_id,
+            aws_secret_access_key=secret_access_key,
+            config=Config(signature_version="s3v4", s3={"addressing_style": "path"}),
+        )
+
+    def get_local_path(self, key: str) -> Optional[str]:
+        return None
+
+    async def save_file(self, key: str, source_path: str) -> None:
+        await run_in_threadpool(self.client.upload_file, source_path, self.bucket, key)
+        await run_in_threadpool(os.remove, source_path)
+
+    async def exists(self, key: str) -> bool:
+        return await run_in_threadpool(self._head, key)
+
+    async def delete(self, key: str) -> bool:
+        existed = await self.exists(key)
+        await run_in_threadpool(self.client.delete_object, Bucket=self.bucket, Key=key)
+        return existed
+
+    async def download_to(self, key: str, destination_path: str) -> None:
+        await run_in_threadpool(self.client.download_file, self.bucket, key, destination_path)
+
+    async def get_download_url(
+        self,
+        key: str,
+        filename: str,
+        media_type: str
+    ) -> Optional[str]:
+        return await run_in_threadpool(
+            self.client.generate_presigned_url,
+            "get_object",
+            Params={
+                "Bucket": self.bucket,
+                "Key": key,
+                "ResponseContentType": media_type,
+                "ResponseContentDisposition": f"attachment; filename*=utf-8''{quote(filename)}",
+            },
+            ExpiresIn=self.presigned_url_expire_seconds,
+        )
+
+    def _head(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except ClientError as exc:
+            if exc.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
@@ -0,0 +1,9 @@
+from app.worker.celery_app import PROCESS_TASKS, celery_app
+from app.worker.routing import get_message_size, get_queue
+
+__all__ = [
+    "PROCESS_TASKS",
+    "celery_app",
+    "get_message_size",
+    "get_queue",
+]
@@ -0,0 +1,35 @@
+"""
+Запуск воркера одной полосы с ее настройками пула:
+
+    python -m app.worker cpu|io|light            # быстрая полоса класса
+    python -m app.worker cpu.bulk|io.bulk|...    # крупные задачи класса
+"""
+import sys
+
+from app.storage import get_storage
+from app.worker.celery_app import celery_app
+from app.worker.routing import ALL_QUEUES, get_lane_worker
+
+
+def main() -> None:
+    if len(sys.argv) < 2 or sys.argv[1] not in ALL_QUEUES:
+        sys.exit(f"usage: python -m app.worker {{{'|'.join(ALL_QUEUES)}}} [celery worker options]")
+
+    get_storage()
+    lane = sys.argv[1]
+    queues, options = get_lane_worker(lane)
+    celery_app.worker_main([
+        "worker",
+        f"--queues={','.join(queues)}",
+        f"--hostname={lane}@%h",
+        f"--pool={options.pool}",
+        f"--concurrency={options.concurrency}",
+        f"--prefetch-multiplier={options.prefetch_multiplier}",
+        "--optimization=fair",
+        "--loglevel=INFO",
+        *sys.argv[2:],
+    ])
+
+
+if __name__ == "__main__":
+    main()
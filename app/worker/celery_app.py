@@ -0,0 +1,35 @@
+from celery import Celery
+from kombu import Queue
+
+from app.core.config import settings
+from app.worker.routing import ALL_QUEUES, QUEUE_LIGHT
+
+# Имя задачи воркера: обрабатывает пачку задач по их ID (Task.id)
+PROCESS_TASKS = "app.worker.process_tasks"
+
+celery_app = Celery(
+    "file_processing",
+    broker=settings.CELERY_BROKER_URL or settings.REDIS_URL,
+    include=["app.worker.tasks"],
+)
+
+celery_app.conf.update(
+    task_serializer="json",
+    accept_content=["json"],
+    # Результаты не хранятся: источник истины - таблица tasks
+    task_ignore_result=True,
+    # Сообщение подтверждается после обработки и возвращается в очередь, если воркер умер
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    worker_prefetch_multiplier=1,
+    # Дольше этого неподтвержденное сообщение Redis отдаст другому воркеру.
+    # Очереди опрашиваются в порядке --queues, а не по кругу: воркер
+    # полосы bulk берет крупную задачу, только когда быстрая полоса пуста
+    broker_transport_options={
+        "visibility_timeout": settings.CELERY_VISIBILITY_TIMEOUT_SECONDS,
+        "queue_order_strategy": "priority",
+    },
+    broker_connection_retry_on_startup=True,
+    task_queues=[Queue(queue) for queue in ALL_QUEUES],
+    task_default_queue=QUEUE_LIGHT,
+)
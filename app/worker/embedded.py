@@ -0,0 +1,29 @@
+import threading
+
+from app.core.config import settings
+from app.worker.celery_app import celery_app
+from app.worker.routing import ALL_QUEUES
+
+
+def start_embedded_worker():
+    """
+    Запускает воркер Celery в потоке текущего процесса для всех очередей.
+
+    Нужен для брокера в памяти (CELERY_BROKER_URL=memory://): такой брокер
+    виден только внутри процесса, поэтому API и воркер должны жить вместе.
+    Так сквозные тесты пропускной способности идут без Redis.
+    """
+    import app.worker.tasks  # noqa: F401 - регистрирует задачи воркера
+
+    worker = celery_app.WorkController(
+        queues=ALL_QUEUES,
+        pool_cls="threads",
+        concurrency=settings.CELERY_EMBEDDED_WORKER_CONCURRENCY,
+        prefetch_multiplier=1,
+        without_heartbeat=True,
+        without_mingle=True,
+        without_gossip=True,
+        loglevel="INFO",
+    )
+    threading.Thread(target=worker.start, name="embedded-celery-worker", daemon=True).start()
+    return worker
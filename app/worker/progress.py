@@ -0,0 +1,91 @@
+import time
+from typing import Callable, Iterable, Optional
+
+from app.core.config import settings
+
+
+class ProgressReporter:
+    """
+    Прореживает обновления прогресса задачи перед тем, как их отдать наружу.
+
+    Используется как ProgressCallback обработчика. Промежуточное значение
+    публикуется в быстрый канал (publish), только если оно выросло хотя бы
+    на min_delta процентов и с прошлой публикации прошло min_interval секунд.
+    В БД (persist) пишутся лишь пересеченные вехи; итоговое состояние
+    сохраняет сам воркер при завершении задачи. Прогресс не убывает.
+
+    Каждый вызов - еще и точка, где задачу можно прервать: checkpoint
+    вызывается не чаще раза в checkpoint_interval секунд и может бросить
+    исключение, которое остановит обработчик.
+    """
+
+    def __init__(
+        self,
+        publish: Callable[[int], None],
+        persist: Optional[Callable[[int], None]] = None,
+        min_delta: int = None,
+        min_interval: float = None,
+        milestones: Iterable[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+        checkpoint: Optional[Callable[[], None]] = None,
+        checkpoint_interval: float = None
+    ):
+        self.publish = publish
+        self.persist = persist
+        self.min_delta = min_delta if min_delta is not None else settings.TASK_PROGRESS_MIN_DELTA
+        self.min_interval = (
+            min_interval if min_interval is not None else settings.TASK_PROGRESS_MIN_INTERVAL_SECONDS
+        )
+        self.milestones = sorted(
+            milestones if milestones is not None else settings.TASK_PROGRESS_MILESTONES
+        )
+        self.clock = clock
+        self.checkpoint = checkpoint
+        self.checkpoint_interval = (
+            checkpoint_interval if checkpoint_interval is not None
+            else settings.TASK_CANCEL_CHECK_INTERVAL_SECONDS
+        )
+
+        self.current = 0
+        self._published = 0
+        self._published_at = None
+        self._persisted = 0
+        self._checked_at = None
+
+    def __call__(self, progress: int) -> None:
+        self._check()
+        progress = max(0, min(int(progress), 100))
+        if progress <= self.current:
+            return
+        self.current = progress
+
+        now = self.clock()
+        if self.persist and any(self._persisted < milestone <= progress for milestone in self.milestones):
+            self.persist(progress)
+            self._persisted = progress
+            self._publish(progress, now)
+            return
+
+        if progress - self._published < self.min_delta and progress < 100:
+            return
+        if self._published_at is not None and now - self._published_at < self.min_interval:
+            return
+        self._publish(progress, now)
+
+    def flush(self) -> None:
+        """Публикует последнее значение, если оно было придержано"""
+        if self.current > self._published:
+            self._publish(self.current, self.clock())
+
+    def _check(self) -> None:
+        if not self.checkpoint:
+            return
+        now = self.clock()
+        if self._checked_at is None or now - self._checked_at >= self.checkpoint_interval:
+            self._checked_at = now
+            self.checkpoint()
+
+    def _publish(self, progress: int, now: float) -> None:
+        self.publish(progress)
+        self._published = progress
+        self._published_at = now
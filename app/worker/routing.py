@@ -0,0 +1,118 @@
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.schemas.file import FileConversionParameters, FileOperationType, get_operation_chain
+
+# Очереди по классу стоимости операции
+QUEUE_CPU = "cpu"
+QUEUE_IO = "io"
+QUEUE_LIGHT = "light"
+
+OPERATION_QUEUES = {
+    FileOperationType.CONVERT_JPG_TO_PNG: QUEUE_CPU,
+    FileOperationType.CONVERT_PNG_TO_JPG: QUEUE_CPU,
+    FileOperationType.RESIZE_IMAGE: QUEUE_CPU,
+    FileOperationType.COMPRESS_ZIP: QUEUE_IO,
+    FileOperationType.CONVERT_TXT_TO_PDF: QUEUE_LIGHT,
+}
+
+# Крупные задачи класса идут в отдельную полосу "<очередь>.bulk",
+# чтобы маленькие не ждали за ними в общей FIFO-очереди
+BULK_LANE_SUFFIX = ".bulk"
+
+# Относительная стоимость обработки байта входа операцией: JPEG сжат
+# сильнее PNG, поэтому на байт файла приходится больше пикселей
+OPERATION_COST_WEIGHTS = {
+    FileOperationType.CONVERT_JPG_TO_PNG: 2.0,
+    FileOperationType.CONVERT_PNG_TO_JPG: 1.0,
+    FileOperationType.RESIZE_IMAGE: 1.0,
+    FileOperationType.COMPRESS_ZIP: 0.5,
+    FileOperationType.CONVERT_TXT_TO_PDF: 1.0,
+}
+
+
+@dataclass(frozen=True)
+class QueueWorkerOptions:
+    """Параметры пула воркеров одной очереди"""
+    concurrency: int
+    prefetch_multiplier: int
+    pool: str
+
+
+QUEUE_WORKER_OPTIONS: Dict[str, QueueWorkerOptions] = {
+    QUEUE_CPU: QueueWorkerOptions(
+        concurrency=settings.WORKER_CPU_CONCURRENCY,
+        prefetch_multiplier=settings.WORKER_CPU_PREFETCH_MULTIPLIER,
+        pool="prefork",
+    ),
+    QUEUE_IO: QueueWorkerOptions(
+        concurrency=settings.WORKER_IO_CONCURRENCY,
+        prefetch_multiplier=settings.WORKER_IO_PREFETCH_MULTIPLIER,
+        pool="threads",
+    ),
+    QUEUE_LIGHT: QueueWorkerOptions(
+        concurrency=settings.WORKER_LIGHT_CONCURRENCY,
+        prefetch_multiplier=settings.WORKER_LIGHT_PREFETCH_MULTIPLIER,
+        pool="prefork",
+    ),
+}
+
+
+ALL_QUEUES: List[str] = [
+    lane for queue in QUEUE_WORKER_OPTIONS for lane in (queue, queue + BULK_LANE_SUFFIX)
+]
+
+
+def estimate_cost(
+    operation: FileOperationType,
+    file_size: int,
+    parameters: Optional[FileConversionParameters] = None
+) -> float:
+    """Ожидаемая стоимость задачи: размер входа, взвешенный по всем шагам конвейера"""
+    return file_size * sum(OPERATION_COST_WEIGHTS[step] for step in get_operation_chain(operation, parameters))
+
+
+def get_queue(
+    operation: FileOperationType,
+    file_size: int,
+    parameters: Optional[FileConversionParameters] = None
+) -> str:
+    """
+    Очередь для задачи: класс стоимости самого дорогого шага конвейера и
+    полоса внутри класса - быстрая (сама очередь класса) для дешевых задач
+    и bulk для задач с ожидаемой стоимостью больше BULK_LANE_MIN_COST
+    """
+    queues = {OPERATION_QUEUES[step] for step in get_operation_chain(operation, parameters)}
+    queue = next(queue for queue in (QUEUE_CPU, QUEUE_IO, QUEUE_LIGHT) if queue in queues)
+    if estimate_cost(operation, file_size, parameters) > settings.BULK_LANE_MIN_COST:
+        return queue + BULK_LANE_SUFFIX
+    return queue
+
+
+def get_message_size(queue: str) -> int:
+    """
+    Сколько задач можно отправить в очередь одним сообщением: крупные
+    задачи полосы bulk - по одной, чтобы они расходились по слотам
+    """
+    if queue.endswith(BULK_LANE_SUFFIX):
+        return 1
+    return max(settings.TASK_MESSAGE_MAX_TASKS, 1)
+
+
+def get_lane_worker(lane: str) -> Tuple[List[str], QueueWorkerOptions]:
+    """
+    Очереди и параметры пула воркера полосы ("cpu" или "cpu.bulk").
+
+    Слоты класса делятся между полосами: воркер bulk получает долю
+    BULK_LANE_SLOT_SHARE и слушает обе очереди, сначала быструю, а воркер
+    быстрой полосы - остальные слоты и только свою очередь. Так крупные
+    задачи занимают не больше своей доли слотов, а мелкие могут занять все.
+    Воркер bulk не берет сообщения про запас, чтобы не придерживать их.
+    """
+    queue, _, suffix = lane.partition(".")
+    options = QUEUE_WORKER_OPTIONS[queue]
+    bulk_slots = max(round(options.concurrency * settings.BULK_LANE_SLOT_SHARE), 1)
+    if suffix:
+        return [queue, lane], replace(options, concurrency=bulk_slots, prefetch_multiplier=1)
+    return [queue], replace(options, concurrency=max(options.concurrency - bulk_slots, 1))
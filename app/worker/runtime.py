@@ -0,0 +1,75 @@
+import asyncio
+import os
+import threading
+from typing import Awaitable, Optional, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+
+class WorkerRuntime:
+    """
+    Асинхронное окружение процесса воркера: event loop в фоновом потоке
+    и пул соединений с БД, общий для всех задач процесса.
+
+    Задачи Celery синхронные, поэтому корутины отправляются в этот loop
+    через run(). Один loop на процесс подходит и для prefork, и для пула
+    потоков: соединения asyncpg привязаны к loop, в котором созданы.
+    Окружение создается лениво и пересоздается после fork, так как
+    потоки и соединения родителя в дочернем процессе не работают.
+    """
+
+    def __init__(self, pool_size: int, max_overflow: int):
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._engine: Optional[AsyncEngine] = None
+        self._sessionmaker: Optional[async_sessionmaker] = None
+
+    def run(self, coroutine: Awaitable[T]) -> T:
+        """Выполняет корутину в loop процесса и ждет результат"""
+        self._ensure_started()
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def session(self) -> AsyncSession:
+        """Новая сессия из пула процесса (использовать внутри run())"""
+        self._ensure_started()
+        return self._sessionmaker()
+
+    def shutdown(self) -> None:
+        """Закрывает соединения и останавливает loop"""
+        with self._lock:
+            if self._pid != os.getpid() or not self._loop:
+                return
+            asyncio.run_coroutine_threadsafe(self._engine.dispose(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._pid = self._loop = self._engine = self._sessionmaker = None
+
+    def _ensure_started(self) -> None:
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="worker-event-loop", daemon=True).start()
+            self._engine = create_async_engine(
+                settings.DATABASE_URL,
+                pool_size=self.pool_size,
+                max_overflow=self.max_overflow,
+                pool_pre_ping=True,
+            )
+            self._sessionmaker = async_sessionmaker(self._engine, class_=AsyncSession, expire_on_commit=False)
+            self._loop = loop
+            self._pid = os.getpid()
+
+
+worker_runtime = WorkerRuntime(
+    pool_size=settings.WORKER_DB_POOL_SIZE,
+    max_overflow=settings.WORKER_DB_MAX_OVERFLOW,
+)
@@ -0,0 +1,50 @@
+import logging
+import uuid
+from typing import List
+
+from celery.signals import worker_process_shutdown
+
+from app.repositories.file_repository import FileRepository
+from app.repositories.task_repository import TaskRepository
+from app.repositories.task_result_repository import TaskResultRepository
+from app.services.progress_channel import task_progress_channel
+from app.services.result_cache import result_cache
+from app.services.task_dispatcher import task_dispatcher
+from app.services.task_service import TaskService
+from app.storage import get_storage
+from app.worker.celery_app import PROCESS_TASKS, celery_app
+from app.worker.runtime import worker_runtime
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name=PROCESS_TASKS, acks_late=True, reject_on_worker_lost=True, ignore_result=True)
+def process_tasks(task_ids: List[str]) -> None:
+    """
+    Обрабатывает пачку задач по их ID. Сообщение подтверждается только
+    после обработки всей пачки (acks_late), поэтому при падении воркера
+    оно будет доставлено повторно; задачи, которые уже завершены или
+    выполняются другим воркером под действующей арендой, при этом
+    пропускаются.
+    """
+    worker_runtime.run(_process_tasks([uuid.UUID(task_id) for task_id in task_ids]))
+
+
+async def _process_tasks(task_ids: List[uuid.UUID]) -> None:
+    async with worker_runtime.session() as session:
+        service = TaskService(
+            TaskRepository(session),
+            FileRepository(session),
+            TaskResultRepository(session),
+            result_cache,
+            get_storage(),
+            task_progress_channel,
+            task_dispatcher,
+        )
+        for task_id in task_ids:
+            await service.process_file_conversion(task_id)
+
+
+@worker_process_shutdown.connect
+def _shutdown_runtime(**kwargs) -> None:
+    worker_runtime.shutdown()
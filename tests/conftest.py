@@ -0,0 +1,18 @@
+import os
+
+# Настройки без значений по умолчанию: тестам не нужны ни база, ни брокер
+for name, value in {
+    "VERSION": "test",
+    "API_V1_STR": "/api",
+    "POSTGRES_DB": "test",
+    "POSTGRES_USER": "test",
+    "POSTGRES_PASSWORD": "test",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_HOST": "localhost",
+    "SECRET_KEY": "test",
+    "REFRESH_SECRET_KEY": "test",
+    "ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "10",
+    "REFRESH_TOKEN_EXPIRE_DAYS": "1",
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,27 @@
+import uuid
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import File, Task, User
+
+
+async def create_task(session: AsyncSession, **values) -> Task:
+    """Пользователь, файл и задача с минимально нужными полями"""
+    user = User(
+        username=f"user-{uuid.uuid4().hex[:8]}",
+        email=f"{uuid.uuid4().hex[:8]}@example.com",
+        hashed_password="x",
+    )
+    db_file = File(
+        user=user,
+        original_filename="a.png",
+        stored_filename="a.png",
+        file_path="blobs/a",
+        file_size=1024,
+        mime_type="image/png",
+        extension="png",
+    )
+    task = Task(user=user, file=db_file, operation_type="convert_png_to_jpg", **values)
+    session.add_all([user, db_file, task])
+    await session.commit()
+    return task
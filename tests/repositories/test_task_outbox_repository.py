@@ -0,0 +1,75 @@
+import uuid
+
+from sqlalchemy import func, select
+
+from app.models import Task, TaskOutbox
+from app.repositories.task_outbox_repository import TaskOutboxRepository
+from app.repositories.task_repository import TaskRepository
+from tests.repositories.factories import create_task
+
+
+async def create_queued_task(session, job_id):
+    task = await create_task(session)
+    session.add(TaskOutbox(task_id=task.id, queue="cpu", job_id=job_id))
+    await session.commit()
+    return task
+
+
+def test_claim_batch_skips_entries_locked_by_another_relay(run_db):
+    async def scenario(session_factory):
+        async with session_factory() as session:
+            tasks = [await create_queued_task(session, "job-1") for _ in range(3)]
+
+        async with session_factory() as first, session_factory() as second:
+            claimed = await TaskOutboxRepository(first).claim_batch(2)
+            assert [entry.task_id for entry in claimed] == [task.id for task in tasks[:2]]
+            assert claimed[0].task.status == "pending"
+
+            rest = await TaskOutboxRepository(second).claim_batch(10)
+            assert [entry.task_id for entry in rest] == [tasks[2].id]
+            await first.rollback()
+            await second.rollback()
+
+    run_db(scenario)
+
+
+def test_release_deletes_entries_and_records_job_id(run_db):
+    async def scenario(session_factory):
+        async with session_factory() as session:
+            task = await create_queued_task(session, "job-1")
+            repo = TaskOutboxRepository(session)
+            entries = await repo.claim_batch(10)
+            await repo.release([entry.id for entry in entries], {"job-1": [task.id]})
+
+        async with session_factory() as session:
+            assert await session.scalar(select(func.count(TaskOutbox.id))) == 0
+            assert await session.scalar(select(Task.celery_task_id).where(Task.id == task.id)) == "job-1"
+
+    run_db(scenario)
+
+
+def test_requeue_returns_tasks_to_outbox_or_fails_them(run_db):
+    async def scenario(session_factory):
+        async with session_factory() as session:
+            retried = await create_task(session)
+            exhausted = await create_task(session)
+            tasks = TaskRepository(session)
+            await tasks.claim(retried.id, "worker-a", 60)
+            await tasks.claim(exhausted.id, "worker-a", 60)
+
+            await TaskOutboxRepository(session).requeue({retried.id: "cpu.bulk"}, [exhausted.id], "gave up")
+
+        async with session_factory() as session:
+            retried_row = await session.get(Task, retried.id)
+            assert retried_row.status == "pending"
+            assert retried_row.lease_owner is None
+            entry = await session.scalar(select(TaskOutbox).where(TaskOutbox.task_id == retried.id))
+            assert entry.queue == "cpu.bulk"
+            uuid.UUID(entry.job_id)
+
+            exhausted_row = await session.get(Task, exhausted.id)
+            assert exhausted_row.status == "failed"
+            assert exhausted_row.error_message == "gave up"
+            assert exhausted_row.lease_expires_at is None
+
+    run_db(scenario)
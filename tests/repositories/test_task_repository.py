@@ -0,0 +1,172 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import update
+
+from app.models import Task, TaskResult
+from app.repositories.task_repository import TaskRepository
+from app.repositories.task_result_repository import TaskResultRepository
+from tests.repositories.factories import create_task
+
+
+async def expire_lease(session, task_id):
+    await session.execute(
+        update(Task)
+        .where(Task.id == task_id)
+        .values(lease_expires_at=datetime.now(timezone.utc) - timedelta(seconds=1))
+    )
+    await session.commit()
+
+
+def test_claim_takes_pending_task_once(run_db):
+    async def scenario(session_factory):
+        async with session_factory() as session:
+            task = await create_task(session)
+            claimed = await TaskRepository(session).claim(task.id, "worker-a", 60)
+            assert claimed.status == "processing"
+            assert claimed.lease_owner == "worker-a"
+            assert claimed.attempts == 1
+            assert claimed.lease_expires_at > datetime.now(timezone.utc)
+
+        async with session_factory() as session:
+            assert await TaskRepository(session).claim(task.id, "worker-b", 60) is None
+
+    run_db(scenario)
+
+
+def test_claim_takes_over_expired_lease(run_db):
+    async def scenario(session_factory):
+        async with session_factory() as session:
+            task = await create_task(session)
+            repo = TaskRepository(session)
+            await repo.claim(task.id, "worker-a", 60)
+            await expire_lease(session, task.id)
+
+            claimed = await repo.claim(task.id, "worker-b", 60)
+            assert claimed.lease_owner == "worker-b"
+            assert claimed.attempts == 2
+            assert not await repo.extend_lease(task.id, "worker-a", 60)
+            assert await repo.extend_lease(task.id, "worker-b", 60)
+
+    run_db(scenario)
+
+
+def test_claim_skips_finished_and_cancelled_tasks(run_db):
+    async def scenario(session_factory):
+        async with session_factory() as session:
+            repo = TaskRepository(session)
+            for status in ("completed", "failed", "cancelled"):
+                task = await create_task(session, status=status)
+                assert await repo.claim(task.id, "worker-a", 60) is None
+
+    run_db(scenario)
+
+
+def test_extend_lease_stops_after_cancel(run_db):
+    async def scenario(session_factory):
+        async with session_factory() as session:
+            task = await create_task(session)
+            repo = TaskRepository(session)
+            await repo.claim(task.id, "worker-a", 60)
+            assert await repo.mark_as_cancelled(task.id)
+            assert not await repo.extend_lease(task.id, "worker-a", 60)
+
+    run_db(scenario)
+
+
+def test_finish_requires_current_lease_owner(run_db):
+    async def scenario(session_factory):
+        async with session_factory() as session:
+            task = await create_task(session)
+            repo = TaskRepository(session)
+            await repo.claim(task.id, "worker-a", 60)
+            await expire_lease(session, task.id)
+            await repo.claim(task.id, "worker-b", 60)
+
+            assert await repo.mark_as_completed(task.id, "results/a.jpg", "worker-a") is None
+            completed = await repo.mark_as_completed(task.id, "results/b.jpg", "worker-b")
+            assert completed.status == "completed"
+            assert completed.result_file_path == "results/b.jpg"
+            assert completed.lease_expires_at is None
+
+    run_db(scenario)
+
+
+def test_finish_does_not_overwrite_cancelled_task(run_db):
+    async def scenario(session_factory):
+        async with session_factory() as session:
+            task = await create_task(session)
+            repo = TaskRepository(session)
+            await repo.claim(task.id, "worker-a", 60)
+            await repo.mark_as_cancelled(task.id)
+
+            assert await repo.mark_as_failed(task.id, "boom", "worker-a") is None
+            assert await repo.mark_as_completed(task.id) is None
+            assert await repo.get_status(task.id) == "cancelled"
+
+    run_db(scenario)
+
+
+def test_get_expired_leases(run_db):
+    async def scenario(session_factory):
+        async with session_factory() as session:
+            repo = TaskRepository(session)
+            live = await create_task(session)
+            expired = await create_task(session)
+            await repo.claim(live.id, "worker-a", 60)
+            await repo.claim(expired.id, "worker-a", 60)
+            await expire_lease(session, expired.id)
+
+            tasks = await repo.get_expired_leases(10)
+            assert [task.id for task in tasks] == [expired.id]
+            assert tasks[0].file.file_size == 1024
+            await session.rollback()
+
+    run_db(scenario)
+
+
+def rendition_result(task, name):
+    return TaskResult(
+        task_id=task.id,
+        name=name,
+        storage_key=f"results/{task.id}-{name}.png",
+        file_size=10,
+        mime_type="image/png",
+        width=1,
+        height=1,
+    )
+
+
+def test_completion_saves_results_in_the_same_transaction(run_db):
+    async def scenario(session_factory):
+        async with session_factory() as session:
+            task = await create_task(session)
+            repo = TaskRepository(session)
+            await repo.claim(task.id, "worker-a", 60)
+
+            results = [rendition_result(task, "small"), rendition_result(task, "large")]
+            completed = await repo.mark_as_completed(task.id, results[0].storage_key, "worker-a", results)
+            assert completed.status == "completed"
+
+        async with session_factory() as session:
+            saved = await TaskResultRepository(session).get_by_task_id(task.id)
+            assert sorted(result.name for result in saved) == ["large", "small"]
+
+    run_db(scenario)
+
+
+def test_completion_without_lease_saves_no_results(run_db):
+    async def scenario(session_factory):
+        async with session_factory() as session:
+            task = await create_task(session)
+            repo = TaskRepository(session)
+            await repo.claim(task.id, "worker-a", 60)
+            await expire_lease(session, task.id)
+            await repo.claim(task.id, "worker-b", 60)
+
+            results = [rendition_result(task, "small")]
+            assert await repo.mark_as_completed(task.id, results[0].storage_key, "worker-a", results) is None
+
+        async with session_factory() as session:
+            assert await TaskResultRepository(session).get_by_task_id(task.id) == []
+
+    run_db(scenario)
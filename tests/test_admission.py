@@ -0,0 +1,79 @@
+import asyncio
+
+from app.core.admission import AdmissionController, UploadAdmissionMiddleware
+
+MB = 1024 * 1024
+
+
+def make_controller():
+    return AdmissionController(
+        max_inflight_bytes=100 * MB,
+        max_user_inflight_bytes=30 * MB,
+        max_queued_tasks=10,
+        max_user_queued_tasks=5,
+        retry_after_seconds=7,
+    )
+
+
+def test_reservations_are_not_clamped():
+    controller = make_controller()
+    assert controller.try_reserve_upload("user", 20 * MB)
+    assert not controller.try_reserve_upload("user", 20 * MB)
+    controller.release_upload("user", 20 * MB)
+    assert controller.get_stats()["inflight_upload_bytes"] == 0
+    assert controller.try_reserve_upload("user", 30 * MB)
+
+
+def test_upload_over_budget_never_fits():
+    controller = make_controller()
+    assert controller.fits_upload_budget("user", 30 * MB)
+    assert not controller.fits_upload_budget("user", 30 * MB + 1)
+    assert controller.fits_upload_budget(None, 100 * MB)
+    assert not controller.fits_upload_budget(None, 100 * MB + 1)
+
+
+def run_upload(controller, content_length):
+    calls = []
+
+    async def app(scope, receive, send):
+        calls.append(scope["path"])
+        await send({"type": "http.response.start", "status": 201, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/api/files/upload",
+        "headers": [(b"content-length", str(content_length).encode())],
+    }
+    asyncio.run(UploadAdmissionMiddleware(app, controller)(scope, receive, send))
+    return sent[0]["status"], calls
+
+
+def test_middleware_rejects_oversized_upload_with_413():
+    controller = make_controller()
+    status, calls = run_upload(controller, 100 * MB + 1)
+    assert status == 413
+    assert not calls
+    assert controller.get_stats()["inflight_upload_bytes"] == 0
+
+
+def test_middleware_reserves_and_releases():
+    controller = make_controller()
+    status, calls = run_upload(controller, 10 * MB)
+    assert status == 201
+    assert calls == ["/api/files/upload"]
+    assert controller.get_stats()["inflight_upload_bytes"] == 0
+
+    controller.try_reserve_upload(None, 95 * MB)
+    status, calls = run_upload(controller, 10 * MB)
+    assert status == 429
+    assert not calls
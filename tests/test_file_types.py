@@ -0,0 +1,90 @@
+import io
+import struct
+
+import pytest
+from PIL import Image
+
+from app.core.exceptions import UnsupportedFileTypeException
+from app.core.file_types import (
+    TEXT_FILE_TYPE,
+    UNKNOWN_FILE_TYPE,
+    ensure_operation_accepts,
+    get_result_extension,
+    sniff_file_type,
+)
+from app.schemas.file import FileConversionParameters, FileOperationType
+
+
+@pytest.mark.parametrize("head, mime_type", [
+    (b"\xff\xd8\xff\xe0\x00\x10JFIF", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR", "image/png"),
+    (b"GIF89a\x01\x00", "image/gif"),
+    (b"RIFF\x24\x00\x00\x00WEBPVP8 ", "image/webp"),
+    (b"II*\x00\x08\x00", "image/tiff"),
+    (b"%PDF-1.7\n", "application/pdf"),
+    (b"PK\x03\x04\x14\x00", "application/zip"),
+    (b"\x1f\x8b\x08\x00", "application/gzip"),
+    (b"a" * 257 + b"ustar\x0000", "application/x-tar"),
+])
+def test_sniff_known_signatures(head, mime_type):
+    assert sniff_file_type(head).mime_type == mime_type
+
+
+def test_sniff_text_and_binary():
+    assert sniff_file_type("Привет\tмир\r\n".encode()) == TEXT_FILE_TYPE
+    assert sniff_file_type(b"plain text with \x1b[1mescape\x1b[0m") == TEXT_FILE_TYPE
+    assert sniff_file_type(b"\x00\x01\x02binary") == UNKNOWN_FILE_TYPE
+    assert sniff_file_type(b"") == UNKNOWN_FILE_TYPE
+
+
+@pytest.mark.parametrize("mode", ["RGB", "RGBA", "P", "1"])
+def test_sniff_real_bmp(mode):
+    buffer = io.BytesIO()
+    Image.new(mode, (3, 2)).save(buffer, "BMP")
+    assert sniff_file_type(buffer.getvalue()).mime_type == "image/bmp"
+
+
+@pytest.mark.parametrize("head", [
+    b"BMW sales report\n2024: 10 cars\n",
+    b"BM" + struct.pack("<IIII", 1000, 1, 54, 40),  # резервные байты не нулевые
+    b"BM" + struct.pack("<IIII", 1000, 0, 54, 41),  # неизвестный DIB-заголовок
+    b"BM" + struct.pack("<IIII", 20, 0, 54, 40),  # размер меньше заголовков
+    b"BM" + struct.pack("<I", 1000),  # заголовок обрезан
+])
+def test_sniff_rejects_bm_prefix_without_bmp_header(head):
+    assert sniff_file_type(head).mime_type != "image/bmp"
+
+
+def test_ensure_operation_accepts_checks_every_step():
+    png = sniff_file_type(b"\x89PNG\r\n\x1a\n")
+    ensure_operation_accepts(FileOperationType.CONVERT_PNG_TO_JPG, png)
+    with pytest.raises(UnsupportedFileTypeException):
+        ensure_operation_accepts(FileOperationType.CONVERT_JPG_TO_PNG, png)
+
+    parameters = FileConversionParameters(pipeline=[{"operation": "resize_image"}])
+    ensure_operation_accepts(FileOperationType.CONVERT_PNG_TO_JPG, png, parameters)
+
+
+def test_target_size_needs_a_lossy_result():
+    png = sniff_file_type(b"\x89PNG\r\n\x1a\n")
+    jpeg = sniff_file_type(b"\xff\xd8\xff\xe0")
+    resize = FileConversionParameters(width=100, target_size_bytes=10000)
+    ensure_operation_accepts(FileOperationType.RESIZE_IMAGE, jpeg, resize)
+    with pytest.raises(UnsupportedFileTypeException, match="target_size_bytes"):
+        ensure_operation_accepts(FileOperationType.RESIZE_IMAGE, png, resize)
+
+    rendition = {"name": "small", "width": 100, "target_size_bytes": 10000}
+    with pytest.raises(UnsupportedFileTypeException, match="target_size_bytes"):
+        ensure_operation_accepts(
+            FileOperationType.RESIZE_IMAGE, png, FileConversionParameters(renditions=[rendition])
+        )
+    ensure_operation_accepts(
+        FileOperationType.RESIZE_IMAGE, png, FileConversionParameters(renditions=[{**rendition, "format": "webp"}])
+    )
+
+
+def test_result_extension_follows_chain():
+    assert get_result_extension(FileOperationType.RESIZE_IMAGE, "PNG") == "png"
+    assert get_result_extension(
+        FileOperationType.CONVERT_PNG_TO_JPG, "png", {"pipeline": [{"operation": "compress_zip"}]}
+    ) == "zip"
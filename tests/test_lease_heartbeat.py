@@ -0,0 +1,59 @@
+import asyncio
+import time
+import uuid
+
+import pytest
+
+from app.core.config import settings
+from app.core.exceptions import TaskLeaseLostException
+from app.services.task_service import TaskService
+
+
+class FakeTaskRepository:
+    def __init__(self, keep_lease=True):
+        self.keep_lease = keep_lease
+        self.extended = 0
+
+    async def extend_lease(self, task_id, lease_owner, seconds):
+        self.extended += 1
+        return self.keep_lease
+
+    async def update_progress(self, task_id, progress):
+        return True
+
+
+class FakeProgressChannel:
+    def publish(self, task_id, progress):
+        pass
+
+    def is_cancel_requested(self, task_id):
+        return False
+
+
+def silent_step(seconds, progress):
+    """Обработчик, который долго не сообщает прогресс"""
+    time.sleep(seconds)
+    return "done"
+
+
+def run_silent_step(task_repo):
+    service = TaskService(task_repo, None, None, None, None, FakeProgressChannel(), None)
+    return asyncio.run(service._run_with_progress(uuid.uuid4(), "worker-a", silent_step, 0.3))
+
+
+@pytest.fixture(autouse=True)
+def short_heartbeat(monkeypatch):
+    monkeypatch.setattr(settings, "TASK_LEASE_HEARTBEAT_SECONDS", 0.05)
+
+
+def test_lease_is_extended_while_step_reports_nothing():
+    task_repo = FakeTaskRepository()
+    assert run_silent_step(task_repo) == "done"
+    assert task_repo.extended >= 3
+
+
+def test_lost_lease_fails_the_step():
+    task_repo = FakeTaskRepository(keep_lease=False)
+    with pytest.raises(TaskLeaseLostException):
+        run_silent_step(task_repo)
+    assert task_repo.extended == 1
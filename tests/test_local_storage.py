@@ -0,0 +1,59 @@
+import asyncio
+import hashlib
+import os
+
+import pytest
+
+from app.storage import blob_key, open_local_copy, result_key
+from app.storage.local_storage import LocalStorage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return LocalStorage(str(tmp_path / "uploads"))
+
+
+def test_keys_are_sharded_by_name_digest(storage, tmp_path):
+    digest = hashlib.sha256(b"abc").hexdigest()
+    path = storage.get_local_path(blob_key(digest))
+    name_digest = hashlib.sha256(digest.encode()).hexdigest()
+    assert path == os.path.join(storage.root, "blobs", name_digest[:2], name_digest[2:4], digest)
+
+
+def test_legacy_paths_inside_root_are_used_as_is(storage):
+    legacy = os.path.join(storage.root, "user", "file.txt")
+    assert storage.get_local_path(legacy) == legacy
+
+
+def test_save_exists_download_delete(storage, tmp_path):
+    source = tmp_path / "source.png"
+    source.write_bytes(b"png")
+    key = result_key("task", "png")
+
+    asyncio.run(storage.save_file(key, str(source)))
+    assert not source.exists()
+    assert asyncio.run(storage.exists(key))
+
+    destination = tmp_path / "copy.png"
+    asyncio.run(storage.download_to(key, str(destination)))
+    assert destination.read_bytes() == b"png"
+    assert asyncio.run(storage.get_download_url(key, "a.png", "image/png")) is None
+
+    assert asyncio.run(storage.delete(key))
+    assert not asyncio.run(storage.exists(key))
+    assert not asyncio.run(storage.delete(key))
+
+
+def test_open_local_copy_uses_the_file_itself(storage, tmp_path):
+    source = tmp_path / "source.txt"
+    source.write_bytes(b"text")
+    asyncio.run(storage.save_file("blobs/x", str(source)))
+
+    async def read():
+        async with open_local_copy(storage, "blobs/x") as path:
+            assert path == storage.get_local_path("blobs/x")
+            with open(path, "rb") as file:
+                return file.read()
+
+    assert asyncio.run(read()) == b"text"
+    assert asyncio.run(storage.exists("blobs/x"))
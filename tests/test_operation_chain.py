@@ -0,0 +1,48 @@
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.file import FileUpload
+
+
+def make_upload(operation, *pipeline):
+    return FileUpload.model_validate({
+        "operation": operation,
+        "parameters": {"pipeline": [{"operation": step} for step in pipeline]},
+    })
+
+
+@pytest.mark.parametrize("operation, pipeline", [
+    ("resize_image", ["convert_jpg_to_png", "compress_zip"]),
+    ("convert_png_to_jpg", ["resize_image"]),
+    ("convert_txt_to_pdf", ["compress_zip"]),
+])
+def test_compatible_chain_is_accepted(operation, pipeline):
+    make_upload(operation, *pipeline)
+
+
+@pytest.mark.parametrize("operation, pipeline", [
+    ("compress_zip", ["resize_image"]),
+    ("resize_image", ["convert_txt_to_pdf"]),
+    ("convert_png_to_jpg", ["convert_png_to_jpg"]),
+    ("convert_jpg_to_png", ["resize_image", "convert_jpg_to_png"]),
+])
+def test_incompatible_chain_is_rejected(operation, pipeline):
+    with pytest.raises(ValidationError, match="cannot follow"):
+        make_upload(operation, *pipeline)
+
+
+def test_target_size_is_rejected_for_lossless_results():
+    with pytest.raises(ValidationError, match="image/png output"):
+        FileUpload.model_validate({
+            "operation": "convert_jpg_to_png",
+            "parameters": {"pipeline": [{"operation": "resize_image", "target_size_bytes": 10000}]},
+        })
+    with pytest.raises(ValidationError, match="jpeg or webp"):
+        FileUpload.model_validate({
+            "operation": "resize_image",
+            "parameters": {"renditions": [{"name": "small", "format": "png", "target_size_bytes": 10000}]},
+        })
+    FileUpload.model_validate({
+        "operation": "convert_png_to_jpg",
+        "parameters": {"pipeline": [{"operation": "resize_image", "target_size_bytes": 10000}]},
+    })
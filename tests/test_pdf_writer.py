@@ -0,0 +1,82 @@
+import io
+import os
+import re
+import zlib
+
+import pytest
+
+from app.core.config import settings
+from app.processing.pdf_writer import StreamingPdfWriter
+
+requires_font = pytest.mark.skipif(
+    not settings.PDF_UNICODE_FONT_PATH or not os.path.exists(settings.PDF_UNICODE_FONT_PATH),
+    reason="PDF_UNICODE_FONT_PATH is not installed",
+)
+
+
+def render(lines, font_path=None):
+    output = io.BytesIO()
+    writer = StreamingPdfWriter(output, 595, 842, 9, font_path)
+    writer.add_text_page(lines, left=42, top=790, leading=11)
+    writer.close()
+    return output.getvalue()
+
+
+def check_xref(pdf):
+    """Каждая запись xref указывает на начало своего объекта"""
+    position = int(re.search(rb"startxref\n(\d+)", pdf).group(1))
+    count = int(re.match(rb"xref\n0 (\d+)\n", pdf[position:]).group(1))
+    entries = pdf[position:].split(b"\n")[3:2 + count]
+    for number, entry in enumerate(entries, start=1):
+        offset = int(entry[:10])
+        assert pdf[offset:].startswith(b"%d 0 obj" % number)
+
+
+def streams(pdf):
+    for match in re.finditer(rb"<< /Length (\d+)[^>]*>>\nstream\n", pdf):
+        yield match.group(0), pdf[match.end():match.end() + int(match.group(1))]
+
+
+def test_winansi_text_uses_standard_font():
+    pdf = render(["Hello (world) \\ café"])
+    check_xref(pdf)
+    assert b"/F2" not in pdf
+    content = next(zlib.decompress(data) for header, data in streams(pdf) if b"FlateDecode" in header)
+    assert b"(Hello \\(world\\) \\\\ caf\xe9) Tj" in content
+
+
+def test_text_outside_winansi_without_font_fails():
+    with pytest.raises(ValueError, match="Unicode font"):
+        render(["Привет"])
+
+
+@requires_font
+def test_cyrillic_is_set_with_embedded_font():
+    pdf = render(["plain", "Привет, мир", "plain again"], settings.PDF_UNICODE_FONT_PATH)
+    check_xref(pdf)
+    assert b"/Subtype /Type0" in pdf
+    assert b"/Encoding /Identity-H" in pdf
+    assert b"/FontFile2" in pdf
+
+    content = next(zlib.decompress(data) for header, data in streams(pdf) if b"/Length1" not in header
+                   and b"FlateDecode" in header)
+    assert content.count(b"Tf") == 3  # F1 -> F2 -> F1
+
+    to_unicode = next(data for header, data in streams(pdf) if b"Filter" not in header)
+    assert b"<041F>" in to_unicode  # П
+    assert b"<043C>" in to_unicode  # м
+
+
+@requires_font
+def test_embedded_font_is_a_subset_with_original_glyph_ids():
+    from fontTools.ttLib import TTFont
+
+    pdf = render(["Ёж"], settings.PDF_UNICODE_FONT_PATH)
+    header, data = next((header, data) for header, data in streams(pdf) if b"/Length1" in header)
+    program = zlib.decompress(data)
+    assert len(program) == int(re.search(rb"/Length1 (\d+)", header).group(1))
+
+    original = TTFont(settings.PDF_UNICODE_FONT_PATH)
+    subset = TTFont(io.BytesIO(program))
+    assert set(subset.getBestCmap()) == {ord("Ё"), ord("ж")}
+    assert subset.getGlyphID(subset.getBestCmap()[ord("ж")]) == original.getGlyphID(original.getBestCmap()[ord("ж")])
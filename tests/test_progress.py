@@ -0,0 +1,96 @@
+import pytest
+
+from app.worker.progress import ProgressReporter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_reporter(clock, **options):
+    published, persisted = [], []
+    reporter = ProgressReporter(
+        published.append,
+        persisted.append,
+        min_delta=options.pop("min_delta", 5),
+        min_interval=options.pop("min_interval", 1.0),
+        milestones=options.pop("milestones", [50]),
+        clock=clock,
+        **options,
+    )
+    return reporter, published, persisted
+
+
+def test_small_steps_are_thinned_by_delta():
+    clock = FakeClock()
+    reporter, published, _ = make_reporter(clock, min_interval=0)
+    for progress in range(1, 12):
+        reporter(progress)
+    assert published == [5, 10]
+
+
+def test_updates_are_thinned_by_interval():
+    clock = FakeClock()
+    reporter, published, _ = make_reporter(clock)
+    reporter(10)
+    reporter(20)
+    clock.now = 1.0
+    reporter(30)
+    assert published == [10, 30]
+
+
+def test_milestones_are_persisted_once_and_progress_never_decreases():
+    clock = FakeClock()
+    reporter, published, persisted = make_reporter(clock)
+    reporter(10)
+    reporter(55)
+    reporter(40)
+    reporter(60)
+    assert persisted == [55]
+    assert published == [10, 55]
+    assert reporter.current == 60
+
+
+def test_flush_publishes_held_back_value():
+    clock = FakeClock()
+    reporter, published, _ = make_reporter(clock)
+    reporter(10)
+    reporter(12)
+    reporter.flush()
+    assert published == [10, 12]
+    reporter.flush()
+    assert published == [10, 12]
+
+
+def test_completion_is_published_regardless_of_delta():
+    clock = FakeClock()
+    reporter, published, _ = make_reporter(clock, min_interval=0, min_delta=10)
+    reporter(95)
+    reporter(100)
+    assert published == [95, 100]
+
+
+def test_checkpoint_is_rate_limited_and_can_stop_processing():
+    clock = FakeClock()
+    checks = []
+
+    def checkpoint():
+        checks.append(clock.now)
+        if len(checks) == 3:
+            raise RuntimeError("cancelled")
+
+    reporter, _, _ = make_reporter(clock, checkpoint=checkpoint, checkpoint_interval=0.5)
+    reporter(1)
+    clock.now = 0.2
+    reporter(2)
+    clock.now = 0.5
+    reporter(3)
+    assert checks == [0.0, 0.5]
+
+    clock.now = 1.0
+    with pytest.raises(RuntimeError):
+        reporter(4)
@@ -0,0 +1,80 @@
+import os
+
+from app.services.result_cache import ResultCache
+
+
+def write(path, size):
+    with open(path, "wb") as output:
+        output.write(b"x" * size)
+    return str(path)
+
+
+def make_key(index):
+    return f"{index:02d}" + "0" * 62
+
+
+def put(cache, key, source, keep_source=False):
+    """Как воркер: результат кладется в кэш, временный файл затем удаляется"""
+    cache.put(key, "bin", source)
+    if not keep_source:
+        os.remove(source)
+
+
+def test_put_get_and_materialize(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"), max_bytes=1000)
+    source = write(tmp_path / "result", 100)
+    cache.put(make_key(1), "png", source)
+
+    assert cache.get(make_key(1), "png")
+    assert cache.get(make_key(1), "jpg") is None
+    destination = cache.materialize(make_key(1), "png", str(tmp_path / "out" / "copy.png"))
+    assert os.path.getsize(destination) == 100
+
+
+def test_eviction_removes_least_recently_used(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"), max_bytes=1000)
+    for age in range(4):
+        put(cache, make_key(age), write(tmp_path / str(age), 300))
+        os.utime(cache.get(make_key(age), "bin") + ResultCache.USAGE_SUFFIX, (age, age))
+    cache.get(make_key(0), "bin")  # обращение освежает запись
+
+    put(cache, make_key(99), write(tmp_path / "new", 300))
+    assert cache.get(make_key(0), "bin")
+    assert cache.get(make_key(1), "bin") is None
+    assert cache.get(make_key(2), "bin")
+    assert cache.get(make_key(3), "bin")
+    assert cache.get(make_key(99), "bin")
+
+
+def test_access_does_not_touch_linked_results(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"), max_bytes=1000)
+    result = write(tmp_path / "result", 100)
+    cache.put(make_key(1), "bin", result)
+    os.utime(result, (1000, 1000))
+
+    cache.get(make_key(1), "bin")
+    cache.materialize(make_key(1), "bin", str(tmp_path / "other"))
+    assert os.stat(result).st_mtime == 1000
+
+
+def test_entries_linked_by_results_are_kept_and_not_counted(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"), max_bytes=1000)
+    for index in range(5):
+        put(cache, make_key(index), write(tmp_path / str(index), 300), keep_source=True)
+
+    assert cache.evict() == 0
+    assert all(cache.get(make_key(index), "bin") for index in range(5))
+
+
+def test_directory_is_scanned_only_when_bound_is_crossed(tmp_path, monkeypatch):
+    cache = ResultCache(str(tmp_path / "cache"), max_bytes=1000)
+    scans = []
+    evict = cache.evict
+    monkeypatch.setattr(cache, "evict", lambda: scans.append(1) or evict())
+
+    for index in range(4):
+        put(cache, make_key(index), write(tmp_path / str(index), 300))
+    # первый put сканирует, чтобы узнать размер, дальше - только за лимитом
+    assert len(scans) == 1
+    put(cache, make_key(4), write(tmp_path / "4", 300))
+    assert len(scans) == 2
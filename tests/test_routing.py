@@ -0,0 +1,48 @@
+from app.core.config import settings
+from app.schemas.file import FileConversionParameters, FileOperationType
+from app.worker.routing import ALL_QUEUES, get_lane_worker, get_message_size, get_queue
+
+MB = 1024 * 1024
+
+
+def test_queue_follows_most_expensive_step():
+    assert get_queue(FileOperationType.CONVERT_TXT_TO_PDF, 1024) == "light"
+    assert get_queue(FileOperationType.COMPRESS_ZIP, 1024) == "io"
+    parameters = FileConversionParameters(pipeline=[{"operation": "compress_zip"}])
+    assert get_queue(FileOperationType.RESIZE_IMAGE, 1024, parameters) == "cpu"
+
+
+def test_expensive_tasks_go_to_bulk_lane(monkeypatch):
+    monkeypatch.setattr(settings, "BULK_LANE_MIN_COST", 5 * MB)
+    assert get_queue(FileOperationType.CONVERT_PNG_TO_JPG, 5 * MB) == "cpu"
+    assert get_queue(FileOperationType.CONVERT_PNG_TO_JPG, 5 * MB + 1) == "cpu.bulk"
+    # JPEG весит вдвое больше на байт
+    assert get_queue(FileOperationType.CONVERT_JPG_TO_PNG, 3 * MB) == "cpu.bulk"
+    # ZIP - вдвое меньше
+    assert get_queue(FileOperationType.COMPRESS_ZIP, 8 * MB) == "io"
+
+
+def test_lane_workers_split_class_slots(monkeypatch):
+    monkeypatch.setattr(settings, "BULK_LANE_SLOT_SHARE", 0.25)
+    queues, options = get_lane_worker("io.bulk")
+    assert queues == ["io", "io.bulk"]
+    assert options.concurrency == max(round(settings.WORKER_IO_CONCURRENCY * 0.25), 1)
+    assert options.prefetch_multiplier == 1
+
+    queues, fast = get_lane_worker("io")
+    assert queues == ["io"]
+    assert fast.concurrency + options.concurrency == settings.WORKER_IO_CONCURRENCY
+    assert fast.pool == options.pool == "threads"
+
+
+def test_every_lane_has_a_worker():
+    for lane in ALL_QUEUES:
+        queues, options = get_lane_worker(lane)
+        assert lane in queues
+        assert options.concurrency >= 1
+
+
+def test_bulk_lane_messages_carry_one_task(monkeypatch):
+    monkeypatch.setattr(settings, "TASK_MESSAGE_MAX_TASKS", 4)
+    assert get_message_size("cpu") == 4
+    assert get_message_size("cpu.bulk") == 1
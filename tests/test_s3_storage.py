@@ -0,0 +1,79 @@
+import asyncio
+import os
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from app.storage.s3_storage import S3Storage
+
+BUCKET = "converter-test"
+
+
+@pytest.fixture
+def storage():
+    with mock_aws():
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket=BUCKET)
+        yield S3Storage(
+            bucket=BUCKET,
+            region="us-east-1",
+            access_key_id="test",
+            secret_access_key="test",
+        )
+
+
+def test_save_download_delete(storage, tmp_path):
+    source = tmp_path / "source.txt"
+    source.write_bytes(b"hello s3")
+
+    asyncio.run(storage.save_file("files/a.txt", str(source)))
+    assert not source.exists()
+    assert asyncio.run(storage.exists("files/a.txt"))
+
+    destination = tmp_path / "downloaded.txt"
+    asyncio.run(storage.download_to("files/a.txt", str(destination)))
+    assert destination.read_bytes() == b"hello s3"
+
+    assert asyncio.run(storage.delete("files/a.txt"))
+    assert not asyncio.run(storage.exists("files/a.txt"))
+    assert not asyncio.run(storage.delete("files/a.txt"))
+
+
+def test_download_url_is_presigned(storage):
+    url = asyncio.run(storage.get_download_url("files/a.txt", "отчет.pdf", "application/pdf"))
+    assert BUCKET in url
+    assert "X-Amz-Signature" in url
+    assert storage.get_local_path("files/a.txt") is None
+
+
+def test_s3_requires_shared_upload_dir(monkeypatch):
+    from app.core.config import settings
+    from app.storage import get_storage
+
+    monkeypatch.setattr(settings, "STORAGE_BACKEND", "s3")
+    monkeypatch.setattr(settings, "UPLOAD_DIR_SHARED", False)
+    get_storage.cache_clear()
+    try:
+        with pytest.raises(RuntimeError, match="UPLOAD_DIR_SHARED"):
+            get_storage()
+    finally:
+        get_storage.cache_clear()
+
+
+def test_open_local_copy_downloads_and_cleans_up(storage, tmp_path, monkeypatch):
+    from app.core.config import settings
+    from app.storage import open_local_copy
+
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path / "uploads"))
+    source = tmp_path / "source.txt"
+    source.write_bytes(b"remote")
+    asyncio.run(storage.save_file("blobs/x", str(source)))
+
+    async def read():
+        async with open_local_copy(storage, "blobs/x") as path:
+            with open(path, "rb") as file:
+                return path, file.read()
+
+    path, data = asyncio.run(read())
+    assert data == b"remote"
+    assert not os.path.exists(path)
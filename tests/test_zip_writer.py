@@ -0,0 +1,94 @@
+import io
+import struct
+import zipfile
+import zlib
+
+import pytest
+
+from app.processing.zip_writer import METHOD_DEFLATED, METHOD_STORED, StreamingZipWriter
+
+
+class ForwardOnlyStream(io.RawIOBase):
+    """Поток без seek/tell, как сокет или pipe"""
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.buffer += data
+        return len(data)
+
+
+def add(writer, name, data, method):
+    def blocks():
+        for start in range(0, len(data), 1000):
+            chunk = data[start:start + 1000]
+            writer.update(chunk)
+            yield compressor.compress(chunk)
+        yield compressor.flush()
+
+    def stored_blocks():
+        for start in range(0, len(data), 1000):
+            yield data[start:start + 1000]
+
+    if method == METHOD_DEFLATED:
+        compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+        writer.add_member(name, blocks(), method)
+    else:
+        writer.add_member(name, stored_blocks(), method, crc=zlib.crc32(data), size=len(data))
+    writer.finish_member()
+
+
+def test_round_trip_through_zipfile():
+    stream = ForwardOnlyStream()
+    writer = StreamingZipWriter(stream)
+    text = ("привет, мир\n" * 500).encode()
+    binary = bytes(range(256)) * 20
+    add(writer, "отчет.txt", text, METHOD_DEFLATED)
+    add(writer, "data.bin", binary, METHOD_STORED)
+    add(writer, "empty.txt", b"", METHOD_DEFLATED)
+    writer.close()
+
+    with zipfile.ZipFile(io.BytesIO(bytes(stream.buffer))) as archive:
+        assert archive.testzip() is None
+        assert archive.namelist() == ["отчет.txt", "data.bin", "empty.txt"]
+        assert archive.read("отчет.txt") == text
+        assert archive.read("data.bin") == binary
+        assert archive.read("empty.txt") == b""
+        assert archive.getinfo("отчет.txt").compress_type == zipfile.ZIP_DEFLATED
+        assert archive.getinfo("data.bin").compress_type == zipfile.ZIP_STORED
+
+
+def test_stored_member_has_sizes_in_local_header():
+    stream = ForwardOnlyStream()
+    writer = StreamingZipWriter(stream)
+    data = b"stored data"
+    add(writer, "a.bin", data, METHOD_STORED)
+    writer.close()
+
+    flags, method, _, _, crc, compressed_size, size = struct.unpack("<HHHHIII", bytes(stream.buffer[6:26]))
+    assert not flags & 0x0008
+    assert (method, crc, compressed_size, size) == (METHOD_STORED, zlib.crc32(data), len(data), len(data))
+    # сразу за данными идет центральный каталог, а не дескриптор
+    assert stream.buffer[30 + len("a.bin") + len(data):].startswith(b"PK\x01\x02")
+
+
+def test_stored_member_must_match_declared_size():
+    writer = StreamingZipWriter(ForwardOnlyStream())
+    writer.add_member("a.bin", [b"abc"], METHOD_STORED, crc=zlib.crc32(b"abcd"), size=4)
+    with pytest.raises(ValueError, match="declares 4"):
+        writer.finish_member()
+
+
+def test_oversized_member_is_rejected():
+    writer = StreamingZipWriter(ForwardOnlyStream())
+    with pytest.raises(ValueError, match="ZIP64"):
+        writer.add_member("big.bin", [], METHOD_STORED, crc=0, size=0xFFFFFFFF + 1)
+
+    writer.add_member("big.bin", [], METHOD_DEFLATED)
+    writer._members[-1].size = 0xFFFFFFFF + 1
+    with pytest.raises(ValueError, match="ZIP64"):
+        writer.finish_member()